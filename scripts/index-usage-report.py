@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+@file Отчёт об использовании и размере индексов для таблиц моделей сервисов.
+
+Зачем:
+- каждый лишний индекс замедляет INSERT (turn пишет 2 строки в
+  conversation_messages на каждый запрос);
+- избыточные индексы-префиксы и неиспользуемые индексы нужно находить
+  по данным, а не на глаз.
+
+Как работает:
+- импортирует модели каждого сервиса (как generate-openapi-snapshots.py)
+  и собирает имена таблиц и объявленных индексов из `Base.metadata`;
+- читает `pg_stat_user_indexes` + `pg_relation_size` из БД (`DATABASE_URL`);
+  для секционированных таблиц статистика суммируется по всем секциям;
+- помечает индексы: `unused` (0 сканов), `prefix-of:<index>` (ключ является
+  префиксом другого индекса той же таблицы), `not-in-models`, а также
+  объявленные в моделях, но отсутствующие в БД.
+
+Запуск:
+    python scripts/index-usage-report.py [--service conversations-service] [--json]
+
+Счётчики `idx_scan` копятся с последнего `pg_stat_reset()` — время сброса
+выводится в шапке отчёта; смотрите отчёт после репрезентативной нагрузки.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+from dotenv import load_dotenv
+from sqlalchemy import MetaData
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Не создаём __pycache__/.pyc при импорте сервисов (важно для чистоты репозитория).
+sys.dont_write_bytecode = True
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    name: str
+    service_dir: Path
+    base_import: str  # например: "auth_src.adapters.db.base:Base"
+    model_modules: tuple[str, ...]
+
+
+SERVICES: list[ServiceSpec] = [
+    ServiceSpec(
+        name="auth-service",
+        service_dir=REPO_ROOT / "services" / "auth-service",
+        base_import="auth_src.adapters.db.base:Base",
+        model_modules=("auth_src.adapters.db.models", "auth_src.adapters.db.audit"),
+    ),
+    ServiceSpec(
+        name="bots-service",
+        service_dir=REPO_ROOT / "services" / "bots-service",
+        base_import="bots_src.adapters.db.base:Base",
+        model_modules=("bots_src.adapters.db.models", "bots_src.adapters.db.audit"),
+    ),
+    ServiceSpec(
+        name="conversations-service",
+        service_dir=REPO_ROOT / "services" / "conversations-service",
+        base_import="conversations_src.adapters.db.base:Base",
+        model_modules=(
+            "conversations_src.adapters.db.models",
+            "conversations_src.adapters.db.audit",
+            "conversations_src.adapters.db.llm_turns_model",
+        ),
+    ),
+]
+
+# Индексы таблицы (обычной или секционированной) со статистикой, суммированной
+# по дереву секций. pg_partition_tree() для обычного индекса может не вернуть
+# строк, поэтому сам индекс добавляем явно.
+_INDEX_STATS_SQL = """
+SELECT
+    t.relname AS table_name,
+    ic.relname AS index_name,
+    i.indisprimary AS is_primary,
+    i.indisunique AS is_unique,
+    ARRAY(
+        SELECT pg_get_indexdef(i.indexrelid, k, true)
+        FROM generate_series(1, i.indnkeyatts) AS k
+        ORDER BY k
+    ) AS key_columns,
+    pg_get_indexdef(i.indexrelid) AS definition,
+    coalesce(sum(s.idx_scan), 0)::bigint AS scans,
+    coalesce(sum(s.idx_tup_read), 0)::bigint AS tuples_read,
+    coalesce(sum(pg_relation_size(tree.relid)), 0)::bigint AS size_bytes
+FROM pg_class t
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_index i ON i.indrelid = t.oid
+JOIN pg_class ic ON ic.oid = i.indexrelid
+LEFT JOIN LATERAL (
+    SELECT i.indexrelid::regclass AS relid
+    UNION
+    SELECT relid FROM pg_partition_tree(i.indexrelid::regclass)
+) AS tree ON true
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = tree.relid
+WHERE n.nspname = current_schema() AND t.relname = ANY($1::text[])
+GROUP BY t.relname, ic.relname, i.indisprimary, i.indisunique, i.indexrelid,
+         i.indnkeyatts
+ORDER BY t.relname, ic.relname
+"""
+
+
+@dataclass
+class IndexReport:
+    table: str
+    name: str
+    definition: str
+    key_columns: list[str]
+    size_bytes: int
+    scans: int
+    tuples_read: int
+    is_primary: bool
+    is_unique: bool
+    flags: list[str] = field(default_factory=list)
+
+
+def _load_env() -> None:
+    # Как в scripts/infra_check.py: `.env`, иначе `env.example`.
+    load_dotenv(REPO_ROOT / ".env", override=False)
+    if not os.getenv("DATABASE_URL") and (REPO_ROOT / "env.example").exists():
+        load_dotenv(REPO_ROOT / "env.example", override=False)
+
+
+def _import_attr(import_str: str) -> Any:
+    mod_path, attr = import_str.split(":")
+    return getattr(importlib.import_module(mod_path), attr)
+
+
+def _load_metadata(svc: ServiceSpec) -> MetaData:
+    sys.path.insert(0, str(svc.service_dir))
+    try:
+        base = _import_attr(svc.base_import)
+        for module in svc.model_modules:
+            importlib.import_module(module)
+        return base.metadata  # type: ignore[no-any-return]
+    finally:
+        try:
+            sys.path.remove(str(svc.service_dir))
+        except ValueError:
+            pass
+
+
+def _declared_indexes(metadata: MetaData) -> dict[str, set[str]]:
+    """{table: имена индексов, объявленных в моделях}."""
+    declared: dict[str, set[str]] = {}
+    for table in metadata.tables.values():
+        names = {str(ix.name) for ix in table.indexes if ix.name}
+        declared[table.name] = names
+    return declared
+
+
+def _mark(reports: list[IndexReport], declared: dict[str, set[str]]) -> None:
+    by_table: dict[str, list[IndexReport]] = {}
+    for r in reports:
+        by_table.setdefault(r.table, []).append(r)
+
+    for table_reports in by_table.values():
+        for r in table_reports:
+            if r.scans == 0 and not r.is_primary:
+                r.flags.append("unused")
+            if not r.is_primary and r.name not in declared.get(r.table, set()):
+                r.flags.append("not-in-models")
+            if r.is_unique or r.is_primary:
+                continue
+            # Ключ — префикс ключа другого индекса: запросы могут обойтись им.
+            for other in table_reports:
+                if other is r or len(other.key_columns) < len(r.key_columns):
+                    continue
+                if other.key_columns[: len(r.key_columns)] == r.key_columns and (
+                    len(other.key_columns) > len(r.key_columns) or other.name < r.name
+                ):
+                    r.flags.append(f"prefix-of:{other.name}")
+                    break
+
+
+def _format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "kB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{size} B"
+
+
+async def _collect(
+    dsn: str, services: list[ServiceSpec]
+) -> tuple[str | None, dict[str, Any]]:
+    conn = await asyncpg.connect(dsn=dsn, timeout=5)
+    try:
+        stats_reset = await conn.fetchval(
+            "SELECT stats_reset FROM pg_stat_database "
+            "WHERE datname = current_database()"
+        )
+        result: dict[str, Any] = {}
+        for svc in services:
+            declared = _declared_indexes(_load_metadata(svc))
+            rows = await conn.fetch(_INDEX_STATS_SQL, sorted(declared))
+            reports = [
+                IndexReport(
+                    table=row["table_name"],
+                    name=row["index_name"],
+                    definition=row["definition"],
+                    key_columns=list(row["key_columns"]),
+                    size_bytes=row["size_bytes"],
+                    scans=row["scans"],
+                    tuples_read=row["tuples_read"],
+                    is_primary=row["is_primary"],
+                    is_unique=row["is_unique"],
+                )
+                for row in rows
+            ]
+            _mark(reports, declared)
+            existing = {(r.table, r.name) for r in reports}
+            missing = sorted(
+                f"{table}.{name}"
+                for table, names in declared.items()
+                for name in names
+                if (table, name) not in existing
+            )
+            result[svc.name] = {"indexes": reports, "missing_in_db": missing}
+        return (str(stats_reset) if stats_reset else None), result
+    finally:
+        await conn.close()
+
+
+def _print_report(stats_reset: str | None, result: dict[str, Any]) -> None:
+    print(f"stats_reset: {stats_reset or 'never'}")
+    for svc_name, data in result.items():
+        print(f"\n== {svc_name}")
+        current_table = None
+        for r in data["indexes"]:
+            if r.table != current_table:
+                current_table = r.table
+                print(f"  {r.table}")
+            flags = f"  [{', '.join(r.flags)}]" if r.flags else ""
+            print(
+                f"    {r.name:<55} {_format_size(r.size_bytes):>10} "
+                f"scans={r.scans:<10} ({', '.join(r.key_columns)}){flags}"
+            )
+        for name in data["missing_in_db"]:
+            print(f"  [missing-in-db] {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Index usage/size report")
+    parser.add_argument(
+        "--service",
+        action="append",
+        choices=[svc.name for svc in SERVICES],
+        help="ограничить отчёт сервисом (можно несколько раз)",
+    )
+    parser.add_argument("--json", action="store_true", help="вывести JSON")
+    args = parser.parse_args()
+
+    _load_env()
+    database_url = os.getenv("DATABASE_URL", "")
+    if not database_url:
+        print("[error] DATABASE_URL is not set")
+        return 1
+    # SQLAlchemy async URL → asyncpg DSN
+    dsn = database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+    services = [s for s in SERVICES if not args.service or s.name in args.service]
+    stats_reset, result = asyncio.run(_collect(dsn, services))
+
+    if args.json:
+        payload = {
+            "stats_reset": stats_reset,
+            "services": {
+                name: {
+                    "indexes": [asdict(r) for r in data["indexes"]],
+                    "missing_in_db": data["missing_in_db"],
+                }
+                for name, data in result.items()
+            },
+        }
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    else:
+        _print_report(stats_reset, result)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from pydantic import Field
+from typing import Literal, Self
+
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+DEV_JWT_SECRET = "dev-secret-change-me"
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(extra="ignore", populate_by_name=True)
@@ -10,10 +14,28 @@ class Settings(BaseSettings):
     app_env: str = Field(default="local", validation_alias="APP_ENV")
 
     # JWT (gateway валидирует access токены)
-    jwt_secret: str = Field(
-        default="dev-secret-change-me", validation_alias="JWT_SECRET"
-    )
+    jwt_secret: str = Field(default=DEV_JWT_SECRET, validation_alias="JWT_SECRET")
     jwt_issuer: str = Field(default="livai-auth-service", validation_alias="JWT_ISSUER")
+    # Публичные ключи auth-service для EdDSA/ES256 (обычно
+    # `<AUTH_SERVICE_URL>/v1/auth/.well-known/jwks.json`). Не задан — только HS256.
+    jwt_jwks_url: str | None = Field(default=None, validation_alias="JWT_JWKS_URL")
+    jwt_jwks_refresh_seconds: float = Field(
+        default=300.0, validation_alias="JWT_JWKS_REFRESH_SECONDS"
+    )
+    # Алгоритм подписи auth-service (тот же JWT_ALGORITHM). HS256-токены по
+    # JWT_SECRET принимаются, только если JWT_ACCEPT_HS256 (не задано — только
+    # при JWT_ALGORITHM=HS256; `true` при EdDSA/ES256 — окно миграции).
+    jwt_algorithm: Literal["HS256", "EdDSA", "ES256"] = Field(
+        default="HS256", validation_alias="JWT_ALGORITHM"
+    )
+    jwt_accept_hs256: bool | None = Field(
+        default=None, validation_alias="JWT_ACCEPT_HS256"
+    )
+    # Отозванные access-токены (security/revocations.py): auth-service пишет
+    # отзывы в этот Redis Stream, gateway держит их в памяти. Нужен REDIS_URL.
+    jwt_revocation_stream: str = Field(
+        default="auth:revocations", validation_alias="JWT_REVOCATION_STREAM"
+    )
 
     # URL'ы других сервисов (gateway будет проксировать запросы дальше по микросервисам)
     auth_service_url: str = Field(
@@ -39,3 +61,18 @@ class Settings(BaseSettings):
 
     # Если включено — /readyz вернёт 503 при любой недоступности зависимостей.
     readiness_strict: bool = Field(default=True, validation_alias="READINESS_STRICT")
+
+    @model_validator(mode="after")
+    def _check_jwt_secret(self) -> Self:
+        if self.jwt_accept_hs256 is None:
+            self.jwt_accept_hs256 = self.jwt_algorithm == "HS256"
+        # Dev-секрет известен всем: вне local/test с ним подделывается любой токен.
+        if (
+            self.jwt_accept_hs256
+            and self.jwt_secret == DEV_JWT_SECRET
+            and self.app_env not in ("local", "test")
+        ):
+            raise ValueError(
+                f"JWT_SECRET is the dev default, not allowed for APP_ENV={self.app_env}"
+            )
+        return self
@@ -4,13 +4,22 @@ from typing import Any
 
 import httpx
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from starlette.requests import Request
 
 from ...errors.http_errors import ErrorResponse
 
 router = APIRouter(prefix="/v1")
 
+# Ответы downstream с этими типами проксируются потоком (см. _proxy_or_stub).
+_STREAMING_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
+_STREAMING_HEADERS = {"content-encoding", "vary", "cache-control"}
+# Заголовки upstream'а, которые клиенту нужны и в обычных ответах
+# (Retry-After у 429 admission control'а conversations-service и блокировки
+# логина auth-service).
+_BUFFERED_HEADERS = {"retry-after"}
+
 
 @router.api_route(
     "/auth",
@@ -121,19 +130,24 @@ async def _proxy_or_stub(
         request=request, upstream_base_url=upstream_base_url
     )
     headers = _forward_headers(request.headers)
+    _append_forwarded_for(request, headers)
     _inject_context_headers(request, headers)
     body = await request.body()
 
+    client = httpx.AsyncClient(timeout=httpx.Timeout(10.0))
     try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-            resp = await client.request(
+        resp = await client.send(
+            client.build_request(
                 method=request.method,
                 url=upstream_url,
                 params=request.query_params,
                 headers=headers,
                 content=body,
-            )
+            ),
+            stream=True,
+        )
     except Exception as e:
+        await client.aclose()
         payload = ErrorResponse(
             code="DOWNSTREAM_UNAVAILABLE",
             message="Downstream сервис недоступен",
@@ -147,13 +161,41 @@ async def _proxy_or_stub(
         return JSONResponse(status_code=502, content=payload)
 
     content_type = resp.headers.get("content-type")
+    if content_type and content_type.startswith(_STREAMING_MEDIA_TYPES):
+        # Потоковые ответы (экспорт NDJSON) отдаём по мере получения, без
+        # буферизации: байты как есть (в т.ч. сжатые), клиент upstream'а
+        # закрывается после отправки ответа. Таймаут httpx — на каждое
+        # чтение, а не на весь поток.
+        passthrough = {
+            k: v for k, v in resp.headers.items() if k.lower() in _STREAMING_HEADERS
+        }
+        return StreamingResponse(
+            resp.aiter_raw(),
+            status_code=resp.status_code,
+            media_type=content_type,
+            headers=passthrough,
+            background=BackgroundTask(_close_upstream, resp, client),
+        )
+
+    try:
+        content = await resp.aread()
+    finally:
+        await _close_upstream(resp, client)
     return Response(
-        content=resp.content,
+        content=content,
         status_code=resp.status_code,
         media_type=content_type,
+        headers={
+            k: v for k, v in resp.headers.items() if k.lower() in _BUFFERED_HEADERS
+        },
     )
 
 
+async def _close_upstream(resp: httpx.Response, client: httpx.AsyncClient) -> None:
+    await resp.aclose()
+    await client.aclose()
+
+
 def _build_upstream_url(*, request: Request, upstream_base_url: str) -> str:
     """Собирает URL для downstream, сохраняя путь `/v1/...`."""
     base = upstream_base_url.rstrip("/")
@@ -180,9 +222,25 @@ def _forward_headers(headers: Any) -> dict[str, str]:
         if k.lower() in hop_by_hop:
             continue
         result[k] = v
+    # Accept-Encoding клиента — явно, по умолчанию `identity`: иначе httpx
+    # подставит свой (gzip, deflate, zstd), upstream сожмёт ответ, а потоковый
+    # ответ уходит клиенту байтами как есть — сжатым, хотя клиент не просил.
+    if "accept-encoding" not in {k.lower() for k in result}:
+        result["Accept-Encoding"] = "identity"
     return result
 
 
+def _append_forwarded_for(request: Request, headers: dict[str, str]) -> None:
+    """Дописывает адрес соединения клиента в конец `X-Forwarded-For`.
+
+    Присланное клиентом остаётся левее: downstream верит только хопам,
+    дописанным доверенными прокси (auth-service: `TRUSTED_PROXIES`).
+    """
+    prior = [headers.pop(k) for k in list(headers) if k.lower() == "x-forwarded-for"]
+    peer = request.client.host if request.client else "unknown"
+    headers["X-Forwarded-For"] = ", ".join([*prior, peer])
+
+
 def _inject_context_headers(request: Request, headers: dict[str, str]) -> None:
     """Пробрасывает контекст gateway в downstream заголовками."""
     trace_id = getattr(request.state, "trace_id", None)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+from starlette.types import Send
+
+_JSON_CONTENT_TYPE = (b"content-type", b"application/json")
+
+
+class ErrorTemplate:
+    """Заранее собранный ответ-ошибка в формате `ErrorResponse`.
+
+    Для горячих путей middleware (401/429 под флудом): `code`, `message` и
+    статус фиксированы и сериализуются один раз при создании шаблона;
+    на запрос дописываются только `trace_id`/`details` (через orjson) и
+    отправляются сырые ASGI-сообщения — без Pydantic-модели и `JSONResponse`.
+
+    Тело побайтно совпадает с `JSONResponse(ErrorResponse(...).model_dump())`:
+    тот же порядок ключей и компактные разделители.
+    """
+
+    __slots__ = ("status", "_prefix", "_headers")
+
+    def __init__(
+        self,
+        status: int,
+        code: str,
+        message: str,
+        *,
+        headers: Iterable[tuple[bytes, bytes]] = (),
+    ) -> None:
+        self.status = status
+        self._prefix = b"".join(
+            (
+                b'{"code":',
+                orjson.dumps(code),
+                b',"message":',
+                orjson.dumps(message),
+                b',"trace_id":',
+            )
+        )
+        self._headers = [_JSON_CONTENT_TYPE, *headers]
+
+    def render(
+        self, trace_id: str | None = None, details: dict[str, Any] | None = None
+    ) -> bytes:
+        return b"".join(
+            (
+                self._prefix,
+                orjson.dumps(trace_id),
+                b',"details":',
+                orjson.dumps(details),
+                b"}",
+            )
+        )
+
+    async def send(
+        self,
+        send: Send,
+        *,
+        trace_id: str | None = None,
+        details: dict[str, Any] | None = None,
+        headers: Iterable[tuple[bytes, bytes]] = (),
+    ) -> None:
+        body = self.render(trace_id, details)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": [
+                    *self._headers,
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
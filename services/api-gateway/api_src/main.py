@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -11,13 +13,15 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.requests import Request
 
 from api_src.config.settings import Settings
+from api_src.entrypoints.http.responses import FastJSONResponse
 from api_src.entrypoints.http.routes_health import router as health_router
 from api_src.entrypoints.http.routes_v1 import router as v1_router
 from api_src.errors.http_errors import ErrorResponse
 from api_src.middleware.auth import AuthMiddleware
-from api_src.middleware.operation_id import OperationIdMiddleware
 from api_src.middleware.rate_limit import RateLimitMiddleware
-from api_src.middleware.trace_id import TraceIdMiddleware
+from api_src.middleware.request_context import RequestContextMiddleware
+from api_src.security.jwks import JwksClient
+from api_src.security.revocations import RevocationList, create_revocation_list
 
 
 async def validation_exception_handler(
@@ -90,16 +94,44 @@ def create_app(settings: Settings) -> FastAPI:
 
     В `app.state.settings` кладём настройки, чтобы роуты/мидлвари могли их читать.
     """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        jwks: JwksClient | None = app.state.jwks
+        revocations: RevocationList = app.state.revocations
+        if jwks is not None:
+            await jwks.start()
+        await revocations.start()
+        try:
+            yield
+        finally:
+            if jwks is not None:
+                await jwks.aclose()
+            await revocations.aclose()
+
     app = FastAPI(
         title="LivAi API Gateway",
         version="0.1.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
     )
     app.state.settings = settings
+    app.state.jwks = (
+        JwksClient(
+            settings.jwt_jwks_url,
+            refresh_interval_s=settings.jwt_jwks_refresh_seconds,
+        )
+        if settings.jwt_jwks_url
+        else None
+    )
+    app.state.revocations = create_revocation_list(settings)
 
+    # Порядок: последний добавленный — внешний. RequestContext разбирает
+    # заголовки один раз до Auth/RateLimit, поэтому и ответы 401/429
+    # получают X-Trace-Id / X-Operation-Id.
     app.add_middleware(RateLimitMiddleware)
-    app.add_middleware(TraceIdMiddleware)
-    app.add_middleware(OperationIdMiddleware)
     app.add_middleware(AuthMiddleware)
+    app.add_middleware(RequestContextMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_allow_origins,
@@ -2,11 +2,13 @@
 from .auth import AuthMiddleware
 from .operation_id import OperationIdMiddleware
 from .rate_limit import RateLimitMiddleware
+from .request_context import RequestContextMiddleware
 from .trace_id import TraceIdMiddleware
 
 __all__ = [
     "AuthMiddleware",
     "OperationIdMiddleware",
     "RateLimitMiddleware",
+    "RequestContextMiddleware",
     "TraceIdMiddleware",
 ]
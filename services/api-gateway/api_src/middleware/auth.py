@@ -2,12 +2,11 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi.responses import JSONResponse
-from starlette.requests import Request
 from starlette.types import ASGIApp, Receive, Scope, Send
 
-from ..errors.http_errors import ErrorResponse
+from ..errors.fast_errors import ErrorTemplate
 from ..security.jwt import JwtError, decode_and_verify
+from .request_context import get_header
 
 
 class AuthMiddleware:
@@ -21,6 +20,15 @@ class AuthMiddleware:
       • Проверяем заголовок `Authorization: Bearer <token>`.
       • Декодируем, валидируем claims.
       • Сохраняем `user_id`, `workspace_id` в `scope['state']`.
+
+    EdDSA/ES256-токены проверяются по ключам `app.state.jwks` (JwksClient,
+    если задан `JWT_JWKS_URL`), HS256 — по `JWT_SECRET` (только при
+    `JWT_ACCEPT_HS256`, см. config/settings.py). Отозванные
+    (logout, кража refresh) отклоняются по `app.state.revocations` —
+    словарь в памяти, без обращения к Redis на запрос.
+
+    Заголовок читается из контекста `RequestContextMiddleware` (если он
+    стоит раньше в цепочке), `Request` не создаётся.
     """
 
     public_paths: set[str] = {
@@ -32,6 +40,12 @@ class AuthMiddleware:
         "/redoc",
     }
 
+    # Ответы 401 собраны заранее: под перебором токенов это горячий путь.
+    _no_token = ErrorTemplate(401, "UNAUTHORIZED", "Нет токена")
+    _invalid_token = ErrorTemplate(401, "UNAUTHORIZED", "Неверный токен")
+    _invalid_claims = ErrorTemplate(401, "UNAUTHORIZED", "Неверные claims токена")
+    _revoked_token = ErrorTemplate(401, "UNAUTHORIZED", "Токен отозван")
+
     def __init__(self, app: ASGIApp):
         self.app = app
 
@@ -40,18 +54,20 @@ class AuthMiddleware:
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
-        path = request.url.path
-
         # Пропускаем публичные пути.
-        if self._is_public_path(path):
+        if self._is_public_path(scope["path"]):
             await self.app(scope, receive, send)
             return
 
         # Требуется токен.
-        maybe_error = self._require_access_token(request, scope)
+        maybe_error = self._require_access_token(scope)
         if maybe_error is not None:
-            await self._respond_json(maybe_error, send)
+            state = scope["state"]
+            await maybe_error.send(
+                send,
+                trace_id=state.get("trace_id"),
+                details={"operation_id": state.get("operation_id")},
+            )
             return
 
         await self.app(scope, receive, send)
@@ -67,16 +83,14 @@ class AuthMiddleware:
             return True
         return False
 
-    def _require_access_token(
-        self, request: Request, scope: Scope
-    ) -> JSONResponse | None:
-        settings = request.app.state.settings  # type: ignore[attr-defined]
-        trace_id = scope.setdefault("state", {}).get("trace_id")
-        operation_id = scope["state"].get("operation_id")
+    def _require_access_token(self, scope: Scope) -> ErrorTemplate | None:
+        app_state = scope["app"].state
+        settings = app_state.settings
+        state = scope.setdefault("state", {})
 
-        auth_header = request.headers.get("Authorization")
+        auth_header = get_header(scope, b"authorization")
         if not auth_header or not auth_header.lower().startswith("bearer "):
-            return self._unauthorized("Нет токена", trace_id, operation_id)
+            return self._no_token
 
         token = auth_header.split(" ", 1)[1].strip()
         try:
@@ -85,50 +99,26 @@ class AuthMiddleware:
                 secret=settings.jwt_secret,  # type: ignore[attr-defined]
                 issuer=settings.jwt_issuer,  # type: ignore[attr-defined]
                 expected_token_type="access",
+                jwks=getattr(app_state, "jwks", None),
+                accept_hs256=settings.jwt_accept_hs256,  # type: ignore[attr-defined]
             )
         except JwtError:
-            return self._unauthorized("Неверный токен", trace_id, operation_id)
+            return self._invalid_token
+
+        revocations = getattr(app_state, "revocations", None)
+        if revocations is not None and revocations.is_revoked(payload):
+            return self._revoked_token
 
         try:
             user_id = uuid.UUID(payload["sub"])
             workspace_id = uuid.UUID(payload["workspace_id"])
         except Exception:
-            return self._unauthorized("Неверные claims токена", trace_id, operation_id)
+            return self._invalid_claims
 
-        scope["state"].update(
+        state.update(
             {
                 "user_id": str(user_id),
                 "workspace_id": str(workspace_id),
             }
         )
         return None
-
-    @staticmethod
-    def _unauthorized(
-        message: str, trace_id: str | None, operation_id: str | None
-    ) -> JSONResponse:
-        return JSONResponse(
-            status_code=401,
-            content=ErrorResponse(
-                code="UNAUTHORIZED",
-                message=message,
-                trace_id=trace_id,
-                details={"operation_id": operation_id},
-            ).model_dump(),
-        )
-
-    @staticmethod
-    async def _respond_json(response: JSONResponse, send: Send) -> None:
-        await send(
-            {
-                "type": "http.response.start",
-                "status": response.status_code,
-                "headers": [(b"content-type", b"application/json")],
-            }
-        )
-        body = (
-            response.body
-            if isinstance(response.body, (bytes, bytearray))
-            else bytes(response.body)
-        )
-        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Заголовки, которые нужны middleware-цепочке гейтвея (в нижнем регистре,
+# как их отдаёт ASGI-сервер).
+_TRACE_ID = b"x-trace-id"
+_REQUEST_ID = b"x-request-id"
+_OPERATION_ID = b"x-operation-id"
+_AUTHORIZATION = b"authorization"
+_FORWARDED_FOR = b"x-forwarded-for"
+_REAL_IP = b"x-real-ip"
+
+_WANTED = frozenset(
+    {_TRACE_ID, _REQUEST_ID, _OPERATION_ID, _AUTHORIZATION, _FORWARDED_FOR, _REAL_IP}
+)
+
+_VERSION_7 = 0x7 << 76
+_VARIANT_RFC4122 = 0x2 << 62
+_RAND_A_MASK = (1 << 12) - 1
+_RAND_B_MASK = (1 << 62) - 1
+
+
+def uuid7() -> str:
+    """Сгенерировать UUIDv7 (RFC 9562) сразу строкой.
+
+    48 бит — unix-время в миллисекундах, остальное — случайные биты, поэтому
+    id сортируются по времени создания (удобно для логов и индексов).
+    Без промежуточного `uuid.UUID`: одна арифметика над int + форматирование.
+    """
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (time.time_ns() // 1_000_000) << 80
+        | _VERSION_7
+        | ((rand >> 62) & _RAND_A_MASK) << 64
+        | _VARIANT_RFC4122
+        | (rand & _RAND_B_MASK)
+    )
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def get_header(scope: Scope, name: bytes) -> str | None:
+    """Значение заголовка запроса: из разобранного контекста или из scope.
+
+    `name` — в нижнем регистре. Если `RequestContextMiddleware` уже разобрал
+    заголовки, повторного прохода по списку нет.
+    """
+    headers: dict[bytes, str] | None = scope.get("state", {}).get("request_headers")
+    if headers is not None:
+        return headers.get(name)
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")  # type: ignore[no-any-return]
+    return None
+
+
+def get_client_ip(scope: Scope) -> str:
+    """IP клиента с учётом прокси (`X-Forwarded-For`, `X-Real-IP`)."""
+    forwarded = get_header(scope, _FORWARDED_FOR)
+    if forwarded:
+        return forwarded.split(",", 1)[0].strip()
+    real_ip = get_header(scope, _REAL_IP)
+    if real_ip:
+        return real_ip
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RequestContextMiddleware:
+    """ASGI-middleware контекста запроса (trace id + operation id).
+
+    Заменяет связку `TraceIdMiddleware` + `OperationIdMiddleware`:
+    • один проход по заголовкам запроса; нужные значения кладутся в
+      `scope['state']['request_headers']` и читаются оттуда Auth/RateLimit;
+    • `trace_id` — из `X-Trace-Id` / `X-Request-Id`, иначе новый UUIDv7;
+    • `operation_id` — из `X-Operation-Id` (если это UUID), иначе UUIDv7;
+    • `X-Trace-Id` и `X-Operation-Id` дописываются в ответ одной обёрткой
+      `send`, готовыми парами байтов (без `MutableHeaders`).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers: dict[bytes, str] = {}
+        for key, value in scope["headers"]:
+            if key in _WANTED and key not in headers:
+                headers[key] = value.decode("latin-1")
+
+        trace_id = headers.get(_TRACE_ID) or headers.get(_REQUEST_ID) or uuid7()
+        operation_id = _coerce_operation_id(headers.get(_OPERATION_ID))
+
+        state: dict[str, Any] = scope.setdefault("state", {})
+        state["request_headers"] = headers
+        state["trace_id"] = trace_id
+        state["operation_id"] = operation_id
+
+        extra_headers = [
+            (b"x-trace-id", trace_id.encode("latin-1")),
+            (b"x-operation-id", operation_id.encode("latin-1")),
+        ]
+
+        async def send_with_context(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_context)
+
+
+def _coerce_operation_id(value: str | None) -> str:
+    if not value:
+        return uuid7()
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return uuid7()
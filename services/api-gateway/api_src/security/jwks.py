@@ -0,0 +1,97 @@
+"""JWKS-клиент: публичные ключи auth-service для проверки access-JWT.
+
+Ключи (`JWT_JWKS_URL`, обычно `<auth>/v1/auth/.well-known/jwks.json`)
+загружаются при старте и обновляются фоновой задачей раз в
+`JWT_JWKS_REFRESH_SECONDS`. Горячий путь — `get(kid)`: поиск в словаре
+готовых объектов ключей, без сети и без await.
+
+Неизвестный `kid` (auth начал подписывать новым ключом раньше, чем мы
+обновились) — запрос отклоняется, а внеочередное обновление запускается в
+фоне, не чаще раза в `min_refresh_interval_s`. При ошибке загрузки
+остаются прежние ключи.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import httpx
+
+from .jwt_codec import JwtKey
+
+logger = logging.getLogger(__name__)
+
+
+class JwksClient:
+    """Кэш ключей JWKS с фоновым обновлением (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        refresh_interval_s: float = 300.0,
+        min_refresh_interval_s: float = 10.0,
+        timeout_s: float = 5.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.url = url
+        self.refresh_interval_s = refresh_interval_s
+        self.min_refresh_interval_s = min_refresh_interval_s
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_s), transport=transport
+        )
+        self._keys: dict[str, JwtKey] = {}
+        self._last_refresh = float("-inf")
+        self._task: asyncio.Task[None] | None = None
+        self._pending: asyncio.Task[None] | None = None
+
+    def get(self, kid: str) -> JwtKey | None:
+        key = self._keys.get(kid)
+        if key is None:
+            self._refresh_soon()
+        return key
+
+    async def refresh(self) -> None:
+        """Перечитать JWKS; при ошибке остаются прежние ключи."""
+        self._last_refresh = time.monotonic()
+        try:
+            resp = await self._client.get(self.url)
+            resp.raise_for_status()
+            keys: dict[str, JwtKey] = {}
+            for jwk in resp.json().get("keys", []):
+                key = JwtKey.from_jwk(jwk)
+                if key is not None and key.kid is not None:
+                    keys[key.kid] = key
+        except Exception:
+            logger.warning("jwks: обновление %s не удалось", self.url, exc_info=True)
+            return
+        # Замена целиком: читатели видят либо старый, либо новый набор.
+        self._keys = keys
+
+    async def start(self) -> None:
+        await self.refresh()
+        self._task = asyncio.create_task(self._loop())
+
+    async def aclose(self) -> None:
+        for task in (self._task, self._pending):
+            if task is not None:
+                task.cancel()
+        await self._client.aclose()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval_s)
+            await self.refresh()
+
+    def _refresh_soon(self) -> None:
+        if self._pending is not None and not self._pending.done():
+            return
+        if time.monotonic() - self._last_refresh < self.min_refresh_interval_s:
+            return
+        try:
+            self._pending = asyncio.get_running_loop().create_task(self.refresh())
+        except RuntimeError:
+            # Вне event loop (синхронные тесты/бенчмарки) — ждём планового.
+            pass
@@ -1,16 +1,15 @@
 from __future__ import annotations
 
-import base64
-import hashlib
-import hmac
-import json
 import time
 import uuid
-from typing import Any, cast
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
+from .jwt_codec import JwtError as JwtError
+from .jwt_codec import JwtKey, decode, encode, parse_header
 
-class JwtError(Exception):
-    """Ошибка валидации/парсинга JWT."""
+if TYPE_CHECKING:
+    from .jwks import JwksClient
 
 
 def issue_access_token(
@@ -32,10 +31,11 @@ def issue_access_token(
         "sub": str(user_id),
         "workspace_id": str(workspace_id),
         "token_type": "access",
+        "jti": str(uuid.uuid4()),
         "iat": now,
         "exp": now + ttl_seconds,
     }
-    return _encode_hs256(payload, secret)
+    return encode(payload, _hs256(secret))
 
 
 def decode_and_verify(
@@ -44,61 +44,52 @@ def decode_and_verify(
     secret: str,
     issuer: str,
     expected_token_type: str | None = None,
+    jwks: JwksClient | None = None,
+    accept_hs256: bool = True,
 ) -> dict[str, Any]:
-    """Декодирует и валидирует JWT (HS256)."""
-    header_b64, payload_b64, sig_b64 = _split(token)
-    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
-    expected_sig = _hmac_sha256(signing_input, secret.encode("utf-8"))
-    if not hmac.compare_digest(_b64url_decode(sig_b64), expected_sig):
-        raise JwtError("Неверная подпись токена")
+    """Декодирует и валидирует JWT.
 
-    payload = cast(dict[str, Any], json.loads(_b64url_decode(payload_b64)))
-    if payload.get("iss") != issuer:
-        raise JwtError("Неверный issuer")
-
-    now = int(time.time())
-    exp = payload.get("exp")
-    if not isinstance(exp, int):
-        raise JwtError("Некорректный exp")
-    if now >= exp:
-        raise JwtError("Токен истёк")
-
-    if expected_token_type is not None:
-        if payload.get("token_type") != expected_token_type:
-            raise JwtError("Неверный тип токена")
-
-    return payload
-
-
-def _encode_hs256(payload: dict, secret: str) -> str:
-    header = {"alg": "HS256", "typ": "JWT"}
-    header_b64 = _b64url_encode(
-        json.dumps(header, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    )
-    payload_b64 = _b64url_encode(
-        json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    HS256 — по `secret` (если `accept_hs256`); EdDSA/ES256 — по ключу `kid`
+    из `jwks` (если JWKS не настроен, асимметричные токены не принимаются).
+    """
+    return decode(
+        token,
+        keys=gateway_keys(secret, jwks, accept_hs256),
+        issuer=issuer,
+        expected_token_type=expected_token_type,
     )
-    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
-    signature = _hmac_sha256(signing_input, secret.encode("utf-8"))
-    sig_b64 = _b64url_encode(signature)
-    return f"{header_b64}.{payload_b64}.{sig_b64}"
 
 
-def _hmac_sha256(data: bytes, key: bytes) -> bytes:
-    return hmac.new(key, data, hashlib.sha256).digest()
+class GatewayKeys:
+    """Ключи проверки gateway: `JWT_SECRET` (HS256) + JWKS auth-service."""
 
+    def __init__(
+        self, secret: str, jwks: JwksClient | None, accept_hs256: bool = True
+    ) -> None:
+        self.hs256 = _hs256(secret) if accept_hs256 else None
+        self.jwks = jwks
 
-def _split(token: str) -> tuple[str, str, str]:
-    parts = token.split(".")
-    if len(parts) != 3:
-        raise JwtError("Некорректный формат JWT")
-    return parts[0], parts[1], parts[2]
+    def key_for_header(self, header_b64: str) -> JwtKey | None:
+        if self.hs256 is not None and header_b64 == self.hs256.header_b64:
+            # Горячий путь: заголовок совпал побайтно — JSON не разбираем.
+            return self.hs256
+        alg, kid = parse_header(header_b64)
+        if alg == "HS256":
+            return self.hs256
+        if self.jwks is None or kid is None:
+            return None
+        key = self.jwks.get(kid)
+        return key if key is not None and key.alg == alg else None
 
 
-def _b64url_encode(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+@lru_cache(maxsize=8)
+def gateway_keys(
+    secret: str, jwks: JwksClient | None = None, accept_hs256: bool = True
+) -> GatewayKeys:
+    """GatewayKeys на (секрет, JWKS-клиент, HS256) — собирается один раз."""
+    return GatewayKeys(secret, jwks, accept_hs256)
 
 
-def _b64url_decode(data: str) -> bytes:
-    padding = "=" * (-len(data) % 4)
-    return base64.urlsafe_b64decode((data + padding).encode("ascii"))
+@lru_cache(maxsize=8)
+def _hs256(secret: str) -> JwtKey:
+    return JwtKey.hs256(secret)
@@ -0,0 +1,318 @@
+"""JWT (JWS compact): ключи, подпись, проверка.
+
+Модуль общий для auth-service (`auth_src/security/jwt_codec.py`) и
+api-gateway (`api_src/security/jwt_codec.py`): сервисы не импортируют друг
+друга, поэтому копии побайтно одинаковые — правка вносится в обе.
+
+Горячий путь собран заранее:
+
+• `JwtKey` при создании кодирует свой заголовок (`header_b64`) и готовит
+  ключ: HS256 — шаблон `hmac` с обработанным секретом (на токен только
+  `copy()`), EdDSA/ES256 — объект публичного ключа;
+• токен разбирается `partition` без промежуточного списка, JSON — orjson;
+• заголовки, не совпавшие с заранее собранными, разбираются один раз
+  (`parse_header`, ограниченный кэш).
+
+Ключ по заголовку выбирает вызывающий (`KeyResolver`): в auth — набор
+своих ключей, в gateway — `JWT_SECRET` + JWKS.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any, Protocol
+
+import orjson
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+
+ALGORITHMS = ("HS256", "EdDSA", "ES256")
+
+_ECDSA_SHA256 = ec.ECDSA(hashes.SHA256())
+_HEADER_CACHE_SIZE = 64
+_headers: dict[str, tuple[str | None, str | None]] = {}
+
+
+class JwtError(Exception):
+    """Ошибка валидации/парсинга JWT."""
+
+
+class KeyResolver(Protocol):
+    def key_for_header(self, header_b64: str) -> JwtKey | None:
+        """Ключ для заголовка токена; None — неизвестный ключ/алгоритм."""
+        ...
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class JwtKey:
+    """Ключ одного алгоритма; всё, что не зависит от токена, — в __init__."""
+
+    __slots__ = ("alg", "kid", "header_b64", "_hmac", "_private", "_public")
+
+    def __init__(
+        self,
+        alg: str,
+        kid: str | None,
+        *,
+        secret: bytes | None = None,
+        private: Any = None,
+        public: Any = None,
+    ) -> None:
+        if alg not in ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {alg}")
+        self.alg = alg
+        self.kid = kid
+        header: dict[str, str] = {"alg": alg, "typ": "JWT"}
+        if kid is not None:
+            header["kid"] = kid
+        # Ключи отсортированы — заголовок HS256 без kid совпадает побайтно с
+        # заголовком токенов, выпущенных до появления этого модуля.
+        self.header_b64 = b64url_encode(
+            orjson.dumps(header, option=orjson.OPT_SORT_KEYS)
+        )
+        self._hmac = None
+        self._private = private
+        self._public = public
+        if alg == "HS256":
+            if secret is None:
+                raise ValueError("HS256 key requires a secret")
+            self._hmac = hmac.new(secret, digestmod=hashlib.sha256)
+        elif public is None:
+            if private is None:
+                raise ValueError(f"{alg} key requires a private or public key")
+            self._public = private.public_key()
+
+    @classmethod
+    def hs256(cls, secret: str, kid: str | None = None) -> JwtKey:
+        return cls("HS256", kid, secret=secret.encode("utf-8"))
+
+    @classmethod
+    def from_private(cls, alg: str, kid: str, private: Any) -> JwtKey:
+        if alg == "EdDSA":
+            matches = isinstance(private, ed25519.Ed25519PrivateKey)
+        else:
+            matches = (
+                isinstance(private, ec.EllipticCurvePrivateKey)
+                and private.curve.name == "secp256r1"
+            )
+        if not matches:
+            raise ValueError(f"Key {kid!r} does not match JWT algorithm {alg}")
+        return cls(alg, kid, private=private)
+
+    @classmethod
+    def from_pem(cls, alg: str, kid: str, pem: str) -> JwtKey:
+        private = serialization.load_pem_private_key(pem.encode("ascii"), password=None)
+        return cls.from_private(alg, kid, private)
+
+    @classmethod
+    def generate(cls, alg: str, kid: str) -> JwtKey:
+        if alg == "EdDSA":
+            return cls(alg, kid, private=ed25519.Ed25519PrivateKey.generate())
+        return cls(alg, kid, private=ec.generate_private_key(ec.SECP256R1()))
+
+    @classmethod
+    def from_jwk(cls, jwk: Mapping[str, Any]) -> JwtKey | None:
+        """Ключ проверки из публичного JWK; None — тип не поддерживается."""
+        kty, crv, kid = jwk.get("kty"), jwk.get("crv"), jwk.get("kid")
+        if not isinstance(kid, str):
+            return None
+        if kty == "OKP" and crv == "Ed25519":
+            public: Any = ed25519.Ed25519PublicKey.from_public_bytes(
+                b64url_decode(jwk["x"])
+            )
+            return cls("EdDSA", kid, public=public)
+        if kty == "EC" and crv == "P-256":
+            public = ec.EllipticCurvePublicNumbers(
+                int.from_bytes(b64url_decode(jwk["x"]), "big"),
+                int.from_bytes(b64url_decode(jwk["y"]), "big"),
+                ec.SECP256R1(),
+            ).public_key()
+            return cls("ES256", kid, public=public)
+        return None
+
+    def sign(self, signing_input: bytes) -> bytes:
+        if self._hmac is not None:
+            mac = self._hmac.copy()
+            mac.update(signing_input)
+            return mac.digest()
+        if self._private is None:
+            raise ValueError(f"Key {self.kid!r} is verification-only")
+        if self.alg == "EdDSA":
+            return bytes(self._private.sign(signing_input))
+        r, s = decode_dss_signature(self._private.sign(signing_input, _ECDSA_SHA256))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        if self._hmac is not None:
+            mac = self._hmac.copy()
+            mac.update(signing_input)
+            return hmac.compare_digest(mac.digest(), signature)
+        try:
+            if self.alg == "EdDSA":
+                self._public.verify(signature, signing_input)
+            else:
+                if len(signature) != 64:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:32], "big"),
+                    int.from_bytes(signature[32:], "big"),
+                )
+                self._public.verify(der, signing_input, _ECDSA_SHA256)
+        except InvalidSignature:
+            return False
+        return True
+
+    def public_jwk(self) -> dict[str, str] | None:
+        """Публичный JWK (None для HS256 — секрет не публикуется)."""
+        if self.alg == "HS256":
+            return None
+        base = {"kid": str(self.kid), "alg": self.alg, "use": "sig"}
+        if self.alg == "EdDSA":
+            raw = self._public.public_bytes(
+                serialization.Encoding.Raw, serialization.PublicFormat.Raw
+            )
+            return {**base, "kty": "OKP", "crv": "Ed25519", "x": b64url_encode(raw)}
+        numbers = self._public.public_numbers()
+        return {
+            **base,
+            "kty": "EC",
+            "crv": "P-256",
+            "x": b64url_encode(numbers.x.to_bytes(32, "big")),
+            "y": b64url_encode(numbers.y.to_bytes(32, "big")),
+        }
+
+
+def parse_header(header_b64: str) -> tuple[str | None, str | None]:
+    """(alg, kid) заголовка; у одного ключа заголовок один, поэтому кэш."""
+    cached = _headers.get(header_b64)
+    if cached is not None:
+        return cached
+    try:
+        header = orjson.loads(b64url_decode(header_b64))
+    except ValueError:
+        raise JwtError("Некорректный заголовок JWT") from None
+    if not isinstance(header, dict):
+        raise JwtError("Некорректный заголовок JWT")
+    alg, kid = header.get("alg"), header.get("kid")
+    parsed = (
+        alg if isinstance(alg, str) else None,
+        kid if isinstance(kid, str) else None,
+    )
+    if len(_headers) >= _HEADER_CACHE_SIZE:
+        # Мусорные заголовки не должны раздувать кэш.
+        _headers.clear()
+    _headers[header_b64] = parsed
+    return parsed
+
+
+def encode(payload: Mapping[str, Any], key: JwtKey) -> str:
+    """JWT с заранее собранным заголовком ключа (`alg`, `kid`)."""
+    signing_input = f"{key.header_b64}.{b64url_encode(orjson.dumps(payload))}"
+    signature = key.sign(signing_input.encode("ascii"))
+    return f"{signing_input}.{b64url_encode(signature)}"
+
+
+def decode(
+    token: str,
+    *,
+    keys: KeyResolver,
+    issuer: str,
+    expected_token_type: str | None = None,
+    now: int | None = None,
+) -> dict[str, Any]:
+    """Проверить подпись и claims (`iss`, `exp`, `token_type`), вернуть payload."""
+    signing_input, _, sig_b64 = token.rpartition(".")
+    header_b64, _, payload_b64 = signing_input.partition(".")
+    if not header_b64 or not payload_b64 or "." in payload_b64:
+        raise JwtError("Некорректный формат JWT")
+    key = keys.key_for_header(header_b64)
+    if key is None:
+        raise JwtError("Неизвестный ключ подписи")
+    try:
+        valid = key.verify(signing_input.encode("ascii"), b64url_decode(sig_b64))
+    except ValueError:
+        raise JwtError("Некорректная подпись токена") from None
+    if not valid:
+        raise JwtError("Неверная подпись токена")
+
+    try:
+        payload = orjson.loads(b64url_decode(payload_b64))
+    except ValueError:
+        raise JwtError("Некорректный payload токена") from None
+    if not isinstance(payload, dict):
+        raise JwtError("Некорректный payload токена")
+    if payload.get("iss") != issuer:
+        raise JwtError("Неверный issuer")
+
+    exp = payload.get("exp")
+    if not isinstance(exp, int):
+        raise JwtError("Некорректный exp")
+    if (int(time.time()) if now is None else now) >= exp:
+        raise JwtError("Токен истёк")
+
+    if expected_token_type is not None:
+        if payload.get("token_type") != expected_token_type:
+            raise JwtError("Неверный тип токена")
+
+    return payload
+
+
+class _Memo:
+    """Ключи в пределах одной пачки: заголовок разрешается один раз."""
+
+    def __init__(self, keys: KeyResolver) -> None:
+        self._keys = keys
+        self._resolved: dict[str, JwtKey | None] = {}
+
+    def key_for_header(self, header_b64: str) -> JwtKey | None:
+        try:
+            return self._resolved[header_b64]
+        except KeyError:
+            key = self._resolved[header_b64] = self._keys.key_for_header(header_b64)
+            return key
+
+
+def verify_many(
+    tokens: Iterable[str],
+    *,
+    keys: KeyResolver,
+    issuer: str,
+    expected_token_type: str | None = None,
+) -> list[dict[str, Any] | JwtError]:
+    """Проверить пачку токенов: payload или JwtError на каждый, по порядку.
+
+    Время и ключи по заголовкам вычисляются один раз на пачку.
+    """
+    memo = _Memo(keys)
+    now = int(time.time())
+    results: list[dict[str, Any] | JwtError] = []
+    for token in tokens:
+        try:
+            results.append(
+                decode(
+                    token,
+                    keys=memo,
+                    issuer=issuer,
+                    expected_token_type=expected_token_type,
+                    now=now,
+                )
+            )
+        except JwtError as exc:
+            results.append(exc)
+    return results
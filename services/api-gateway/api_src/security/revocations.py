@@ -0,0 +1,160 @@
+"""Список отозванных access-JWT (push от auth-service через Redis Stream).
+
+Access-токен проверяется только подписью и `exp`, поэтому отозванная
+сессия иначе жила бы до `ACCESS_TTL`. auth-service пишет
+отзывы в stream `JWT_REVOCATION_STREAM` (поля записи — строки):
+
+    kind=jti   id=<jti>      exp=<exp токена>
+    kind=user  id=<user_id>  iat=<секунда до отзыва>  exp=<отзыв + access TTL>
+
+`user` отзывает все access-токены пользователя, выпущенные не позже `iat`.
+`iat` токенов — целые секунды, и auth публикует секунду до отзыва: токен,
+выданный в ту же секунду, что и отзыв (логин сразу после него), принимается.
+После `exp` запись не нужна — такие токены отклоняет проверка `exp`; auth
+обрезает stream по этому сроку (`XADD ... MINID`).
+
+Gateway держит отзывы в словарях: `is_revoked` — два поиска по ключу, без
+сети и без await. Истёкшие записи удаляются по куче сроков. При старте
+stream читается с начала (ресинк), затем фоновая задача ждёт новые записи
+(`XREAD BLOCK`) с последнего прочитанного id — после обрыва соединения
+ничего не теряется. Redis недоступен — токены проверяются без списка
+отзыва (как до него), задача переподключается.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """Отозванные jti и пользователи в памяти процесса (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        *,
+        redis: Any = None,
+        stream: str = "auth:revocations",
+        block_ms: int = 5_000,
+        batch_size: int = 1_000,
+        retry_delay_s: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.stream = stream
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self.retry_delay_s = retry_delay_s
+        self._redis = redis
+        self._clock = clock
+        self._jti: dict[str, float] = {}  # jti -> exp
+        self._users: dict[str, tuple[int, float]] = {}  # user_id -> (iat, exp)
+        self._expiry: list[tuple[float, str, str]] = []  # (exp, kind, id)
+        self._last_id: bytes | str = "0-0"
+        self._task: asyncio.Task[None] | None = None
+
+    def is_revoked(self, payload: Mapping[str, Any]) -> bool:
+        """Отозван ли токен с этими (уже проверенными) claims."""
+        if not self._jti and not self._users:
+            return False
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jti:
+            return True
+        user = self._users.get(payload.get("sub"))  # type: ignore[arg-type]
+        return user is not None and int(payload.get("iat", 0)) <= user[0]
+
+    def revoke_token(self, jti: str, *, exp: float) -> None:
+        if exp <= self._clock():
+            return
+        if exp > self._jti.get(jti, 0.0):
+            self._jti[jti] = exp
+            heapq.heappush(self._expiry, (exp, "jti", jti))
+
+    def revoke_user(self, user_id: str, *, iat: int, exp: float) -> None:
+        if exp <= self._clock():
+            return
+        prev_iat, prev_exp = self._users.get(user_id, (0, 0.0))
+        self._users[user_id] = (max(iat, prev_iat), max(exp, prev_exp))
+        if exp > prev_exp:
+            heapq.heappush(self._expiry, (exp, "user", user_id))
+
+    def prune(self) -> None:
+        """Удалить записи, чей срок прошёл."""
+        now = self._clock()
+        while self._expiry and self._expiry[0][0] <= now:
+            exp, kind, key = heapq.heappop(self._expiry)
+            if kind == "jti":
+                if self._jti.get(key, now) <= exp:
+                    self._jti.pop(key, None)
+            elif self._users.get(key, (0, now))[1] <= exp:
+                self._users.pop(key, None)
+
+    def apply(self, fields: Mapping[bytes, bytes]) -> None:
+        """Применить запись stream; некорректная пропускается."""
+        try:
+            kind = fields[b"kind"]
+            key = fields[b"id"].decode()
+            exp = float(fields[b"exp"])
+            if kind == b"jti":
+                self.revoke_token(key, exp=exp)
+            elif kind == b"user":
+                self.revoke_user(key, iat=int(fields[b"iat"]), exp=exp)
+            else:
+                raise ValueError(kind)
+        except (KeyError, ValueError, UnicodeDecodeError):
+            logger.warning("revocations: пропущена запись %r", fields)
+
+    async def start(self) -> None:
+        """Ресинк: прочитать stream целиком, затем слушать в фоне."""
+        if self._redis is None:
+            return
+        try:
+            while await self._poll(block_ms=None) >= self.batch_size:
+                pass
+        except Exception:
+            logger.warning("revocations: ресинк не удался", exc_info=True)
+        self._task = asyncio.create_task(self._loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self._poll(block_ms=self.block_ms)
+            except Exception:
+                logger.warning("revocations: чтение stream не удалось", exc_info=True)
+                await asyncio.sleep(self.retry_delay_s)
+
+    async def _poll(self, *, block_ms: int | None) -> int:
+        assert self._redis is not None
+        response = await self._redis.xread(
+            {self.stream: self._last_id}, count=self.batch_size, block=block_ms
+        )
+        read = 0
+        for _stream, entries in response or ():
+            for entry_id, fields in entries:
+                self.apply(fields)
+                self._last_id = entry_id
+                read += 1
+        self.prune()
+        return read
+
+
+def create_revocation_list(settings: Settings) -> RevocationList:
+    redis = None
+    if settings.redis_url:
+        from redis import asyncio as redis_async
+
+        redis = redis_async.from_url(settings.redis_url)
+    return RevocationList(redis=redis, stream=settings.jwt_revocation_stream)
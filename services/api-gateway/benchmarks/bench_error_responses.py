@@ -0,0 +1,153 @@
+"""Стоимость горячих ответов-ошибок (429/401) под флудом.
+
+Два замера:
+
+1. `render+send` — только сборка и отправка ответа 429:
+   - `pydantic` — как было: `ErrorResponse(...).model_dump()` →
+     `JSONResponse` → распаковка в сырые ASGI-сообщения;
+   - `template` — `ErrorTemplate.send()` (заранее собранный префикс + orjson).
+2. `flood` — полный проход middleware-цепочки гейтвея
+   (RequestContext + Auth + RateLimit), когда лимит клиента уже исчерпан
+   и каждый запрос получает 429.
+
+Запуск (из каталога сервиса):
+
+    python -m benchmarks.bench_error_responses --requests 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api_src.errors.fast_errors import ErrorTemplate
+from api_src.errors.http_errors import ErrorResponse
+from api_src.middleware.auth import AuthMiddleware
+from api_src.middleware.rate_limit import RateLimitMiddleware
+from api_src.middleware.request_context import RequestContextMiddleware
+
+MAX_REQUESTS = 100
+WINDOW_SECONDS = 60
+
+
+async def _legacy_429(send: Send, trace_id: str, details: dict[str, object]) -> None:
+    response = JSONResponse(
+        status_code=429,
+        content=ErrorResponse(
+            code="RATE_LIMIT_EXCEEDED",
+            message=f"Превышен лимит: {MAX_REQUESTS} за {WINDOW_SECONDS} сек",
+            trace_id=trace_id,
+            details=details,
+        ).model_dump(),
+    )
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": bytes(response.body)})
+
+
+async def _noop_send(message: Message) -> None:
+    return None
+
+
+async def _noop_receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _bench_render(requests: int) -> dict[str, float]:
+    template = ErrorTemplate(
+        429,
+        "RATE_LIMIT_EXCEEDED",
+        f"Превышен лимит: {MAX_REQUESTS} за {WINDOW_SECONDS} сек",
+    )
+    trace_id = str(uuid.uuid4())
+    details: dict[str, object] = {
+        "operation_id": str(uuid.uuid4()),
+        "client_ip": "10.0.0.1",
+        "limit": MAX_REQUESTS,
+        "window": WINDOW_SECONDS,
+    }
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await _legacy_429(_noop_send, trace_id, details)
+    pydantic_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await template.send(
+            _noop_send,
+            trace_id=trace_id,
+            details=details,
+            headers=[(b"retry-after", b"60")],
+        )
+    template_elapsed = time.perf_counter() - started
+    return {"pydantic": pydantic_elapsed, "template": template_elapsed}
+
+
+async def _endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _scope() -> Scope:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/healthz",
+        "headers": [
+            (b"host", b"gateway"),
+            (b"user-agent", b"flood"),
+            (b"x-forwarded-for", b"10.0.0.1"),
+        ],
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+async def _bench_flood(requests: int) -> float:
+    app: ASGIApp = RateLimitMiddleware(
+        _endpoint, max_requests=MAX_REQUESTS, window_seconds=WINDOW_SECONDS
+    )
+    app = AuthMiddleware(app)
+    app = RequestContextMiddleware(app)
+
+    # Исчерпываем лимит клиента — дальше каждый запрос получает 429.
+    for _ in range(MAX_REQUESTS):
+        await app(_scope(), _noop_receive, _noop_send)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(_scope(), _noop_receive, _noop_send)
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    n = args.requests
+    print(f"requests={n}")
+    print(f"{'case':<22} {'µs/response':>12} {'responses/s':>12}")
+    results = {
+        f"render+send {name}": elapsed
+        for name, elapsed in (await _bench_render(n)).items()
+    }
+    results["flood 429 (chain)"] = await _bench_flood(n)
+    for case, elapsed in results.items():
+        print(f"{case:<22} {elapsed / n * 1e6:>12.2f} {n / elapsed:>12.0f}")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parse_args()))
@@ -0,0 +1,150 @@
+"""Выпуск и проверка JWT (`security/jwt_codec.py`) по алгоритмам подписи.
+
+Для каждого алгоритма меряется:
+
+- `issue`  — `encode` access-токена активным ключом (как в auth-service);
+- `verify` — `decode_and_verify` как в `AuthMiddleware`: HS256 по
+  `JWT_SECRET`, ES256/EdDSA по ключу из JWKS;
+- `batch`  — `verify_many` пачками по `--batch` токенов.
+
+`HS256-legacy` — прежняя реализация (json.dumps с sort_keys, новый
+`hmac.new` и `str.split` на каждый токен) для сравнения. JWKS отдаётся через
+`httpx.MockTransport` и загружается до замера: в замер попадает только
+горячий путь (поиск ключа по заголовку + подпись/проверка).
+
+Запуск (из каталога сервиса):
+
+    python -m benchmarks.bench_jwt --tokens 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+
+from api_src.security.jwks import JwksClient
+from api_src.security.jwt import decode_and_verify, gateway_keys
+from api_src.security.jwt_codec import JwtKey, encode, verify_many
+
+SECRET = "bench-secret"
+ISSUER = "bench"
+
+
+def _claims() -> dict[str, Any]:
+    now = int(time.time())
+    return {
+        "iss": ISSUER,
+        "sub": str(uuid.uuid4()),
+        "workspace_id": str(uuid.uuid4()),
+        "token_type": "access",
+        "iat": now,
+        "exp": now + 3600,
+    }
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _legacy_issue(payload: dict[str, Any]) -> str:
+    header_b64 = _b64(
+        json.dumps(
+            {"alg": "HS256", "typ": "JWT"}, separators=(",", ":"), sort_keys=True
+        ).encode("utf-8")
+    )
+    payload_b64 = _b64(
+        json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    )
+    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+    sig = hmac.new(SECRET.encode("utf-8"), signing_input, hashlib.sha256).digest()
+    return f"{header_b64}.{payload_b64}.{_b64(sig)}"
+
+
+def _legacy_verify(token: str) -> dict[str, Any]:
+    header_b64, payload_b64, sig_b64 = token.split(".")
+    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+    expected = hmac.new(SECRET.encode("utf-8"), signing_input, hashlib.sha256).digest()
+    sig = base64.urlsafe_b64decode(sig_b64 + "=" * (-len(sig_b64) % 4))
+    if not hmac.compare_digest(sig, expected):
+        raise ValueError("signature")
+    raw = base64.urlsafe_b64decode(payload_b64 + "=" * (-len(payload_b64) % 4))
+    payload: dict[str, Any] = json.loads(raw)
+    if payload.get("iss") != ISSUER or int(time.time()) >= payload["exp"]:
+        raise ValueError("claims")
+    return payload
+
+
+def _ops(fn: Callable[[], object], n: int) -> float:
+    for _ in range(min(1_000, n)):
+        fn()
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - started)
+
+
+def _measure(
+    key: JwtKey, claims: dict[str, Any], jwks: JwksClient, n: int, batch: int
+) -> tuple[float, float, float]:
+    """(issue/s, verify/s, verify/s в пачках) для одного ключа."""
+    token = encode(claims, key)
+    tokens = [token] * batch
+    keys = gateway_keys(SECRET, jwks)
+    issue = _ops(lambda: encode(claims, key), n)
+    verify = _ops(
+        lambda: decode_and_verify(token, secret=SECRET, issuer=ISSUER, jwks=jwks), n
+    )
+    batches = _ops(
+        lambda: verify_many(tokens, keys=keys, issuer=ISSUER), max(1, n // batch)
+    )
+    return issue, verify, batches * batch
+
+
+async def main(args: argparse.Namespace) -> None:
+    signers = {
+        "HS256": JwtKey.hs256(SECRET),
+        "ES256": JwtKey.generate("ES256", "ec"),
+        "EdDSA": JwtKey.generate("EdDSA", "ed"),
+    }
+    body = {"keys": [jwk for k in signers.values() if (jwk := k.public_jwk())]}
+    jwks = JwksClient(
+        "http://auth/v1/auth/.well-known/jwks.json",
+        transport=httpx.MockTransport(lambda _: httpx.Response(200, json=body)),
+    )
+    await jwks.refresh()
+    n, batch = args.tokens, args.batch
+
+    print(f"tokens={n} batch={batch}")
+    print(f"{'alg':<13} {'issue/s':>10} {'verify/s':>10} {'batch/s':>10}")
+
+    claims = _claims()
+    token = _legacy_issue(claims)
+    issue = _ops(lambda: _legacy_issue(claims), n)
+    verify = _ops(lambda: _legacy_verify(token), n)
+    print(f"{'HS256-legacy':<13} {issue:>10.0f} {verify:>10.0f} {'-':>10}")
+
+    for alg, key in signers.items():
+        issue, verify, batches = _measure(key, claims, jwks, n, batch)
+        print(f"{alg:<13} {issue:>10.0f} {verify:>10.0f} {batches:>10.0f}")
+    await jwks.aclose()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=100)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parse_args()))
@@ -0,0 +1,129 @@
+"""Накладные расходы middleware-цепочки гейтвея на один запрос.
+
+Сравнивает две цепочки поверх пустого ASGI-приложения (ответ 200 без тела):
+
+- `legacy` — TraceId + OperationId + Auth + RateLimit (как было до
+  `RequestContextMiddleware`);
+- `fused`  — RequestContext + Auth + RateLimit (текущая цепочка в main.py).
+
+Запрос авторизованный (валидный access-JWT), без `X-Operation-Id` — id
+генерируется на каждый запрос. Сеть и HTTP-парсинг не участвуют: меряется
+только код middleware.
+
+Запуск (из каталога сервиса):
+
+    python -m benchmarks.bench_request_context --requests 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api_src.config.settings import Settings
+from api_src.middleware.auth import AuthMiddleware
+from api_src.middleware.operation_id import OperationIdMiddleware
+from api_src.middleware.rate_limit import RateLimitMiddleware
+from api_src.middleware.request_context import RequestContextMiddleware
+from api_src.middleware.trace_id import TraceIdMiddleware
+from api_src.security.jwt import issue_access_token
+
+
+async def _endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _build(chain: str) -> ASGIApp:
+    # Порядок как в create_app: первый в списке — внутренний.
+    # window_seconds=0: список timestamp'ов не растёт и не искажает замер.
+    app: ASGIApp = RateLimitMiddleware(_endpoint, window_seconds=0)
+    if chain == "legacy":
+        app = TraceIdMiddleware(app)
+        app = OperationIdMiddleware(app)
+        app = AuthMiddleware(app)
+    else:
+        app = AuthMiddleware(app)
+        app = RequestContextMiddleware(app)
+    return app
+
+
+def _scope(app_state: Any, token: str) -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/v1/bots",
+        "raw_path": b"/v1/bots",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"gateway"),
+            (b"user-agent", b"bench"),
+            (b"accept", b"application/json"),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"x-forwarded-for", b"10.0.0.1"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("gateway", 8000),
+        "app": app_state,
+    }
+
+
+async def _run(chain: str, requests: int, token: str, app_state: Any) -> float:
+    app = _build(chain)
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        return None
+
+    # Прогрев.
+    for _ in range(min(1_000, requests)):
+        await app(_scope(app_state, token), receive, send)
+
+    app = _build(chain)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(_scope(app_state, token), receive, send)
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings = Settings(jwt_secret="bench-secret", jwt_issuer="bench")
+    app_state = SimpleNamespace(state=SimpleNamespace(settings=settings))
+    token = issue_access_token(
+        secret=settings.jwt_secret,
+        issuer=settings.jwt_issuer,
+        user_id=uuid.uuid4(),
+        workspace_id=uuid.uuid4(),
+        ttl_seconds=3600,
+    )
+
+    print(f"requests={args.requests}")
+    print(f"{'chain':<8} {'µs/request':>12} {'requests/s':>12}")
+    for chain in ("legacy", "fused"):
+        elapsed = await _run(chain, args.requests, token, app_state)
+        print(
+            f"{chain:<8} {elapsed / args.requests * 1e6:>12.2f} "
+            f"{args.requests / elapsed:>12.0f}"
+        )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parse_args()))
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import base64
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from api_src.config.settings import Settings
+from api_src.main import create_app
+from api_src.security.jwks import JwksClient
+from api_src.security.jwt import JwtError, decode_and_verify, issue_access_token
+
+JWKS_URL = "http://auth/v1/auth/.well-known/jwks.json"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _ed25519(kid: str) -> tuple[ed25519.Ed25519PrivateKey, dict[str, str]]:
+    key = ed25519.Ed25519PrivateKey.generate()
+    raw = key.public_key().public_bytes(
+        serialization.Encoding.Raw, serialization.PublicFormat.Raw
+    )
+    return key, {
+        "kid": kid,
+        "alg": "EdDSA",
+        "kty": "OKP",
+        "crv": "Ed25519",
+        "x": _b64(raw),
+    }
+
+
+def _token(key: ed25519.Ed25519PrivateKey, kid: str) -> str:
+    now = int(time.time())
+    header = _b64(json.dumps({"alg": "EdDSA", "kid": kid, "typ": "JWT"}).encode())
+    payload = _b64(
+        json.dumps(
+            {
+                "iss": "issuer",
+                "sub": str(uuid.uuid4()),
+                "workspace_id": str(uuid.uuid4()),
+                "token_type": "access",
+                "iat": now,
+                "exp": now + 60,
+            }
+        ).encode()
+    )
+    signature = key.sign(f"{header}.{payload}".encode("ascii"))
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+def test_eddsa_token_is_verified_by_jwks() -> None:
+    key, jwk = _ed25519("k1")
+    app = create_app(
+        Settings(
+            readiness_strict=False,
+            proxy_enabled=False,
+            jwt_issuer="issuer",
+            jwt_jwks_url=JWKS_URL,
+        )
+    )
+    app.state.jwks = JwksClient(
+        JWKS_URL,
+        transport=httpx.MockTransport(
+            lambda _: httpx.Response(200, json={"keys": [jwk]})
+        ),
+    )
+    other, _ = _ed25519("k1")
+
+    # lifespan загружает JWKS до первого запроса.
+    with TestClient(app) as client:
+        ok = client.get(
+            "/v1/bots/x", headers={"Authorization": f"Bearer {_token(key, 'k1')}"}
+        )
+        forged = client.get(
+            "/v1/bots/x", headers={"Authorization": f"Bearer {_token(other, 'k1')}"}
+        )
+
+    assert ok.status_code == 501  # proxy выключен, но токен принят
+    assert forged.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_refresh_and_failures_keep_keys() -> None:
+    key1, jwk1 = _ed25519("k1")
+    key2, jwk2 = _ed25519("k2")
+    keys = [jwk1]
+    status = {"code": 200}
+
+    def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(status["code"], json={"keys": keys})
+
+    jwks = JwksClient(
+        JWKS_URL, min_refresh_interval_s=0, transport=httpx.MockTransport(handler)
+    )
+    await jwks.refresh()
+    decode_and_verify(_token(key1, "k1"), secret="s", issuer="issuer", jwks=jwks)
+
+    # Ротация на стороне auth: новый kid отклоняется, но запускает обновление.
+    keys.append(jwk2)
+    with pytest.raises(JwtError):
+        decode_and_verify(_token(key2, "k2"), secret="s", issuer="issuer", jwks=jwks)
+    assert jwks._pending is not None
+    await jwks._pending
+    decode_and_verify(_token(key2, "k2"), secret="s", issuer="issuer", jwks=jwks)
+
+    # Сбой JWKS не сбрасывает уже загруженные ключи.
+    status["code"] = 503
+    await jwks.refresh()
+    assert jwks.get("k2") is not None
+    await jwks.aclose()
+
+
+def test_hs256_rejected_under_asymmetric_algorithm() -> None:
+    token = issue_access_token(
+        secret="s",
+        issuer="issuer",
+        user_id=uuid.uuid4(),
+        workspace_id=uuid.uuid4(),
+        ttl_seconds=60,
+    )
+
+    def status(**settings: object) -> int:
+        app = create_app(
+            Settings(
+                readiness_strict=False,
+                proxy_enabled=False,
+                jwt_secret="s",
+                jwt_issuer="issuer",
+                **settings,  # type: ignore[arg-type]
+            )
+        )
+        with TestClient(app) as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            return client.get("/v1/bots/x", headers=headers).status_code
+
+    assert status() == 501
+    assert status(jwt_algorithm="EdDSA") == 401
+    # Окно миграции: старые HS256-токены ещё принимаются.
+    assert status(jwt_algorithm="EdDSA", jwt_accept_hs256=True) == 501
+    assert status(jwt_accept_hs256=False) == 401
+
+
+def test_default_secret_refused_outside_local() -> None:
+    Settings(app_env="test")
+    Settings(app_env="prod", jwt_algorithm="EdDSA")
+    Settings(app_env="prod", jwt_secret="s")
+    with pytest.raises(ValidationError):
+        Settings(app_env="prod")
+    with pytest.raises(ValidationError):
+        Settings(app_env="prod", jwt_algorithm="EdDSA", jwt_accept_hs256=True)
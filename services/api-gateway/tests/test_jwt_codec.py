@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from pathlib import Path
+
+from api_src.security import jwt_codec
+from api_src.security.jwt import decode_and_verify, gateway_keys
+from api_src.security.jwt_codec import JwtError, JwtKey, encode, verify_many
+
+SERVICES = Path(__file__).resolve().parents[2]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _dumps(obj: dict[str, object]) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode()
+
+
+def _claims(**extra: object) -> dict[str, object]:
+    now = int(time.time())
+    return {"iss": "issuer", "token_type": "access", "exp": now + 60, **extra}
+
+
+def test_token_in_previous_format_is_accepted() -> None:
+    # Формат до jwt_codec: json.dumps(sort_keys=True) и hmac.new на токен.
+    header = _b64(_dumps({"typ": "JWT", "alg": "HS256"}))
+    payload = _b64(_dumps(_claims(sub="u")))
+    sig = hmac.new(b"s", f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    token = f"{header}.{payload}.{_b64(sig)}"
+
+    assert header == JwtKey.hs256("s").header_b64
+    assert decode_and_verify(token, secret="s", issuer="issuer")["sub"] == "u"
+
+
+def test_verify_many_reports_each_token() -> None:
+    key = JwtKey.hs256("s")
+    ok = encode(_claims(sub="a"), key)
+    expired = encode(_claims(exp=int(time.time()) - 1), key)
+    foreign = encode(_claims(), JwtKey.generate("EdDSA", "k1"))
+
+    results = verify_many(
+        [ok, expired, foreign, "garbage"],
+        keys=gateway_keys("s"),
+        issuer="issuer",
+        expected_token_type="access",
+    )
+
+    assert isinstance(results[0], dict) and results[0]["sub"] == "a"
+    assert [str(r) for r in results[1:]] == [
+        "Токен истёк",
+        "Неизвестный ключ подписи",
+        "Некорректный формат JWT",
+    ]
+    assert all(isinstance(r, JwtError) for r in results[1:])
+
+
+def test_codec_matches_auth_service_copy() -> None:
+    # Сервисы не импортируют друг друга: копии в auth и gateway побайтно равны.
+    auth_copy = SERVICES / "auth-service" / "auth_src" / "security" / "jwt_codec.py"
+    assert Path(jwt_codec.__file__).read_bytes() == auth_copy.read_bytes(), (
+        "api_src/security/jwt_codec.py и auth_src/security/jwt_codec.py "
+        "разошлись: правка вносится в обе копии"
+    )
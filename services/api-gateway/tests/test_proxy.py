@@ -0,0 +1,151 @@
+"""Проксирование /v1/* в downstream-сервисы."""
+
+from __future__ import annotations
+
+import gzip
+import uuid
+from typing import Any
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api_src.config.settings import Settings
+from api_src.main import create_app
+from api_src.security.jwt import issue_access_token
+
+
+def test_proxy_streams_ndjson_without_decoding(monkeypatch: pytest.MonkeyPatch) -> None:
+    raw = gzip.compress(b'{"type": "end"}\n')
+
+    async def _chunks() -> Any:
+        yield raw
+
+    def _upstream(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={
+                "content-type": "application/x-ndjson",
+                "content-encoding": "gzip",
+            },
+            content=_chunks(),
+        )
+
+    real_client = httpx.AsyncClient
+
+    def _client(**kwargs: Any) -> httpx.AsyncClient:
+        return real_client(transport=httpx.MockTransport(_upstream), **kwargs)
+
+    monkeypatch.setattr("api_src.entrypoints.http.routes_v1.httpx.AsyncClient", _client)
+    app = create_app(
+        Settings(readiness_strict=False, proxy_enabled=True, jwt_secret="test")
+    )
+    token = issue_access_token(
+        secret="test",
+        issuer=app.state.settings.jwt_issuer,
+        user_id=uuid.uuid4(),
+        workspace_id=uuid.uuid4(),
+        ttl_seconds=60,
+    )
+
+    with TestClient(app).stream(
+        "GET",
+        "/v1/conversations/export",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as r:
+        body = b"".join(r.iter_raw())
+
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert body == raw
+
+
+def test_proxy_without_accept_encoding_gets_identity(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Клиент без Accept-Encoding не получает сжатый поток."""
+    body = b'{"type": "end"}\n'
+    seen: list[str | None] = []
+
+    async def _chunks(data: bytes) -> Any:
+        yield data
+
+    def _upstream(request: httpx.Request) -> httpx.Response:
+        # Как conversations-service: сжимает, только если gzip принят.
+        accept = request.headers.get("accept-encoding")
+        seen.append(accept)
+        if accept and "gzip" in accept:
+            return httpx.Response(
+                200,
+                headers={
+                    "content-type": "application/x-ndjson",
+                    "content-encoding": "gzip",
+                },
+                content=_chunks(gzip.compress(body)),
+            )
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/x-ndjson"},
+            content=_chunks(body),
+        )
+
+    real_client = httpx.AsyncClient
+
+    def _client(**kwargs: Any) -> httpx.AsyncClient:
+        return real_client(transport=httpx.MockTransport(_upstream), **kwargs)
+
+    monkeypatch.setattr("api_src.entrypoints.http.routes_v1.httpx.AsyncClient", _client)
+    app = create_app(
+        Settings(readiness_strict=False, proxy_enabled=True, jwt_secret="test")
+    )
+    token = issue_access_token(
+        secret="test",
+        issuer=app.state.settings.jwt_issuer,
+        user_id=uuid.uuid4(),
+        workspace_id=uuid.uuid4(),
+        ttl_seconds=60,
+    )
+    client = TestClient(app)
+    # TestClient (httpx) по умолчанию шлёт gzip — как curl без --compressed
+    # убираем заголовок совсем.
+    del client.headers["accept-encoding"]
+
+    with client.stream(
+        "GET",
+        "/v1/conversations/export",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as r:
+        raw = b"".join(r.iter_raw())
+
+    assert seen == ["identity"]
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert raw == body
+
+
+def test_proxy_appends_client_address_to_forwarded_for(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """auth-service видит адрес клиента gateway последним хопом XFF."""
+    seen: list[str | None] = []
+
+    def _upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("x-forwarded-for"))
+        return httpx.Response(401, json={"code": "INVALID_CREDENTIALS"})
+
+    real_client = httpx.AsyncClient
+
+    def _client(**kwargs: Any) -> httpx.AsyncClient:
+        return real_client(transport=httpx.MockTransport(_upstream), **kwargs)
+
+    monkeypatch.setattr("api_src.entrypoints.http.routes_v1.httpx.AsyncClient", _client)
+    client = TestClient(
+        create_app(Settings(readiness_strict=False, proxy_enabled=True))
+    )
+    login = {"email": "a@x.io", "password": "password1"}
+
+    client.post("/v1/auth/login", json=login)
+    client.post("/v1/auth/login", json=login, headers={"X-Forwarded-For": "6.6.6.6"})
+
+    # Адрес соединения TestClient — "testclient"; присланное клиентом — левее.
+    assert seen == ["testclient", "6.6.6.6, testclient"]
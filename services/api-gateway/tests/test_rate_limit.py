@@ -0,0 +1,20 @@
+"""Rate limit gateway: 429 с Retry-After."""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from api_src.config.settings import Settings
+from api_src.main import create_app
+
+
+def test_rate_limit_returns_429_with_retry_after() -> None:
+    app = create_app(Settings(readiness_strict=False, proxy_enabled=False))
+    client = TestClient(app)
+    for _ in range(100):
+        assert client.get("/healthz").status_code == 200
+    r = client.get("/healthz")
+    assert r.status_code == 429
+    assert r.json()["code"] == "RATE_LIMIT_EXCEEDED"
+    assert int(r.headers["Retry-After"]) >= 1
+    assert r.headers.get("X-Trace-Id")
@@ -0,0 +1,54 @@
+"""Trace/operation id (uuid7) и заранее собранные ответы об ошибках."""
+
+from __future__ import annotations
+
+import time
+import uuid
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from api_src.config.settings import Settings
+from api_src.errors.fast_errors import ErrorTemplate
+from api_src.errors.http_errors import ErrorResponse
+from api_src.main import create_app
+from api_src.middleware.request_context import uuid7
+
+
+def test_generated_ids_are_time_ordered_uuid7() -> None:
+    app = create_app(Settings(readiness_strict=False, proxy_enabled=False))
+    client = TestClient(app)
+    r = client.get("/healthz")
+    trace_id = uuid.UUID(r.headers["X-Trace-Id"])
+    operation_id = uuid.UUID(r.headers["X-Operation-Id"])
+    assert trace_id.version == 7
+    assert operation_id.version == 7
+    # Первые 48 бит — unix-время в мс.
+    now_ms = time.time_ns() // 1_000_000
+    assert abs(int(trace_id.hex[:12], 16) - now_ms) < 60_000
+    assert uuid.UUID(uuid7()).version == 7
+
+
+def test_unauthorized_response_has_context_headers() -> None:
+    app = create_app(Settings(readiness_strict=False, proxy_enabled=False))
+    client = TestClient(app)
+    r = client.get("/v1/bots", headers={"X-Trace-Id": "trace-401"})
+    assert r.status_code == 401
+    assert r.headers["X-Trace-Id"] == "trace-401"
+    assert r.json()["trace_id"] == "trace-401"
+    assert r.headers.get("X-Operation-Id")
+
+
+def test_error_template_matches_error_response() -> None:
+    template = ErrorTemplate(401, "UNAUTHORIZED", "Нет токена")
+    details = {"operation_id": str(uuid.uuid4())}
+    expected = JSONResponse(
+        status_code=401,
+        content=ErrorResponse(
+            code="UNAUTHORIZED",
+            message="Нет токена",
+            trace_id="trace",
+            details=details,
+        ).model_dump(),
+    ).body
+    assert template.render("trace", details) == expected
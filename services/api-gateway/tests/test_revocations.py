@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_src.config.settings import Settings
+from api_src.main import create_app
+from api_src.security.jwt import decode_and_verify, issue_access_token
+from api_src.security.revocations import RevocationList
+
+
+def _seq(entry_id: bytes | str) -> int:
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode("ascii")
+    return int(entry_id.split("-")[0])
+
+
+class _Stream:
+    """Redis с одним stream: `xread` отдаёт записи после переданного id."""
+
+    def __init__(self, entries: list[dict[bytes, bytes]]) -> None:
+        self.entries = [(f"{i + 1}-0".encode(), e) for i, e in enumerate(entries)]
+
+    async def xread(
+        self, streams: dict[str, Any], count: int, block: int | None
+    ) -> list[Any]:
+        (last_id,) = streams.values()
+        after = _seq(last_id)
+        batch = [e for e in self.entries if _seq(e[0]) > after][:count]
+        if not batch:
+            await asyncio.sleep(0.01 if block else 0)
+            return []
+        return [(b"auth:revocations", batch)]
+
+    async def aclose(self) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_startup_resync_and_expiry() -> None:
+    now = [1000.0]
+    stream = _Stream(
+        [
+            {b"kind": b"jti", b"id": b"j1", b"exp": b"1100"},
+            {b"kind": b"jti", b"id": b"old", b"exp": b"900"},  # уже истёк
+            {b"kind": b"user", b"id": b"u1", b"iat": b"990", b"exp": b"1890"},
+            {b"kind": b"bogus"},
+        ]
+    )
+    revocations = RevocationList(redis=stream, batch_size=2, clock=lambda: now[0])
+    await revocations.start()
+
+    assert revocations.is_revoked({"jti": "j1", "sub": "u2", "iat": 995})
+    assert not revocations.is_revoked({"jti": "old", "sub": "u2", "iat": 995})
+    # Отзыв пользователя — только для токенов, выпущенных до него.
+    assert revocations.is_revoked({"jti": "j2", "sub": "u1", "iat": 990})
+    assert not revocations.is_revoked({"jti": "j3", "sub": "u1", "iat": 991})
+
+    # Новая запись приходит в фоновую задачу.
+    stream.entries.append((b"5-0", {b"kind": b"jti", b"id": b"j4", b"exp": b"1200"}))
+    for _ in range(100):
+        if revocations.is_revoked({"jti": "j4"}):
+            break
+        await asyncio.sleep(0.01)
+    assert revocations.is_revoked({"jti": "j4"})
+
+    now[0] = 1150
+    revocations.prune()
+    assert revocations._jti == {"j4": 1200}
+    assert "u1" in revocations._users
+    await revocations.aclose()
+
+
+def test_revoked_token_is_rejected_by_middleware() -> None:
+    app = create_app(
+        Settings(
+            readiness_strict=False,
+            proxy_enabled=False,
+            jwt_secret="test",
+            jwt_issuer="issuer",
+        )
+    )
+    client = TestClient(app)
+
+    def token() -> str:
+        return issue_access_token(
+            secret="test",
+            issuer="issuer",
+            user_id=uuid.UUID(int=1),
+            workspace_id=uuid.uuid4(),
+            ttl_seconds=60,
+        )
+
+    revoked, other = token(), token()
+    claims = decode_and_verify(revoked, secret="test", issuer="issuer")
+    app.state.revocations.revoke_token(claims["jti"], exp=claims["exp"])
+
+    r = client.get("/v1/bots/x", headers={"Authorization": f"Bearer {revoked}"})
+    assert r.status_code == 401
+    assert r.json()["message"] == "Токен отозван"
+    ok = client.get("/v1/bots/x", headers={"Authorization": f"Bearer {other}"})
+    assert ok.status_code == 501
+
+    # Отзыв пользователя закрывает все уже выданные ему токены.
+    app.state.revocations.revoke_user(
+        str(uuid.UUID(int=1)), iat=int(time.time()), exp=time.time() + 60
+    )
+    r = client.get("/v1/bots/x", headers={"Authorization": f"Bearer {other}"})
+    assert r.status_code == 401
@@ -41,8 +41,12 @@ class AuditLog(Base):
     )
 
     changes: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    # Ключ секционирования (RANGE по месяцам), поэтому входит в PK.
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
     )
 
     __table_args__ = (
@@ -53,4 +57,5 @@ class AuditLog(Base):
             "resource_type",
             "resource_id",
         ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
@@ -50,6 +50,7 @@ class User(Base):
     )
 
     workspace: Mapped[Workspace] = relationship(back_populates="users")
+    invites: Mapped[list[UserInvite]] = relationship(back_populates="user")
     refresh_tokens: Mapped[list[RefreshToken]] = relationship(back_populates="user")
 
 
@@ -71,6 +72,11 @@ class RefreshToken(Base):
     workspace_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), nullable=False, index=True
     )
+    # Семейство: все токены одной цепочки ротаций от логина/регистрации.
+    # Повторное использование отозванного токена отзывает всё семейство.
+    family_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), nullable=False, index=True
+    )
 
     issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(
@@ -84,4 +90,43 @@ class RefreshToken(Base):
 
     __table_args__ = (
         Index("ix_refresh_tokens_workspace_user", "workspace_id", "user_id"),
+        # Keyset-удаление истёкших/отозванных (adapters/db/refresh_token_gc.py).
+        Index("ix_refresh_tokens_expires_at", "expires_at", "id"),
+        Index(
+            "ix_refresh_tokens_revoked_at",
+            "revoked_at",
+            "id",
+            postgresql_where=revoked_at.isnot(None),
+        ),
+    )
+
+
+class UserInvite(Base):
+    """Инвайт: одноразовый токен, по которому пользователь задаёт пароль.
+
+    Хранится только SHA-256 токена; сам токен отдаётся один раз при создании.
+    """
+
+    __tablename__ = "user_invites"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
     )
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    accepted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    user: Mapped[User] = relationship(back_populates="invites")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .partitions import MonthlyPartitionManager, RetentionPolicy
+
+logger = logging.getLogger(__name__)
+
+TABLE = "refresh_tokens"
+
+
+@dataclass
+class RefreshTokenGcReport:
+    partitioned: bool = False
+    created: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    expired_rows: int = 0
+    revoked_rows: int = 0
+
+
+class RefreshTokenCollector:
+    """Удаление ненужных строк refresh_tokens.
+
+    • истёкшие (`expires_at < now`) — токен уже не примет ни один refresh;
+    • отозванные раньше `revoked_retention_days` назад. Пока строка отозванного
+      токена есть, его повторное предъявление отзывает семейство
+      (use_cases/refresh_tokens.py) — срок задаёт окно reuse detection.
+
+    Удаление — короткими транзакциями по `batch_size` строк, keyset по
+    `(expires_at, id)` / `(revoked_at, id)`: каждый батч продолжает с места
+    предыдущего и не пересканирует мёртвые записи индекса, строки, занятые
+    параллельным refresh, пропускаются (`SKIP LOCKED`) до следующего запуска.
+
+    Если таблица секционирована по `expires_at` (миграция 0005 с
+    `-x partition_refresh_tokens=true`), целиком истёкшие месяцы удаляются
+    DROP секции, а секции вперёд досоздаются.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        revoked_retention_days: int,
+        batch_size: int = 1_000,
+        premake_months: int = 3,
+    ) -> None:
+        self.engine = engine
+        self.revoked_retention_days = revoked_retention_days
+        self.batch_size = max(1, batch_size)
+        self.premake_months = premake_months
+        self.partitions = MonthlyPartitionManager(
+            engine, TABLE, column="expires_at", delete_batch_size=batch_size
+        )
+
+    async def run(
+        self, *, now: datetime | None = None, dry_run: bool = False
+    ) -> RefreshTokenGcReport:
+        now = now or datetime.now(timezone.utc)
+        report = RefreshTokenGcReport()
+        if await self.partitions.is_partitioned():
+            report.partitioned = True
+            report.created = await self.partitions.ensure_partitions(
+                months_ahead=self.premake_months, now=now, dry_run=dry_run
+            )
+            # default_days=0: секция удаляется, когда истёк весь её месяц.
+            report.dropped = await self.partitions.remove_expired_partitions(
+                RetentionPolicy(default_days=0), now=now, dry_run=dry_run
+            )
+        report.expired_rows = await self._delete("expires_at", now, dry_run=dry_run)
+        report.revoked_rows = await self._delete(
+            "revoked_at",
+            now - timedelta(days=self.revoked_retention_days),
+            dry_run=dry_run,
+        )
+        return report
+
+    async def _delete(self, column: str, cutoff: datetime, *, dry_run: bool) -> int:
+        """Удалить строки с `column < cutoff` keyset-батчами."""
+        if dry_run:
+            async with self.engine.connect() as conn:
+                return int(
+                    (
+                        await conn.execute(
+                            text(
+                                f"SELECT count(*) FROM {TABLE} WHERE {column} < :cutoff"
+                            ),
+                            {"cutoff": cutoff},
+                        )
+                    ).scalar_one()
+                )
+
+        after: tuple[datetime, uuid.UUID] | None = None
+        total = 0
+        while True:
+            keyset = f"AND ({column}, id) > (:after_ts, :after_id) " if after else ""
+            stmt = text(
+                f"WITH batch AS (SELECT id, expires_at FROM {TABLE} "
+                f"WHERE {column} < :cutoff {keyset}"
+                f"ORDER BY {column}, id LIMIT :limit FOR UPDATE SKIP LOCKED) "
+                f"DELETE FROM {TABLE} t USING batch "
+                "WHERE t.id = batch.id AND t.expires_at = batch.expires_at "
+                f"RETURNING t.{column}, t.id"
+            )
+            params: dict[str, object] = {"cutoff": cutoff, "limit": self.batch_size}
+            if after is not None:
+                params.update(after_ts=after[0], after_id=after[1])
+            async with self.engine.begin() as conn:
+                rows = (await conn.execute(stmt, params)).all()
+            total += len(rows)
+            if len(rows) < self.batch_size:
+                logger.info(
+                    "refresh_tokens gc: %s < %s: %d rows", column, cutoff, total
+                )
+                return total
+            after = max((row[0], row[1]) for row in rows)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from pydantic import Field
+import uuid
+from typing import Literal, Self
+
+from pydantic import Field, IPvAnyNetwork, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+DEV_JWT_SECRET = "dev-secret-change-me"
+
 
 class Settings(BaseSettings):
     """Настройки auth-service.
@@ -20,10 +25,28 @@ class Settings(BaseSettings):
     )
 
     # JWT
-    jwt_secret: str = Field(
-        default="dev-secret-change-me", validation_alias="JWT_SECRET"
-    )
+    jwt_secret: str = Field(default=DEV_JWT_SECRET, validation_alias="JWT_SECRET")
     jwt_issuer: str = Field(default="livai-auth-service", validation_alias="JWT_ISSUER")
+    # Подпись токенов (security/keys.py): HS256 по JWT_SECRET или EdDSA/ES256
+    # ключами JWT_SIGNING_KEYS (JSON {"<kid>": "<PEM>"}), активный —
+    # JWT_ACTIVE_KID. Публичные ключи — /v1/auth/.well-known/jwks.json,
+    # кэшируется клиентами на JWKS_MAX_AGE_SECONDS.
+    jwt_algorithm: Literal["HS256", "EdDSA", "ES256"] = Field(
+        default="HS256", validation_alias="JWT_ALGORITHM"
+    )
+    jwt_signing_keys: dict[str, str] = Field(
+        default_factory=dict, validation_alias="JWT_SIGNING_KEYS"
+    )
+    jwt_active_kid: str | None = Field(default=None, validation_alias="JWT_ACTIVE_KID")
+    # Принимать ли HS256-токены по JWT_SECRET. Не задано — только при
+    # JWT_ALGORITHM=HS256; `true` при EdDSA/ES256 — окно миграции, пока
+    # доживают токены, выданные до перехода (REFRESH_TTL), затем выключить.
+    jwt_accept_hs256: bool | None = Field(
+        default=None, validation_alias="JWT_ACCEPT_HS256"
+    )
+    jwks_max_age_seconds: int = Field(
+        default=300, validation_alias="JWKS_MAX_AGE_SECONDS"
+    )
 
     access_token_ttl_seconds: int = Field(
         default=15 * 60, validation_alias="ACCESS_TTL"
@@ -31,3 +54,149 @@ class Settings(BaseSettings):
     refresh_token_ttl_seconds: int = Field(
         default=30 * 24 * 60 * 60, validation_alias="REFRESH_TTL"
     )
+    # Класть email в claims access-токена: `/me` отвечает без БД. Смена email
+    # видна в `/me` только с новым access-токеном (через ACCESS_TTL).
+    jwt_embed_email: bool = Field(default=False, validation_alias="JWT_EMBED_EMAIL")
+    # Отзыв access-токенов (use_cases/token_revocation.py): Redis Stream,
+    # который читает gateway. Нужен REDIS_URL.
+    jwt_revocation_stream: str = Field(
+        default="auth:revocations", validation_alias="JWT_REVOCATION_STREAM"
+    )
+
+    # Audit sink: action'ы, которые пишутся асинхронно (пачками, вне транзакции
+    # запроса). Остальные пишутся транзакционно. Формат env: JSON-список.
+    audit_async_actions: list[str] = Field(
+        default_factory=list, validation_alias="AUDIT_ASYNC_ACTIONS"
+    )
+    audit_flush_interval_ms: int = Field(
+        default=200, validation_alias="AUDIT_FLUSH_INTERVAL_MS"
+    )
+    audit_flush_max_events: int = Field(
+        default=500, validation_alias="AUDIT_FLUSH_MAX_EVENTS"
+    )
+    audit_queue_max_size: int = Field(
+        default=10_000, validation_alias="AUDIT_QUEUE_MAX_SIZE"
+    )
+    # Сколько flush'ей подряд повторять упавшую пачку, прежде чем писать её
+    # по одному событию и отбрасывать незаписываемые.
+    audit_flush_max_attempts: int = Field(
+        default=5, validation_alias="AUDIT_FLUSH_MAX_ATTEMPTS"
+    )
+    # Что делать при переполнении очереди: писать в транзакции запроса
+    # (`transactional`) или отбрасывать событие (`drop`).
+    audit_overflow_policy: Literal["transactional", "drop"] = Field(
+        default="transactional", validation_alias="AUDIT_OVERFLOW_POLICY"
+    )
+
+    # Retention audit_log (см. entrypoints/cli/partitions.py).
+    # None — хранить бессрочно. Overrides — JSON {"<workspace_id>": days}.
+    audit_retention_days: int | None = Field(
+        default=None, validation_alias="AUDIT_RETENTION_DAYS"
+    )
+    audit_retention_overrides: dict[uuid.UUID, int] = Field(
+        default_factory=dict, validation_alias="AUDIT_RETENTION_OVERRIDES"
+    )
+    # Сколько месяцев секций создавать заранее.
+    partition_premake_months: int = Field(
+        default=3, validation_alias="PARTITION_PREMAKE_MONTHS"
+    )
+    partition_delete_batch_size: int = Field(
+        default=5_000, validation_alias="PARTITION_DELETE_BATCH_SIZE"
+    )
+
+    # Ротация refresh-токенов (use_cases/refresh_tokens.py): предъявление уже
+    # отозванного токена отзывает всё его семейство. Кроме отозванных менее
+    # REFRESH_REUSE_GRACE_SECONDS назад — так параллельные refresh одним
+    # токеном (две вкладки, повтор после обрыва) не разлогинивают
+    # пользователя. 0 — строго.
+    refresh_reuse_grace_seconds: int = Field(
+        default=5, validation_alias="REFRESH_REUSE_GRACE_SECONDS"
+    )
+
+    # GC refresh_tokens (entrypoints/cli/refresh_tokens_gc.py): истёкшие
+    # строки удаляются сразу, отозванные — через N дней (окно reuse detection).
+    refresh_gc_revoked_retention_days: int = Field(
+        default=7, validation_alias="REFRESH_GC_REVOKED_RETENTION_DAYS"
+    )
+    refresh_gc_batch_size: int = Field(
+        default=1_000, validation_alias="REFRESH_GC_BATCH_SIZE"
+    )
+
+    # Кэш профилей для /me (use_cases/user_cache.py): LRU в процессе
+    # (USER_CACHE_SIZE=0 — выключен) и, если задан REDIS_URL, общий уровень
+    # в Redis.
+    redis_url: str | None = Field(default=None, validation_alias="REDIS_URL")
+    user_cache_size: int = Field(default=10_000, validation_alias="USER_CACHE_SIZE")
+    user_cache_ttl_seconds: float = Field(
+        default=30.0, validation_alias="USER_CACHE_TTL_SECONDS"
+    )
+    user_cache_redis_ttl_seconds: int = Field(
+        default=300, validation_alias="USER_CACHE_REDIS_TTL_SECONDS"
+    )
+
+    # Защита логина от перебора (use_cases/login_throttle.py): после N неудач
+    # по email / по IP — блокировка на LOGIN_LOCKOUT_BASE_SECONDS, удваивается
+    # с каждой следующей неудачей до LOGIN_LOCKOUT_MAX_SECONDS. 0 — измерение
+    # выключено. С REDIS_URL счётчики общие для реплик.
+    login_max_failures_per_email: int = Field(
+        default=5, validation_alias="LOGIN_MAX_FAILURES_PER_EMAIL"
+    )
+    # Не задано — 50 при TRUSTED_PROXIES, иначе 0: за gateway без списка
+    # доверенных прокси все клиенты — один IP (адрес gateway).
+    login_max_failures_per_ip: int | None = Field(
+        default=None, validation_alias="LOGIN_MAX_FAILURES_PER_IP"
+    )
+    # Прокси, которым верим `X-Forwarded-For` (IP или подсети, JSON-список),
+    # например адреса gateway. IP клиента — самый правый хоп не из списка.
+    trusted_proxies: list[IPvAnyNetwork] = Field(
+        default_factory=list, validation_alias="TRUSTED_PROXIES"
+    )
+    login_lockout_base_seconds: float = Field(
+        default=30.0, validation_alias="LOGIN_LOCKOUT_BASE_SECONDS"
+    )
+    login_lockout_max_seconds: float = Field(
+        default=15 * 60.0, validation_alias="LOGIN_LOCKOUT_MAX_SECONDS"
+    )
+    login_failure_window_seconds: float = Field(
+        default=15 * 60.0, validation_alias="LOGIN_FAILURE_WINDOW_SECONDS"
+    )
+    login_throttle_max_entries: int = Field(
+        default=100_000, validation_alias="LOGIN_THROTTLE_MAX_ENTRIES"
+    )
+
+    # Админские ручки (entrypoints/http/routes_admin.py): заголовок
+    # X-Admin-Token должен совпасть с ADMIN_API_TOKEN. Не задан — ручки
+    # выключены (403).
+    admin_api_token: str | None = Field(
+        default=None, validation_alias="ADMIN_API_TOKEN"
+    )
+    # Пакетное создание пользователей: воркеры пула хэширования паролей
+    # (security/password_pool.py; 0 — thread pool) и срок жизни инвайтов.
+    password_hash_workers: int = Field(
+        default=2, validation_alias="PASSWORD_HASH_WORKERS"
+    )
+    invite_ttl_seconds: int = Field(
+        default=7 * 24 * 60 * 60, validation_alias="INVITE_TTL_SECONDS"
+    )
+
+    @model_validator(mode="after")
+    def _default_login_ip_limit(self) -> Self:
+        if self.login_max_failures_per_ip is None:
+            self.login_max_failures_per_ip = 50 if self.trusted_proxies else 0
+        return self
+
+    @model_validator(mode="after")
+    def _check_jwt_secret(self) -> Self:
+        if self.jwt_accept_hs256 is None:
+            self.jwt_accept_hs256 = self.jwt_algorithm == "HS256"
+        # Dev-секрет известен всем: вне local/test с ним подделывается любой токен.
+        uses_secret = self.jwt_algorithm == "HS256" or self.jwt_accept_hs256
+        if (
+            uses_secret
+            and self.jwt_secret == DEV_JWT_SECRET
+            and self.app_env not in ("local", "test")
+        ):
+            raise ValueError(
+                f"JWT_SECRET is the dev default, not allowed for APP_ENV={self.app_env}"
+            )
+        return self
@@ -0,0 +1,81 @@
+"""Обслуживание секций audit_log.
+
+Запуск (из каталога сервиса, например по cron раз в сутки):
+
+    python -m auth_src.entrypoints.cli.partitions [--detach] [--dry-run]
+
+- создаёт секции на `PARTITION_PREMAKE_MONTHS` месяцев вперёд;
+- отцепляет (`--detach`) или удаляет секции старше максимального retention;
+- батчами удаляет строки workspace'ов с более коротким retention.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from ...adapters.db.partitions import MonthlyPartitionManager, RetentionPolicy
+from ...adapters.db.session import create_engine
+from ...config.settings import Settings
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--premake-months",
+        type=int,
+        default=None,
+        help="сколько месяцев секций создать заранее (по умолчанию из настроек)",
+    )
+    parser.add_argument(
+        "--detach",
+        action="store_true",
+        help="отцеплять старые секции вместо DROP (для архивации)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="только показать, что будет сделано"
+    )
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = Settings()
+    engine = create_engine(settings)
+    policy = RetentionPolicy(
+        default_days=settings.audit_retention_days,
+        overrides=settings.audit_retention_overrides,
+    )
+    manager = MonthlyPartitionManager(
+        engine,
+        "audit_log",
+        delete_batch_size=settings.partition_delete_batch_size,
+    )
+    try:
+        report = await manager.run(
+            policy,
+            months_ahead=(
+                args.premake_months
+                if args.premake_months is not None
+                else settings.partition_premake_months
+            ),
+            detach=args.detach,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await engine.dispose()
+
+    action = "detached" if args.detach else "dropped"
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}created: {', '.join(report.created) or '-'}")
+    print(f"{prefix}{action}: {', '.join(report.removed) or '-'}")
+    print(f"{prefix}deleted rows: {report.deleted_rows}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
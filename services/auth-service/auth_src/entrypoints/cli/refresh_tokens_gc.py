@@ -0,0 +1,71 @@
+"""Удаление истёкших и давно отозванных refresh-токенов.
+
+Запуск (из каталога сервиса, например по cron раз в час):
+
+    python -m auth_src.entrypoints.cli.refresh_tokens_gc [--dry-run]
+
+- удаляет строки с `expires_at` в прошлом и отозванные раньше
+  `REFRESH_GC_REVOKED_RETENTION_DAYS` дней назад — батчами по
+  `REFRESH_GC_BATCH_SIZE`, по короткой транзакции на батч;
+- для секционированной по `expires_at` таблицы удаляет целиком истёкшие
+  секции и создаёт секции на `PARTITION_PREMAKE_MONTHS` месяцев вперёд.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from ...adapters.db.refresh_token_gc import RefreshTokenCollector
+from ...adapters.db.session import create_engine
+from ...config.settings import Settings
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--revoked-retention-days",
+        type=int,
+        default=None,
+        help="сколько дней хранить отозванные токены (по умолчанию из настроек)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="только посчитать, что будет удалено"
+    )
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = Settings()
+    engine = create_engine(settings)
+    collector = RefreshTokenCollector(
+        engine,
+        revoked_retention_days=(
+            args.revoked_retention_days
+            if args.revoked_retention_days is not None
+            else settings.refresh_gc_revoked_retention_days
+        ),
+        batch_size=settings.refresh_gc_batch_size,
+        premake_months=settings.partition_premake_months,
+    )
+    try:
+        report = await collector.run(dry_run=args.dry_run)
+    finally:
+        await engine.dispose()
+
+    prefix = "[dry-run] " if args.dry_run else ""
+    if report.partitioned:
+        print(f"{prefix}created: {', '.join(report.created) or '-'}")
+        print(f"{prefix}dropped: {', '.join(report.dropped) or '-'}")
+    print(f"{prefix}expired rows: {report.expired_rows}")
+    print(f"{prefix}revoked rows: {report.revoked_rows}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
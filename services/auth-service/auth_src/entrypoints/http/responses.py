@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ на orjson (`default_response_class` приложения).
+
+    • Pydantic-модель сериализуется напрямую её core-сериализатором
+      (`to_json`, без промежуточного dict).
+    • Остальное (dict/list, в т.ч. UUID/datetime) — через orjson; модели,
+      вложенные в dict, — через `model_dump(mode="json")`.
+
+    Для моделей байты совпадают с прежним ответом FastAPI (`dump_json`
+    по `response_model`).
+
+    Горячие list-эндпоинты (bots, conversations) через этот класс не идут:
+    роут сам сериализует строки из БД `TypeAdapter.dump_json` и отдаёт
+    `RawJSONResponse` — без промежуточных моделей и повторной валидации
+    `response_model` (OpenAPI по-прежнему берётся из `response_model`).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return orjson.dumps(content, default=_default)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hmac
+import uuid
+from datetime import datetime, timezone
+from typing import cast
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from ...adapters.db.audit_sink import AuditSink, get_audit_sink
+from ...adapters.db.session import get_db_session
+from ...config.settings import Settings
+from ...security.password_pool import PasswordHasher, get_password_hasher
+from ...use_cases.user_provisioning import (
+    NewUser,
+    WorkspaceNotFound,
+    provision_users,
+)
+
+MAX_BATCH_USERS = 1_000
+
+
+def _require_admin(
+    request: Request,
+    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> None:
+    """Доступ по `ADMIN_API_TOKEN` (до появления ролей в workspace)."""
+    expected = cast(Settings, request.app.state.settings).admin_api_token
+    if (
+        not expected
+        or x_admin_token is None
+        or not hmac.compare_digest(x_admin_token.encode(), expected.encode())
+    ):
+        raise HTTPException(
+            status_code=403,
+            detail={"code": "FORBIDDEN", "message": "Нет доступа"},
+        )
+
+
+router = APIRouter(
+    prefix="/v1/auth", tags=["admin"], dependencies=[Depends(_require_admin)]
+)
+
+
+class BatchUser(BaseModel):
+    # Формат email и длина пароля проверяются построчно (ошибка строки, а не
+    # 422 всей пачки).
+    email: str = Field(max_length=320)
+    password: str | None = Field(default=None, max_length=128)
+    invite: bool = False
+
+
+class BatchUsersRequest(BaseModel):
+    users: list[BatchUser] = Field(min_length=1, max_length=MAX_BATCH_USERS)
+
+
+class BatchUserResult(BaseModel):
+    index: int
+    email: str
+    user_id: uuid.UUID | None = None
+    # Одноразовый токен инвайта: показывается только в этом ответе.
+    invite_token: str | None = None
+    error: str | None = None
+
+
+class BatchUsersResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BatchUserResult]
+
+
+@router.post(
+    "/workspaces/{workspace_id}/users:batch", response_model=BatchUsersResponse
+)
+async def batch_create_users(
+    workspace_id: uuid.UUID,
+    body: BatchUsersRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
+    audit: AuditSink = Depends(get_audit_sink),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+    x_operation_id: str | None = Header(default=None, alias="X-Operation-Id"),
+):
+    """Пакетное создание пользователей workspace (use_cases/user_provisioning.py).
+
+    Ответ 200 с результатом по каждой строке: `user_id` (и `invite_token`,
+    если запрошен инвайт) или код ошибки строки.
+    """
+    settings = cast(Settings, request.app.state.settings)
+    operation_uuid = None
+    if x_operation_id:
+        try:
+            operation_uuid = uuid.UUID(x_operation_id)
+        except ValueError:
+            operation_uuid = None
+
+    try:
+        results = await provision_users(
+            db,
+            workspace_id=workspace_id,
+            users=[
+                NewUser(email=u.email, password=u.password, invite=u.invite)
+                for u in body.users
+            ],
+            hasher=hasher,
+            audit=audit,
+            now=datetime.now(timezone.utc),
+            invite_ttl_seconds=settings.invite_ttl_seconds,
+            operation_id=operation_uuid,
+        )
+    except WorkspaceNotFound:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "WORKSPACE_NOT_FOUND", "message": "Workspace не найден"},
+        ) from None
+    await db.commit()
+
+    created = sum(r.created for r in results)
+    return BatchUsersResponse(
+        created=created,
+        failed=len(results) - created,
+        results=[
+            BatchUserResult(
+                index=r.index,
+                email=r.email,
+                user_id=r.user_id,
+                invite_token=r.invite_token,
+                error=r.error,
+            )
+            for r in results
+        ],
+    )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import math
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import cast
 
 from fastapi import APIRouter, Depends, Header, HTTPException
@@ -9,13 +10,40 @@ from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
+from starlette.responses import Response
 
-from ...adapters.db.audit import AuditLog
-from ...adapters.db.models import RefreshToken, User, Workspace
+from ...adapters.db.audit_sink import AuditEvent, AuditSink, get_audit_sink
+from ...adapters.db.models import User
 from ...adapters.db.session import get_db_session
+from ...adapters.db.unit_of_work import UnitOfWork, get_unit_of_work
 from ...config.settings import Settings
 from ...security.jwt import JwtError, decode_and_verify, issue_tokens
-from ...security.passwords import hash_password, verify_password
+from ...security.keys import get_key_set
+from ...security.passwords import (
+    hash_password,
+    verify_dummy_password,
+    verify_password,
+)
+from ...use_cases.login_throttle import LoginThrottle, client_ip, get_login_throttle
+from ...use_cases.refresh_tokens import (
+    RefreshRejected,
+    RefreshReuseDetected,
+    new_refresh_row,
+    revoke_family,
+    rotate_refresh_token,
+)
+from ...use_cases.registration import insert_user_with_workspace
+from ...use_cases.token_revocation import (
+    RevocationPublisher,
+    get_revocation_publisher,
+)
+from ...use_cases.user_cache import (
+    UserCache,
+    UserProfile,
+    get_user_cache,
+    load_profile,
+)
+from .responses import FastJSONResponse
 
 router = APIRouter(prefix="/v1/auth", tags=["auth"])
 
@@ -63,86 +91,115 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
 def _get_settings(request: Request) -> Settings:
     return cast(Settings, request.app.state.settings)
 
 
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request) -> Response:
+    """Публичные ключи проверки access/refresh JWT (RFC 7517).
+
+    Пустой список при HS256. Клиенты кэшируют ответ на `max-age` и
+    перечитывают при встрече неизвестного `kid`.
+    """
+    settings = _get_settings(request)
+    return FastJSONResponse(
+        get_key_set(request).jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.jwks_max_age_seconds}"},
+    )
+
+
 @router.post("/register", response_model=TokenPairResponse)
 async def register(
     body: RegisterRequest,
     request: Request,
-    db: AsyncSession = Depends(get_db_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+    audit: AuditSink = Depends(get_audit_sink),
+    users: UserCache = Depends(get_user_cache),
     x_trace_id: str | None = Header(default=None, alias="X-Trace-Id"),
     x_operation_id: str | None = Header(default=None, alias="X-Operation-Id"),
 ):
-    """Регистрация: создаёт workspace + user, возвращает access/refresh."""
+    """Регистрация: создаёт workspace + user, возвращает access/refresh.
+
+    Занятость email проверяет сам INSERT (use_cases/registration.py): 409
+    и при гонке параллельных регистраций. Соединение с БД берётся только на
+    эту вставку (adapters/db/unit_of_work.py).
+    """
     _ = (
         x_trace_id,
         x_operation_id,
     )  # заголовки фиксируем, используем позже для аудита/логов
 
-    exists = await db.execute(select(User).where(User.email == body.email))
-    if exists.scalar_one_or_none() is not None:
-        raise HTTPException(
-            status_code=409,
-            detail={
-                "code": "EMAIL_ALREADY_EXISTS",
-                "message": "Пользователь уже существует",
-            },
-        )
-
-    ws = Workspace(name=body.workspace_name)
+    # PBKDF2 и подпись токенов — до DB-фазы: соединение из пула не держится.
     pwd_hash, pwd_salt, iterations = hash_password(body.password)
-    user = User(
-        email=body.email,
-        workspace=ws,
-        password_hash=pwd_hash,
-        password_salt=pwd_salt,
-        password_iterations=iterations,
-    )
-    db.add(ws)
-    db.add(user)
-    await db.flush()
-
+    user_id, workspace_id = uuid.uuid4(), uuid.uuid4()
     settings = _get_settings(request)
     tokens = issue_tokens(
-        secret=settings.jwt_secret,
+        keys=get_key_set(request),
         issuer=settings.jwt_issuer,
-        user_id=user.id,
-        workspace_id=ws.id,
+        user_id=user_id,
+        workspace_id=workspace_id,
         access_ttl_seconds=settings.access_token_ttl_seconds,
         refresh_ttl_seconds=settings.refresh_token_ttl_seconds,
+        email=body.email if settings.jwt_embed_email else None,
     )
-
-    now = datetime.now(timezone.utc)
-    refresh_row = RefreshToken(
-        jti=tokens.refresh_jti,
-        user_id=user.id,
-        workspace_id=ws.id,
-        issued_at=now,
-        expires_at=now + timedelta(seconds=settings.refresh_token_ttl_seconds),
-        revoked_at=None,
-    )
-    db.add(refresh_row)
-
     operation_uuid = None
     if x_operation_id:
         try:
             operation_uuid = uuid.UUID(x_operation_id)
         except Exception:
             operation_uuid = None
-    db.add(
-        AuditLog(
-            workspace_id=ws.id,
-            user_id=user.id,
-            operation_id=operation_uuid,
-            action="USER_REGISTERED",
-            resource_type="user",
-            resource_id=user.id,
-            changes={"workspace_id": str(ws.id), "email": user.email},
+
+    async with uow() as db:
+        created = await insert_user_with_workspace(
+            db,
+            user_id=user_id,
+            workspace_id=workspace_id,
+            workspace_name=body.workspace_name,
+            email=body.email,
+            password_hash=pwd_hash,
+            password_salt=pwd_salt,
+            password_iterations=iterations,
+        )
+        if not created:
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "code": "EMAIL_ALREADY_EXISTS",
+                    "message": "Пользователь уже существует",
+                },
+            )
+        db.add(
+            new_refresh_row(
+                jti=tokens.refresh_jti,
+                user_id=user_id,
+                workspace_id=workspace_id,
+                now=datetime.now(timezone.utc),
+                ttl_seconds=settings.refresh_token_ttl_seconds,
+            )
         )
+        audit.record(
+            db,
+            AuditEvent(
+                workspace_id=workspace_id,
+                user_id=user_id,
+                operation_id=operation_uuid,
+                action="USER_REGISTERED",
+                resource_type="user",
+                resource_id=user_id,
+                changes={"workspace_id": str(workspace_id), "email": body.email},
+            ),
+        )
+        await db.commit()
+    # Следом клиент обычно спрашивает /me.
+    await users.set(
+        UserProfile(user_id=user_id, email=body.email, workspace_id=workspace_id)
     )
-    await db.commit()
 
     return TokenPairResponse(
         access_token=tokens.access_token, refresh_token=tokens.refresh_token
@@ -153,49 +210,75 @@ async def register(
 async def login(
     body: LoginRequest,
     request: Request,
-    db: AsyncSession = Depends(get_db_session),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+    users: UserCache = Depends(get_user_cache),
+    throttle: LoginThrottle = Depends(get_login_throttle),
 ):
-    """Логин: проверяет пароль, возвращает access/refresh."""
-    row = await db.execute(select(User).where(User.email == body.email))
-    user = row.scalar_one_or_none()
-    if user is None:
+    """Логин: проверяет пароль, возвращает access/refresh.
+
+    Перебор отсекается до БД и PBKDF2 (use_cases/login_throttle.py);
+    несуществующий email проверяется против фиктивного хэша — время ответа
+    то же, что при неверном пароле. Соединение с БД берётся на чтение
+    пользователя и на запись refresh-токена, но не на время PBKDF2
+    (adapters/db/unit_of_work.py).
+    """
+    ip = client_ip(request, _get_settings(request).trusted_proxies)
+    retry_after = await throttle.retry_after(body.email, ip)
+    if retry_after > 0:
         raise HTTPException(
-            status_code=401,
-            detail={"code": "INVALID_CREDENTIALS", "message": "Неверные данные"},
+            status_code=429,
+            detail={
+                "code": "TOO_MANY_LOGIN_ATTEMPTS",
+                "message": "Слишком много попыток входа, повторите позже",
+            },
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
         )
 
-    if not verify_password(
-        body.password,
-        hash_b64=user.password_hash,
-        salt_b64=user.password_salt,
-        iterations=user.password_iterations,
-    ):
+    async with uow() as db:
+        row = await db.execute(select(User).where(User.email == body.email))
+        user = row.scalar_one_or_none()
+    if user is None:
+        valid = verify_dummy_password(body.password)
+    else:
+        valid = verify_password(
+            body.password,
+            hash_b64=user.password_hash,
+            salt_b64=user.password_salt,
+            iterations=user.password_iterations,
+        )
+    if user is None or not valid:
+        await throttle.record_failure(body.email, ip)
         raise HTTPException(
             status_code=401,
             detail={"code": "INVALID_CREDENTIALS", "message": "Неверные данные"},
         )
+    await throttle.record_success(body.email)
 
     settings = _get_settings(request)
     tokens = issue_tokens(
-        secret=settings.jwt_secret,
+        keys=get_key_set(request),
         issuer=settings.jwt_issuer,
         user_id=user.id,
         workspace_id=user.workspace_id,
         access_ttl_seconds=settings.access_token_ttl_seconds,
         refresh_ttl_seconds=settings.refresh_token_ttl_seconds,
+        email=user.email if settings.jwt_embed_email else None,
     )
 
-    now = datetime.now(timezone.utc)
-    refresh_row = RefreshToken(
-        jti=tokens.refresh_jti,
-        user_id=user.id,
-        workspace_id=user.workspace_id,
-        issued_at=now,
-        expires_at=now + timedelta(seconds=settings.refresh_token_ttl_seconds),
-        revoked_at=None,
+    async with uow() as db:
+        db.add(
+            new_refresh_row(
+                jti=tokens.refresh_jti,
+                user_id=user.id,
+                workspace_id=user.workspace_id,
+                now=datetime.now(timezone.utc),
+                ttl_seconds=settings.refresh_token_ttl_seconds,
+            )
+        )
+        await db.commit()
+    await users.set(
+        UserProfile(user_id=user.id, email=user.email, workspace_id=user.workspace_id)
     )
-    db.add(refresh_row)
-    await db.commit()
 
     return TokenPairResponse(
         access_token=tokens.access_token, refresh_token=tokens.refresh_token
@@ -206,9 +289,14 @@ async def login(
 async def me(
     request: Request,
     db: AsyncSession = Depends(get_db_session),
+    users: UserCache = Depends(get_user_cache),
     authorization: str | None = Header(default=None, alias="Authorization"),
 ):
-    """Профиль текущего пользователя по access JWT."""
+    """Профиль текущего пользователя по access JWT.
+
+    С `JWT_EMBED_EMAIL` — прямо из claims, без БД; иначе — из кэша профилей
+    (use_cases/user_cache.py), при промахе — из БД.
+    """
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(
             status_code=401, detail={"code": "UNAUTHORIZED", "message": "Нет токена"}
@@ -219,7 +307,7 @@ async def me(
     try:
         payload = decode_and_verify(
             token,
-            secret=settings.jwt_secret,
+            keys=get_key_set(request),
             issuer=settings.jwt_issuer,
             expected_token_type="access",
         )
@@ -230,15 +318,22 @@ async def me(
         ) from None
 
     user_id = uuid.UUID(payload["sub"])
-    row = await db.execute(select(User).where(User.id == user_id))
-    user = row.scalar_one_or_none()
-    if user is None:
+    if "email" in payload:
+        return MeResponse(
+            user_id=user_id,
+            email=payload["email"],
+            workspace_id=uuid.UUID(payload["workspace_id"]),
+        )
+    profile = await load_profile(users, db, user_id)
+    if profile is None:
         raise HTTPException(
             status_code=401,
             detail={"code": "UNAUTHORIZED", "message": "Пользователь не найден"},
         )
 
-    return MeResponse(user_id=user.id, email=user.email, workspace_id=user.workspace_id)
+    return MeResponse(
+        user_id=profile.user_id, email=profile.email, workspace_id=profile.workspace_id
+    )
 
 
 @router.post("/refresh", response_model=TokenPairResponse)
@@ -246,14 +341,23 @@ async def refresh(
     body: RefreshRequest,
     request: Request,
     db: AsyncSession = Depends(get_db_session),
+    audit: AuditSink = Depends(get_audit_sink),
+    users: UserCache = Depends(get_user_cache),
+    revocations: RevocationPublisher = Depends(get_revocation_publisher),
 ):
-    """Выдаёт новую пару токенов по refresh JWT (с ротацией)."""
+    """Выдаёт новую пару токенов по refresh JWT (с ротацией).
+
+    Ротация атомарна (см. use_cases/refresh_tokens.py): из параллельных
+    запросов с одним токеном новую пару получает ровно один. Повторное
+    предъявление отозванного токена отзывает всё его семейство и все
+    выданные access-токены пользователя (use_cases/token_revocation.py).
+    """
     settings = _get_settings(request)
 
     try:
         payload = decode_and_verify(
             body.refresh_token,
-            secret=settings.jwt_secret,
+            keys=get_key_set(request),
             issuer=settings.jwt_issuer,
             expected_token_type="refresh",
         )
@@ -263,38 +367,110 @@ async def refresh(
             detail={"code": "UNAUTHORIZED", "message": "Неверный refresh токен"},
         ) from None
 
-    jti = uuid.UUID(payload["jti"])
-    row = await db.execute(select(RefreshToken).where(RefreshToken.jti == jti))
-    token_row = row.scalar_one_or_none()
-    if token_row is None or token_row.revoked_at is not None:
-        raise HTTPException(
-            status_code=401,
-            detail={"code": "UNAUTHORIZED", "message": "Refresh токен отозван"},
-        )
-
-    # Ротация: отзываем старый refresh и выдаём новый.
-    token_row.revoked_at = datetime.now(timezone.utc)
-
+    user_id = uuid.UUID(payload["sub"])
+    email = None
+    if settings.jwt_embed_email:
+        profile = await load_profile(users, db, user_id)
+        if profile is None:
+            raise HTTPException(
+                status_code=401,
+                detail={"code": "UNAUTHORIZED", "message": "Пользователь не найден"},
+            )
+        email = profile.email
     tokens = issue_tokens(
-        secret=settings.jwt_secret,
+        keys=get_key_set(request),
         issuer=settings.jwt_issuer,
-        user_id=uuid.UUID(payload["sub"]),
+        user_id=user_id,
         workspace_id=uuid.UUID(payload["workspace_id"]),
         access_ttl_seconds=settings.access_token_ttl_seconds,
         refresh_ttl_seconds=settings.refresh_token_ttl_seconds,
+        email=email,
     )
-    now = datetime.now(timezone.utc)
-    new_row = RefreshToken(
-        jti=tokens.refresh_jti,
-        user_id=uuid.UUID(payload["sub"]),
-        workspace_id=uuid.UUID(payload["workspace_id"]),
-        issued_at=now,
-        expires_at=now + timedelta(seconds=settings.refresh_token_ttl_seconds),
-        revoked_at=None,
-    )
-    db.add(new_row)
+    try:
+        await rotate_refresh_token(
+            db,
+            jti=uuid.UUID(payload["jti"]),
+            new_jti=tokens.refresh_jti,
+            now=datetime.now(timezone.utc),
+            ttl_seconds=settings.refresh_token_ttl_seconds,
+            reuse_grace_seconds=settings.refresh_reuse_grace_seconds,
+        )
+    except RefreshRejected as exc:
+        if isinstance(exc, RefreshReuseDetected):
+            audit.record(
+                db,
+                AuditEvent(
+                    workspace_id=exc.workspace_id,
+                    user_id=exc.user_id,
+                    action="REFRESH_TOKEN_REUSED",
+                    resource_type="refresh_token_family",
+                    resource_id=exc.family_id,
+                    changes={"jti": payload["jti"]},
+                ),
+            )
+            # Отзыв семейства сохраняем, хотя запрос отклоняется.
+            await db.commit()
+            await revocations.revoke_user(exc.user_id)
+        raise HTTPException(
+            status_code=401,
+            detail={"code": "UNAUTHORIZED", "message": "Refresh токен отозван"},
+        ) from None
     await db.commit()
 
     return TokenPairResponse(
         access_token=tokens.access_token, refresh_token=tokens.refresh_token
     )
+
+
+@router.post("/logout", status_code=204)
+async def logout(
+    request: Request,
+    body: LogoutRequest | None = None,
+    db: AsyncSession = Depends(get_db_session),
+    revocations: RevocationPublisher = Depends(get_revocation_publisher),
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> Response:
+    """Завершает сессию: отзывает access-токен из `Authorization` (в gateway
+    — сразу, см. use_cases/token_revocation.py) и, если передан,
+    refresh-токен вместе с его семейством."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(
+            status_code=401, detail={"code": "UNAUTHORIZED", "message": "Нет токена"}
+        )
+    settings = _get_settings(request)
+    keys = get_key_set(request)
+    try:
+        payload = decode_and_verify(
+            authorization.split(" ", 1)[1].strip(),
+            keys=keys,
+            issuer=settings.jwt_issuer,
+            expected_token_type="access",
+        )
+        refresh_payload = (
+            decode_and_verify(
+                body.refresh_token,
+                keys=keys,
+                issuer=settings.jwt_issuer,
+                expected_token_type="refresh",
+            )
+            if body is not None and body.refresh_token is not None
+            else None
+        )
+    except JwtError:
+        raise HTTPException(
+            status_code=401,
+            detail={"code": "UNAUTHORIZED", "message": "Неверный токен"},
+        ) from None
+
+    if refresh_payload is not None:
+        if refresh_payload["sub"] != payload["sub"]:
+            raise HTTPException(
+                status_code=401,
+                detail={"code": "UNAUTHORIZED", "message": "Неверный refresh токен"},
+            )
+        await revoke_family(db, jti=uuid.UUID(refresh_payload["jti"]))
+        await db.commit()
+    # Токены, выпущенные до появления `jti` в access, истекут сами.
+    if "jti" in payload:
+        await revocations.revoke_token(payload["jti"], exp=payload["exp"])
+    return Response(status_code=204)
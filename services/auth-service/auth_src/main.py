@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -10,13 +12,21 @@ from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.requests import Request
 
+from auth_src.adapters.db.audit_sink import create_audit_sink
 from auth_src.adapters.db.session import create_sessionmaker
 from auth_src.config.settings import Settings
+from auth_src.entrypoints.http.responses import FastJSONResponse
+from auth_src.entrypoints.http.routes_admin import router as admin_router
 from auth_src.entrypoints.http.routes_auth import router as auth_router
 from auth_src.entrypoints.http.routes_health import router as health_router
 from auth_src.errors.http_errors import ErrorResponse
 from auth_src.middleware.operation_id import OperationIdMiddleware
 from auth_src.middleware.trace_id import TraceIdMiddleware
+from auth_src.security.keys import create_key_set
+from auth_src.security.password_pool import create_password_hasher
+from auth_src.use_cases.login_throttle import create_login_throttle
+from auth_src.use_cases.token_revocation import create_revocation_publisher
+from auth_src.use_cases.user_cache import create_user_cache
 
 
 async def validation_exception_handler(
@@ -64,7 +74,9 @@ async def http_exception_handler(request: Request, exc: Exception) -> JSONRespon
     payload = ErrorResponse(
         code=code, message=message, trace_id=trace_id, details=details
     ).model_dump()
-    return JSONResponse(status_code=exc.status_code, content=payload)
+    return JSONResponse(
+        status_code=exc.status_code, content=payload, headers=exc.headers
+    )
 
 
 async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -80,11 +92,34 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     return JSONResponse(status_code=500, content=payload)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Жизненный цикл приложения: при остановке дописываем audit-очередь
+    и закрываем соединения кэша пользователей."""
+    yield
+    await app.state.audit_sink.aclose()
+    await app.state.user_cache.aclose()
+    await app.state.login_throttle.aclose()
+    await app.state.revocations.aclose()
+    app.state.password_hasher.close()
+
+
 def create_app(settings: Settings) -> FastAPI:
     """Создать FastAPI приложение."""
-    app = FastAPI(title="LivAi Auth Service", version="0.1.0")
+    app = FastAPI(
+        title="LivAi Auth Service",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
     app.state.settings = settings
     app.state.db_sessionmaker = create_sessionmaker(settings)
+    app.state.audit_sink = create_audit_sink(settings, app.state.db_sessionmaker)
+    app.state.user_cache = create_user_cache(settings)
+    app.state.login_throttle = create_login_throttle(settings)
+    app.state.revocations = create_revocation_publisher(settings)
+    app.state.password_hasher = create_password_hasher(settings)
+    app.state.jwt_keys = create_key_set(settings)
 
     app.add_middleware(TraceIdMiddleware)
     app.add_middleware(OperationIdMiddleware)
@@ -105,6 +140,7 @@ def create_app(settings: Settings) -> FastAPI:
     # чтобы их можно было дергать через gateway-прокси.
     app.include_router(health_router, prefix="/v1/auth", tags=["health"])
     app.include_router(auth_router)
+    app.include_router(admin_router)
     return app
 
 
@@ -0,0 +1,87 @@
+"""Ключи подписи JWT и их публикация (JWKS).
+
+`JWT_ALGORITHM`:
+
+• `HS256` — симметричный `JWT_SECRET`, как раньше (gateway знает секрет);
+• `EdDSA` (Ed25519) или `ES256` (P-256) — подпись приватным ключом auth,
+  проверка по публичным ключам из `/v1/auth/.well-known/jwks.json`.
+
+Асимметричные ключи — `JWT_SIGNING_KEYS` (JSON `{"<kid>": "<PEM>"}`),
+подписывает `JWT_ACTIVE_KID`. Ротация: добавить новый ключ → дождаться, пока
+gateway'и обновят JWKS (`JWKS_MAX_AGE_SECONDS`) → переключить
+`JWT_ACTIVE_KID` → убрать старый ключ после истечения выданных им токенов
+(`REFRESH_TTL`). Заголовок токена несёт `kid`, проверка выбирает ключ по нему.
+
+Объекты ключей и base64 заголовков собираются один раз при старте
+(`jwt_codec.JwtKey`); токены, заголовок которых совпадает с заранее
+собранным, проверяются без разбора JSON заголовка.
+
+При EdDSA/ES256 HS256-токены (по `JWT_SECRET`) не принимаются: секрет знает
+каждый gateway, и с ним подделывается любой токен. На время перехода —
+`JWT_ACCEPT_HS256=true`, пока доживают токены, выданные до него.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+
+from ..config.settings import Settings
+from .jwt_codec import JwtKey, parse_header
+
+logger = logging.getLogger(__name__)
+
+
+class KeySet:
+    """Активный ключ подписи + все ключи, которыми принимаются токены."""
+
+    def __init__(self, active: JwtKey, keys: list[JwtKey]) -> None:
+        self.active = active
+        self.keys = keys
+        self._by_header = {k.header_b64: k for k in keys}
+        self._by_kid: dict[tuple[str | None, str | None], JwtKey] = {
+            (k.alg, k.kid): k for k in keys
+        }
+
+    def key_for_header(self, header_b64: str) -> JwtKey | None:
+        """Ключ для заголовка токена; None — неизвестный ключ/алгоритм."""
+        key = self._by_header.get(header_b64)
+        if key is not None:
+            return key
+        return self._by_kid.get(parse_header(header_b64))
+
+    def jwks(self) -> dict[str, list[dict[str, str]]]:
+        return {"keys": [jwk for k in self.keys if (jwk := k.public_jwk()) is not None]}
+
+
+def create_key_set(settings: Settings) -> KeySet:
+    if settings.jwt_algorithm == "HS256":
+        hs256 = JwtKey.hs256(settings.jwt_secret)
+        return KeySet(hs256, [hs256])
+
+    keys = [
+        JwtKey.from_pem(settings.jwt_algorithm, kid, pem)
+        for kid, pem in settings.jwt_signing_keys.items()
+    ]
+    if not keys:
+        if settings.app_env not in ("local", "test"):
+            raise ValueError(
+                "JWT_SIGNING_KEYS is required for "
+                f"JWT_ALGORITHM={settings.jwt_algorithm}"
+            )
+        # Dev: эфемерный ключ, токены не переживают рестарт.
+        logger.warning("JWT_SIGNING_KEYS не заданы: сгенерирован временный ключ")
+        keys = [JwtKey.generate(settings.jwt_algorithm, "dev")]
+    by_kid = {k.kid: k for k in keys}
+    active_kid = settings.jwt_active_kid or keys[0].kid
+    if active_kid not in by_kid:
+        raise ValueError(f"JWT_ACTIVE_KID={active_kid!r} is not in JWT_SIGNING_KEYS")
+    if settings.jwt_accept_hs256:
+        keys.append(JwtKey.hs256(settings.jwt_secret))
+    return KeySet(by_kid[active_kid], keys)
+
+
+def get_key_set(request: Request) -> KeySet:
+    """FastAPI dependency: ключи JWT процесса."""
+    return request.app.state.jwt_keys  # type: ignore[no-any-return]
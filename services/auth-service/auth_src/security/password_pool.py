@@ -0,0 +1,63 @@
+"""Пакетное хэширование паролей вне event loop.
+
+PBKDF2 на пароль — ~0.1с CPU; пачка из сотен пользователей
+(`users:batch`) хэшируется параллельно в пуле процессов на
+`PASSWORD_HASH_WORKERS` воркеров. Пул создаётся при первой пачке (обычные
+логин/регистрация его не трогают) в контексте `spawn`: fork процесса с
+работающим event loop и пулом соединений небезопасен.
+
+`PASSWORD_HASH_WORKERS=0` — без процессов, в thread pool event loop'а
+(`pbkdf2_hmac` отпускает GIL, но делит CPU с обработкой запросов).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from starlette.requests import Request
+
+from ..config.settings import Settings
+from .passwords import hash_password
+
+
+class PasswordHasher:
+    def __init__(self, *, workers: int) -> None:
+        self.workers = workers
+        self._pool: Executor | None = None
+
+    async def hash_many(self, passwords: Sequence[str]) -> list[tuple[str, str, int]]:
+        """(hash_b64, salt_b64, iterations) на каждый пароль, по порядку."""
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        return list(
+            await asyncio.gather(
+                *(loop.run_in_executor(pool, hash_password, p) for p in passwords)
+            )
+        )
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _executor(self) -> Executor | None:
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+
+def create_password_hasher(settings: Settings) -> PasswordHasher:
+    return PasswordHasher(workers=settings.password_hash_workers)
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    """FastAPI dependency: общий на процесс PasswordHasher."""
+    return request.app.state.password_hasher  # type: ignore[no-any-return]
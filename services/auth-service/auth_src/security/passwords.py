@@ -5,12 +5,20 @@ import hashlib
 import hmac
 import os
 
+DEFAULT_ITERATIONS = 210_000
+
+# Для логина с несуществующим email: PBKDF2 той же стоимости, что и у
+# настоящего пользователя, — время ответа не выдаёт, есть ли такой email.
+# Хэш ничему не соответствует, поэтому генерировать его при старте не нужно.
+_DUMMY_SALT_B64 = base64.urlsafe_b64encode(os.urandom(16)).decode("ascii")
+_DUMMY_HASH_B64 = base64.urlsafe_b64encode(os.urandom(32)).decode("ascii")
+
 
 def hash_password(
     password: str,
     *,
     salt: bytes | None = None,
-    iterations: int = 210_000,
+    iterations: int = DEFAULT_ITERATIONS,
 ) -> tuple[str, str, int]:
     """Хэширует пароль через PBKDF2-HMAC-SHA256.
 
@@ -45,6 +53,25 @@ def verify_password(
     return hmac.compare_digest(dk, expected)
 
 
+def unusable_password() -> tuple[str, str, int]:
+    """Значения для пользователя без пароля (вход — только после инвайта).
+
+    Случайный «хэш» без прообраза: PBKDF2 не считается, войти по паролю
+    нельзя, а логин тратит на проверку столько же, сколько для остальных.
+    """
+    return _b64(os.urandom(32)), _b64(os.urandom(16)), DEFAULT_ITERATIONS
+
+
+def verify_dummy_password(password: str) -> bool:
+    """Проверка против фиктивного хэша (всегда False) за время настоящей."""
+    return verify_password(
+        password,
+        hash_b64=_DUMMY_HASH_B64,
+        salt_b64=_DUMMY_SALT_B64,
+        iterations=DEFAULT_ITERATIONS,
+    )
+
+
 def _b64(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
 
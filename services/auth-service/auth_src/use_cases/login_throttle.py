@@ -0,0 +1,225 @@
+"""Защита `/login` от перебора паролей.
+
+Неудачные попытки считаются по email и по IP клиента. После
+`LOGIN_MAX_FAILURES_PER_EMAIL` (`..._PER_IP`) неудач ключ блокируется на
+`LOGIN_LOCKOUT_BASE_SECONDS`; каждая следующая неудача (после окончания
+блокировки) удваивает срок, до `LOGIN_LOCKOUT_MAX_SECONDS`. Счётчик email
+сбрасывается успешным логином, любой счётчик — через
+`LOGIN_FAILURE_WINDOW_SECONDS` без неудач (плюс срок блокировки).
+
+`retry_after` проверяется до запроса в БД и PBKDF2: заблокированный
+перебор получает 429 с `Retry-After`, не тратя CPU на хэширование.
+
+Хранилище — в процессе (LRU на `LOGIN_THROTTLE_MAX_ENTRIES` ключей) или, если
+задан `REDIS_URL`, Redis — общий для реплик. При сбое Redis счёт ведётся
+локально.
+
+IP клиента — адрес соединения. `X-Forwarded-For` читается, только если
+соединение пришло от доверенного прокси (`TRUSTED_PROXIES`, например
+gateway, который дописывает адрес своего клиента): берётся самый правый хоп
+не из списка — левее клиент пишет что угодно. Без `TRUSTED_PROXIES` за
+gateway все клиенты — один адрес, поэтому счётчик по IP по умолчанию
+выключен (settings.py). Главный барьер — счётчик по email.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from ipaddress import IPv4Network, IPv6Network, ip_address
+from typing import Any
+
+from starlette.requests import Request
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "auth:login:"
+
+# KEYS[1] — счётчик, KEYS[2] — блокировка.
+# ARGV: порог, базовая блокировка (мс), максимум (мс), окно (мс).
+_FAILURE = """
+local n = redis.call('INCR', KEYS[1])
+local threshold = tonumber(ARGV[1])
+local lock = 0
+if n >= threshold then
+  lock = math.floor(math.min(tonumber(ARGV[3]),
+                             tonumber(ARGV[2]) * 2 ^ (n - threshold)))
+  redis.call('SET', KEYS[2], 1, 'PX', lock)
+end
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[4]) + lock)
+return lock
+"""
+
+
+class LoginThrottle:
+    """Счётчики неудачных логинов с экспоненциальной блокировкой."""
+
+    def __init__(
+        self,
+        *,
+        max_failures_per_email: int,
+        max_failures_per_ip: int,
+        lockout_base_s: float,
+        lockout_max_s: float,
+        window_s: float,
+        max_entries: int = 100_000,
+        redis: Any = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.thresholds = {"email": max_failures_per_email, "ip": max_failures_per_ip}
+        self.lockout_base_s = lockout_base_s
+        self.lockout_max_s = lockout_max_s
+        self.window_s = window_s
+        self.max_entries = max_entries
+        self._redis = redis
+        self._failure = redis.register_script(_FAILURE) if redis is not None else None
+        self._clock = clock
+        # (kind, value) -> [неудач, счётчик живёт до, блокировка до]
+        self._entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+
+    async def retry_after(self, email: str, ip: str) -> float:
+        """Сколько секунд ждать до следующей попытки; 0 — можно."""
+        keys = self._keys(email, ip)
+        if self._redis is not None:
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for kind, value in keys:
+                        pipe.pttl(_redis_key(kind, value, "lock"))
+                    ttls = await pipe.execute()
+                return max([0, *ttls]) / 1000
+            except Exception:
+                logger.warning("login throttle: redis check failed", exc_info=True)
+        now = self._clock()
+        wait = 0.0
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                wait = max(wait, entry[2] - now)
+        return wait
+
+    async def record_failure(self, email: str, ip: str) -> None:
+        for kind, value in self._keys(email, ip):
+            if self._failure is not None:
+                try:
+                    await self._failure(
+                        keys=[
+                            _redis_key(kind, value, "n"),
+                            _redis_key(kind, value, "lock"),
+                        ],
+                        args=[
+                            self.thresholds[kind],
+                            int(self.lockout_base_s * 1000),
+                            int(self.lockout_max_s * 1000),
+                            int(self.window_s * 1000),
+                        ],
+                    )
+                    continue
+                except Exception:
+                    logger.warning("login throttle: redis update failed", exc_info=True)
+            self._record_local(kind, value)
+
+    async def record_success(self, email: str) -> None:
+        self._entries.pop(("email", email), None)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(
+                _redis_key("email", email, "n"), _redis_key("email", email, "lock")
+            )
+        except Exception:
+            logger.warning("login throttle: redis reset failed", exc_info=True)
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def _keys(self, email: str, ip: str) -> list[tuple[str, str]]:
+        """Ключи включённых измерений (порог 0 — измерение выключено)."""
+        keys = []
+        if self.thresholds["email"] > 0:
+            keys.append(("email", email))
+        if self.thresholds["ip"] > 0:
+            keys.append(("ip", ip))
+        return keys
+
+    def _record_local(self, kind: str, value: str) -> None:
+        now = self._clock()
+        key = (kind, value)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= now:
+            entry = [0.0, 0.0, 0.0]
+        entry[0] += 1
+        lock = 0.0
+        threshold = self.thresholds[kind]
+        if entry[0] >= threshold:
+            lock = min(
+                self.lockout_max_s,
+                self.lockout_base_s * 2 ** min(entry[0] - threshold, 32),
+            )
+            entry[2] = now + lock
+        entry[1] = now + self.window_s + lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _redis_key(kind: str, value: str, suffix: str) -> str:
+    # Hash tag: счётчик и блокировка ключа — в одном слоте Redis Cluster.
+    return f"{_REDIS_PREFIX}{{{kind}:{value}}}:{suffix}"
+
+
+def client_ip(
+    request: Request, trusted_proxies: Sequence[IPv4Network | IPv6Network] = ()
+) -> str:
+    """IP клиента: самый правый адрес цепочки (XFF + соединение) не из
+    `trusted_proxies`; без них — адрес соединения."""
+    peer = request.client.host if request.client else "unknown"
+    if not trusted_proxies:
+        return peer
+    hops = [
+        hop.strip()
+        for value in request.headers.getlist("x-forwarded-for")
+        for hop in value.split(",")
+    ]
+    chain = [hop for hop in hops if hop] + [peer]
+    for hop in reversed(chain):
+        if not _is_trusted(hop, trusted_proxies):
+            return hop
+    return chain[0]
+
+
+def _is_trusted(
+    address: str, trusted_proxies: Sequence[IPv4Network | IPv6Network]
+) -> bool:
+    try:
+        ip = ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def create_login_throttle(settings: Settings) -> LoginThrottle:
+    redis = None
+    if settings.redis_url:
+        from redis import asyncio as redis_async
+
+        redis = redis_async.from_url(settings.redis_url)
+    return LoginThrottle(
+        max_failures_per_email=settings.login_max_failures_per_email,
+        max_failures_per_ip=settings.login_max_failures_per_ip or 0,
+        lockout_base_s=settings.login_lockout_base_seconds,
+        lockout_max_s=settings.login_lockout_max_seconds,
+        window_s=settings.login_failure_window_seconds,
+        max_entries=settings.login_throttle_max_entries,
+        redis=redis,
+    )
+
+
+def get_login_throttle(request: Request) -> LoginThrottle:
+    """FastAPI dependency: общий на процесс LoginThrottle."""
+    return request.app.state.login_throttle  # type: ignore[no-any-return]
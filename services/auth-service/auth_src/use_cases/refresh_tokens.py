@@ -0,0 +1,187 @@
+"""Refresh-токены: выдача, атомарная ротация, reuse detection.
+
+Ротация — один SQL-оператор (data-modifying CTE):
+
+    WITH rotated AS (
+        UPDATE refresh_tokens SET revoked_at = now()
+        WHERE jti = :jti AND revoked_at IS NULL AND expires_at > :now
+        RETURNING user_id, workspace_id, family_id
+    )
+    INSERT INTO refresh_tokens (...) SELECT ... FROM rotated
+    RETURNING user_id, workspace_id, family_id
+
+Два параллельных refresh одним токеном: второй UPDATE ждёт блокировку
+строки, после коммита первого перепроверяет `revoked_at IS NULL` и не
+находит строку — новый токен получает ровно один запрос.
+
+Не ротировали (строки нет) — токен неизвестен, истёк или уже отозван.
+Предъявление отозванного токена — признак кражи: отзывается всё семейство
+(`family_id`), в т.ч. токен, выданный при законной ротации. Кроме токена,
+отозванного менее `reuse_grace_seconds` назад (параллельная ротация): срок
+сравнивается в SQL с `now()` — теми же часами БД, что поставили `revoked_at`,
+а не часами приложения. Logout отзывает семейство предъявленного токена
+(`revoke_family`).
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..adapters.db.models import RefreshToken
+
+
+class RefreshRejected(Exception):
+    """Refresh-токен неизвестен, истёк или отозван."""
+
+
+class RefreshReuseDetected(RefreshRejected):
+    """Предъявлен отозванный токен; его семейство отозвано."""
+
+    def __init__(
+        self, *, family_id: uuid.UUID, user_id: uuid.UUID, workspace_id: uuid.UUID
+    ) -> None:
+        super().__init__(str(family_id))
+        self.family_id = family_id
+        self.user_id = user_id
+        self.workspace_id = workspace_id
+
+
+@dataclass(frozen=True)
+class RotatedToken:
+    user_id: uuid.UUID
+    workspace_id: uuid.UUID
+    family_id: uuid.UUID
+
+
+def new_refresh_row(
+    *,
+    jti: uuid.UUID,
+    user_id: uuid.UUID,
+    workspace_id: uuid.UUID,
+    now: datetime,
+    ttl_seconds: int,
+) -> RefreshToken:
+    """Первый токен нового семейства (логин/регистрация)."""
+    return RefreshToken(
+        jti=jti,
+        user_id=user_id,
+        workspace_id=workspace_id,
+        family_id=uuid.uuid4(),
+        issued_at=now,
+        expires_at=now + timedelta(seconds=ttl_seconds),
+        revoked_at=None,
+    )
+
+
+async def rotate_refresh_token(
+    db: AsyncSession,
+    *,
+    jti: uuid.UUID,
+    new_jti: uuid.UUID,
+    now: datetime,
+    ttl_seconds: int,
+    reuse_grace_seconds: int = 0,
+) -> RotatedToken:
+    """Отозвать `jti` и записать `new_jti` в то же семейство (без commit).
+
+    `RefreshRejected` — ротировать нечего; `RefreshReuseDetected` — токен уже
+    был отозван раньше `reuse_grace_seconds` назад, семейство отозвано в
+    этой сессии (вызывающий коммитит).
+    """
+    rotated = (
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=func.now())
+        .returning(
+            RefreshToken.user_id, RefreshToken.workspace_id, RefreshToken.family_id
+        )
+        .cte("rotated")
+    )
+    stmt = (
+        insert(RefreshToken)
+        .from_select(
+            [
+                "id",
+                "jti",
+                "user_id",
+                "workspace_id",
+                "family_id",
+                "issued_at",
+                "expires_at",
+            ],
+            select(
+                literal(uuid.uuid4()),
+                literal(new_jti),
+                rotated.c.user_id,
+                rotated.c.workspace_id,
+                rotated.c.family_id,
+                literal(now),
+                literal(now + timedelta(seconds=ttl_seconds)),
+            ),
+        )
+        .returning(
+            RefreshToken.user_id, RefreshToken.workspace_id, RefreshToken.family_id
+        )
+    )
+    row = (await db.execute(stmt)).first()
+    if row is not None:
+        return RotatedToken(
+            user_id=row.user_id, workspace_id=row.workspace_id, family_id=row.family_id
+        )
+
+    old = (
+        await db.execute(
+            select(
+                RefreshToken.user_id,
+                RefreshToken.workspace_id,
+                RefreshToken.family_id,
+                RefreshToken.revoked_at,
+                (
+                    RefreshToken.revoked_at
+                    > func.now() - timedelta(seconds=reuse_grace_seconds)
+                ).label("in_grace"),
+            ).where(RefreshToken.jti == jti)
+        )
+    ).first()
+    if old is None or old.revoked_at is None:
+        raise RefreshRejected(str(jti))  # неизвестен или истёк
+    if old.in_grace:
+        raise RefreshRejected(str(jti))  # параллельная ротация, не кража
+    await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.family_id == old.family_id,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    raise RefreshReuseDetected(
+        family_id=old.family_id, user_id=old.user_id, workspace_id=old.workspace_id
+    )
+
+
+async def revoke_family(db: AsyncSession, *, jti: uuid.UUID) -> None:
+    """Отозвать семейство, которому принадлежит `jti` (без commit)."""
+    family = (
+        select(RefreshToken.family_id).where(RefreshToken.jti == jti).scalar_subquery()
+    )
+    await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.family_id == family,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
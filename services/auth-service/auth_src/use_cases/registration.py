@@ -0,0 +1,71 @@
+"""Регистрация: workspace + пользователь одним SQL-оператором.
+
+    WITH ws AS (
+        INSERT INTO workspaces (id, name) VALUES (...) RETURNING id
+    )
+    INSERT INTO users (...) SELECT ... FROM ws
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id
+
+Уникальность email проверяет сам INSERT: две параллельные регистрации
+одного email не проходят обе предварительный SELECT с последующей ошибкой
+unique-индекса (500) — вторая ждёт первую на индексе и получает пустой
+RETURNING. Пустой RETURNING — email занят: вызывающий откатывает транзакцию
+(вместе с уже вставленным workspace) и отвечает 409.
+
+Пароль хэшируется до вызова: PBKDF2 не держит соединение с БД.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..adapters.db.models import User, Workspace
+
+
+async def insert_user_with_workspace(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    workspace_id: uuid.UUID,
+    workspace_name: str,
+    email: str,
+    password_hash: str,
+    password_salt: str,
+    password_iterations: int,
+) -> bool:
+    """Вставить workspace и пользователя (без commit); False — email занят."""
+    ws = (
+        insert(Workspace)
+        .values(id=workspace_id, name=workspace_name)
+        .returning(Workspace.id)
+        .cte("ws")
+    )
+    stmt = (
+        insert(User)
+        .from_select(
+            [
+                "id",
+                "email",
+                "workspace_id",
+                "password_hash",
+                "password_salt",
+                "password_iterations",
+            ],
+            select(
+                literal(user_id),
+                literal(email),
+                ws.c.id,
+                literal(password_hash),
+                literal(password_salt),
+                literal(password_iterations),
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none() is not None
@@ -0,0 +1,99 @@
+"""Публикация отзыва access-токенов для gateway.
+
+Gateway проверяет access-JWT только подписью и `exp`; чтобы logout и
+reuse detection действовали сразу, а не через `ACCESS_TTL`,
+отзывы пишутся в Redis Stream `JWT_REVOCATION_STREAM`. Gateway держит их в
+памяти и дочитывает stream с начала при старте (api_src/security/revocations.py).
+
+Записи:
+
+    kind=jti   id=<jti>      exp=<exp токена>               — logout
+    kind=user  id=<user_id>  iat=<сейчас − 1с>  exp=<сейчас + TTL>  — все
+                                                     токены пользователя
+
+`iat` токенов — целые секунды, поэтому отзыв пользователя покрывает токены,
+выпущенные до предыдущей секунды включительно. Токен той же секунды, что и
+отзыв (логин сразу после reuse detection), не отзывается — иначе gateway
+отклонял бы его весь access TTL. Цена — окно до секунды перед отзывом.
+
+Записи старше access TTL бесполезны (все затронутые токены истекли) и
+отрезаются тем же `XADD` (`MINID ~`), поэтому stream не растёт. Без
+`REDIS_URL` отзыв действует только на refresh-токены (в БД). Ошибка Redis
+логируется и не ломает запрос.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from starlette.requests import Request
+
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationPublisher:
+    def __init__(
+        self,
+        *,
+        redis: Any = None,
+        stream: str = "auth:revocations",
+        access_ttl_s: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.stream = stream
+        self.access_ttl_s = access_ttl_s
+        self._redis = redis
+        self._clock = clock
+
+    async def revoke_token(self, jti: str, *, exp: int) -> None:
+        """Отозвать один access-токен (до его `exp`)."""
+        await self._publish({"kind": "jti", "id": jti, "exp": exp})
+
+    async def revoke_user(self, user_id: uuid.UUID) -> None:
+        """Отозвать access-токены пользователя, выпущенные до текущей секунды."""
+        now = int(self._clock())
+        await self._publish(
+            {
+                "kind": "user",
+                "id": str(user_id),
+                "iat": now - 1,
+                "exp": now + self.access_ttl_s,
+            }
+        )
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    async def _publish(self, fields: dict[str, str | int]) -> None:
+        if self._redis is None:
+            return
+        min_id = int((self._clock() - self.access_ttl_s) * 1000)
+        try:
+            await self._redis.xadd(self.stream, fields, minid=min_id, approximate=True)
+        except Exception:
+            logger.warning("token revocation: redis xadd failed", exc_info=True)
+
+
+def create_revocation_publisher(settings: Settings) -> RevocationPublisher:
+    redis = None
+    if settings.redis_url:
+        from redis import asyncio as redis_async
+
+        redis = redis_async.from_url(settings.redis_url)
+    return RevocationPublisher(
+        redis=redis,
+        stream=settings.jwt_revocation_stream,
+        access_ttl_s=settings.access_token_ttl_seconds,
+    )
+
+
+def get_revocation_publisher(request: Request) -> RevocationPublisher:
+    """FastAPI dependency: общий на процесс RevocationPublisher."""
+    return request.app.state.revocations  # type: ignore[no-any-return]
@@ -0,0 +1,170 @@
+"""Кэш профилей пользователей для `/me` (и refresh с email в claims).
+
+Два уровня:
+
+• в процессе — LRU на `USER_CACHE_SIZE` записей с TTL `USER_CACHE_TTL_SECONDS`
+  (0 записей — выключен);
+• опционально Redis (`REDIS_URL`) — общий для реплик, TTL
+  `USER_CACHE_REDIS_TTL_SECONDS`: промах в процессе не идёт в БД, если
+  профиль уже прочитала другая реплика.
+
+`invalidate(user_id)` — после изменения пользователя: удаляет запись у себя
+и в Redis. Кэши других реплик в процессе доживают свой TTL, поэтому он
+короткий.
+
+Если включён `JWT_EMBED_EMAIL`, `/me` отвечает из claims access-токена и в
+кэш не ходит вовсе.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from ..adapters.db.models import User
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "auth:user:"
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    user_id: uuid.UUID
+    email: str
+    workspace_id: uuid.UUID
+
+
+class UserCache:
+    """Двухуровневый кэш профилей (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        ttl_seconds: float,
+        redis: Any = None,
+        redis_ttl_seconds: int = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[uuid.UUID, tuple[float, UserProfile]] = OrderedDict()
+
+    async def get(self, user_id: uuid.UUID) -> UserProfile | None:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(user_id)
+                return entry[1]
+            del self._entries[user_id]
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(_REDIS_PREFIX + str(user_id))
+        except Exception:
+            # Redis — только ускорение: при сбое идём в БД.
+            logger.warning("user cache: redis get failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        data = orjson.loads(raw)
+        profile = UserProfile(
+            user_id=user_id,
+            email=data["email"],
+            workspace_id=uuid.UUID(data["workspace_id"]),
+        )
+        self._remember(profile)
+        return profile
+
+    async def set(self, profile: UserProfile) -> None:
+        self._remember(profile)
+        if self._redis is None:
+            return
+        payload = orjson.dumps(
+            {"email": profile.email, "workspace_id": str(profile.workspace_id)}
+        )
+        try:
+            await self._redis.set(
+                _REDIS_PREFIX + str(profile.user_id),
+                payload,
+                ex=self.redis_ttl_seconds,
+            )
+        except Exception:
+            logger.warning("user cache: redis set failed", exc_info=True)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(_REDIS_PREFIX + str(user_id))
+        except Exception:
+            # Запись в Redis доживёт до USER_CACHE_REDIS_TTL_SECONDS.
+            logger.warning("user cache: redis delete failed", exc_info=True)
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def _remember(self, profile: UserProfile) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[profile.user_id] = (self._clock() + self.ttl_seconds, profile)
+        self._entries.move_to_end(profile.user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+async def load_profile(
+    cache: UserCache, db: AsyncSession, user_id: uuid.UUID
+) -> UserProfile | None:
+    """Профиль из кэша, при промахе — из БД (с записью в кэш)."""
+    profile = await cache.get(user_id)
+    if profile is not None:
+        return profile
+    row = (
+        await db.execute(
+            select(User.email, User.workspace_id).where(User.id == user_id)
+        )
+    ).first()
+    if row is None:
+        return None
+    profile = UserProfile(
+        user_id=user_id, email=row.email, workspace_id=row.workspace_id
+    )
+    await cache.set(profile)
+    return profile
+
+
+def create_user_cache(settings: Settings) -> UserCache:
+    redis = None
+    if settings.redis_url:
+        from redis import asyncio as redis_async
+
+        redis = redis_async.from_url(settings.redis_url)
+    return UserCache(
+        max_size=settings.user_cache_size,
+        ttl_seconds=settings.user_cache_ttl_seconds,
+        redis=redis,
+        redis_ttl_seconds=settings.user_cache_redis_ttl_seconds,
+    )
+
+
+def get_user_cache(request: Request) -> UserCache:
+    """FastAPI dependency: общий на процесс UserCache."""
+    return request.app.state.user_cache  # type: ignore[no-any-return]
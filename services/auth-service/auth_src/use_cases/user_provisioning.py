@@ -0,0 +1,177 @@
+"""Пакетное создание пользователей в workspace (онбординг организаций).
+
+Пачка обрабатывается построчно с отчётом по каждой строке: ошибка одной
+строки (невалидный email, дубль, занятый email) не отменяет остальные.
+
+Порядок — чтобы дорогие шаги не держали соединение с БД:
+
+1. валидация строк в памяти;
+2. одним SELECT — какие email уже заняты (для них пароль не хэшируется);
+   соединение возвращается в пул до хэширования;
+3. пароли хэшируются параллельно (`PasswordHasher`, пул процессов);
+4. в одной транзакции: multi-row INSERT users (`ON CONFLICT (email) DO
+   NOTHING` — email, занятый параллельно, становится ошибкой строки),
+   multi-row INSERT инвайтов и audit-строк. Коммитит вызывающий.
+
+Строка без пароля создаётся только с инвайтом: пароль непригоден для входа
+(`unusable_password`), а одноразовый токен инвайта отдаётся в ответе один
+раз — в БД хранится его SHA-256.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import secrets
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..adapters.db.audit_sink import AuditEvent, AuditSink
+from ..adapters.db.models import User, UserInvite, Workspace
+from ..security.password_pool import PasswordHasher
+from ..security.passwords import unusable_password
+
+MIN_PASSWORD_LENGTH = 8
+
+
+class WorkspaceNotFound(Exception):
+    """Workspace для пачки не существует."""
+
+
+@dataclass(frozen=True)
+class NewUser:
+    email: str
+    password: str | None = None
+    invite: bool = False
+
+
+@dataclass
+class ProvisionResult:
+    index: int
+    email: str
+    user_id: uuid.UUID | None = None
+    invite_token: str | None = None
+    error: str | None = None
+
+    @property
+    def created(self) -> bool:
+        return self.user_id is not None
+
+
+def normalize_email(email: str) -> str | None:
+    """Email в нижнем регистре; None — не похож на email."""
+    email = email.strip().lower()
+    if "@" not in email or "." not in email or len(email) < 3:
+        return None
+    return email
+
+
+async def provision_users(
+    db: AsyncSession,
+    *,
+    workspace_id: uuid.UUID,
+    users: Sequence[NewUser],
+    hasher: PasswordHasher,
+    audit: AuditSink,
+    now: datetime,
+    invite_ttl_seconds: int,
+    operation_id: uuid.UUID | None = None,
+) -> list[ProvisionResult]:
+    """Создать пользователей пачки (без commit); результат — по строке на вход."""
+    results = [ProvisionResult(index=i, email=u.email) for i, u in enumerate(users)]
+    pending: dict[str, int] = {}  # email -> индекс строки
+    for i, user in enumerate(users):
+        email = normalize_email(user.email)
+        if email is None:
+            results[i].error = "INVALID_EMAIL"
+        elif user.password is None and not user.invite:
+            results[i].error = "PASSWORD_OR_INVITE_REQUIRED"
+        elif user.password is not None and len(user.password) < MIN_PASSWORD_LENGTH:
+            results[i].error = "PASSWORD_TOO_SHORT"
+        elif email in pending:
+            results[i].error = "DUPLICATE_IN_BATCH"
+        else:
+            results[i].email = email
+            pending[email] = i
+
+    if await db.get(Workspace, workspace_id) is None:
+        raise WorkspaceNotFound(str(workspace_id))
+    if pending:
+        taken = await db.scalars(select(User.email).where(User.email.in_(pending)))
+        for email in taken:
+            results[pending.pop(email)].error = "EMAIL_ALREADY_EXISTS"
+    # Только чтение: соединение не держим, пока считаются хэши.
+    await db.rollback()
+    if not pending:
+        return results
+
+    rows = [(i, users[i].password) for i in pending.values()]
+    hashed = iter(await hasher.hash_many([p for _, p in rows if p is not None]))
+    values = []
+    for i, password in rows:
+        pwd_hash, pwd_salt, iterations = (
+            next(hashed) if password is not None else unusable_password()
+        )
+        values.append(
+            {
+                "id": uuid.uuid4(),
+                "email": results[i].email,
+                "workspace_id": workspace_id,
+                "password_hash": pwd_hash,
+                "password_salt": pwd_salt,
+                "password_iterations": iterations,
+            }
+        )
+
+    inserted = await db.execute(
+        insert(User)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email)
+    )
+    created = {row.email: row.id for row in inserted}
+
+    invites = []
+    events = []
+    for email, i in pending.items():
+        result = results[i]
+        user_id = created.get(email)
+        if user_id is None:
+            result.error = "EMAIL_ALREADY_EXISTS"  # создан параллельно
+            continue
+        result.user_id = user_id
+        if users[i].invite:
+            result.invite_token = secrets.token_urlsafe(32)
+            invites.append(
+                {
+                    "id": uuid.uuid4(),
+                    "token_hash": hash_invite_token(result.invite_token),
+                    "user_id": user_id,
+                    "workspace_id": workspace_id,
+                    "expires_at": now + timedelta(seconds=invite_ttl_seconds),
+                }
+            )
+        events.append(
+            AuditEvent(
+                workspace_id=workspace_id,
+                user_id=user_id,
+                operation_id=operation_id,
+                action="USER_PROVISIONED",
+                resource_type="user",
+                resource_id=user_id,
+                changes={"email": email, "invite": users[i].invite},
+            )
+        )
+    if invites:
+        await db.execute(insert(UserInvite).values(invites))
+    await audit.record_many(db, events)
+    return results
+
+
+def hash_invite_token(token: str) -> str:
+    return hashlib.sha256(token.encode("ascii")).hexdigest()
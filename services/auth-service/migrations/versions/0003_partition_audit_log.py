@@ -0,0 +1,120 @@
+"""partition audit_log by month (RANGE created_at)
+
+Revision ID: 0003_partition_audit_log
+Revises: 0002_add_audit_log
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0003_partition_audit_log"
+down_revision = "0002_add_audit_log"
+branch_labels = None
+depends_on = None
+
+_INDEXES: list[tuple[str, list[str]]] = [
+    ("ix_audit_log_workspace_id", ["workspace_id"]),
+    ("ix_audit_log_user_id", ["user_id"]),
+    ("ix_audit_log_operation_id", ["operation_id"]),
+    ("ix_audit_log_resource_id", ["resource_id"]),
+    ("ix_audit_log_workspace_action", ["workspace_id", "action"]),
+    (
+        "ix_audit_log_workspace_resource",
+        ["workspace_id", "resource_type", "resource_id"],
+    ),
+]
+
+# Секции создаём от самого старого месяца с данными до now() + 3 месяца;
+# дальше их досоздаёт `python -m auth_src.entrypoints.cli.partitions`.
+_CREATE_MONTH_PARTITIONS = """
+DO $$
+DECLARE
+    m date := date_trunc('month', coalesce(
+        (SELECT min(created_at) FROM audit_log_unpartitioned), now()
+    ))::date;
+    last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    WHILE m <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_log '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'audit_log_p' || to_char(m, 'YYYY_MM'),
+            m,
+            (m + interval '1 month')::date
+        );
+        m := (m + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("operation_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("action", sa.String(length=64), nullable=False),
+        sa.Column("resource_type", sa.String(length=64), nullable=False),
+        sa.Column("resource_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("changes", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    ]
+
+
+def _drop_indexes() -> None:
+    for name, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name="audit_log")
+
+
+def _create_indexes() -> None:
+    for name, columns in _INDEXES:
+        op.create_index(name, "audit_log", columns, unique=False)
+
+
+def upgrade() -> None:
+    # Индексы старой таблицы удаляем, чтобы освободить имена.
+    _drop_indexes()
+    op.rename_table("audit_log", "audit_log_unpartitioned")
+    op.execute("ALTER INDEX audit_log_pkey RENAME TO audit_log_unpartitioned_pkey")
+
+    op.create_table(
+        "audit_log",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name="audit_log_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute(_CREATE_MONTH_PARTITIONS)
+    # Страховка: строки вне созданных секций не должны ронять INSERT.
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_unpartitioned")
+    op.drop_table("audit_log_unpartitioned")
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _drop_indexes()
+    op.rename_table("audit_log", "audit_log_partitioned")
+    op.execute("ALTER INDEX audit_log_pkey RENAME TO audit_log_partitioned_pkey")
+
+    op.create_table(
+        "audit_log",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", name="audit_log_pkey"),
+    )
+    op.execute("INSERT INTO audit_log SELECT * FROM audit_log_partitioned")
+    # Секции удаляются вместе с родительской таблицей.
+    op.drop_table("audit_log_partitioned")
+
+    _create_indexes()
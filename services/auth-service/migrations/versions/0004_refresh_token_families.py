@@ -0,0 +1,36 @@
+"""refresh_tokens.family_id (reuse detection при ротации)
+
+Revision ID: 0004_refresh_token_families
+Revises: 0003_partition_audit_log
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_refresh_token_families"
+down_revision = "0003_partition_audit_log"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("family_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    # Историю цепочек не восстановить: каждый существующий токен — своё
+    # семейство.
+    op.execute("UPDATE refresh_tokens SET family_id = id")
+    op.alter_column("refresh_tokens", "family_id", nullable=False)
+    op.create_index(
+        "ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_family_id", table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "family_id")
@@ -0,0 +1,183 @@
+"""refresh_tokens: индексы для GC; опционально — секции по expires_at
+
+Revision ID: 0005_refresh_tokens_expiry
+Revises: 0004_refresh_token_families
+Create Date: 2026-10-18
+
+Индексы `(expires_at, id)` и `(revoked_at, id) WHERE revoked_at IS NOT NULL`
+нужны keyset-удалению истёкших/отозванных токенов
+(`python -m auth_src.entrypoints.cli.refresh_tokens_gc`).
+
+Секционирование по месяцам `expires_at` — по флагу:
+
+    alembic -x partition_refresh_tokens=true upgrade head
+
+Тогда истёкшие месяцы удаляются DROP секции, а не DELETE. Цена: первичный
+ключ становится `(id, expires_at)`, а уникальность `jti` — `(jti, expires_at)`
+(глобальной уникальности по секциям PostgreSQL не поддерживает; jti — uuid4).
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_refresh_tokens_expiry"
+down_revision = "0004_refresh_token_families"
+branch_labels = None
+depends_on = None
+
+# (имя, колонки, unique) — индексы, которые пересоздаются при смене формы таблицы.
+_INDEXES: list[tuple[str, list[str], bool]] = [
+    ("ix_refresh_tokens_user_id", ["user_id"], False),
+    ("ix_refresh_tokens_workspace_id", ["workspace_id"], False),
+    ("ix_refresh_tokens_workspace_user", ["workspace_id", "user_id"], False),
+    ("ix_refresh_tokens_family_id", ["family_id"], False),
+    ("ix_refresh_tokens_expires_at", ["expires_at", "id"], False),
+]
+_COLUMNS = (
+    "id, jti, user_id, workspace_id, family_id, issued_at, expires_at, revoked_at"
+)
+
+# Секции от самого раннего expires_at до now() + 3 месяца; дальше их
+# досоздаёт CLI refresh_tokens_gc.
+_CREATE_MONTH_PARTITIONS = """
+DO $$
+DECLARE
+    m date := date_trunc('month', coalesce(
+        (SELECT min(expires_at) FROM refresh_tokens_unpartitioned), now()
+    ))::date;
+    last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    WHILE m <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF refresh_tokens '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'refresh_tokens_p' || to_char(m, 'YYYY_MM'),
+            m,
+            (m + interval '1 month')::date
+        );
+        m := (m + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def _partitioned() -> bool:
+    flag = context.get_x_argument(as_dictionary=True).get("partition_refresh_tokens")
+    return (flag or "").lower() in ("1", "true", "yes")
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("jti", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("family_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("issued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _create_indexes(*, jti_columns: list[str]) -> None:
+    op.create_index("ix_refresh_tokens_jti", "refresh_tokens", jti_columns, unique=True)
+    for name, columns, unique in _INDEXES:
+        op.create_index(name, "refresh_tokens", columns, unique=unique)
+    op.create_index(
+        "ix_refresh_tokens_revoked_at",
+        "refresh_tokens",
+        ["revoked_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("revoked_at IS NOT NULL"),
+    )
+
+
+def _drop_indexes(*, with_gc: bool) -> None:
+    op.drop_index("ix_refresh_tokens_jti", table_name="refresh_tokens")
+    for name, _, _ in _INDEXES:
+        if with_gc or name != "ix_refresh_tokens_expires_at":
+            op.drop_index(name, table_name="refresh_tokens")
+    if with_gc:
+        op.drop_index("ix_refresh_tokens_revoked_at", table_name="refresh_tokens")
+
+
+def _recreate(*, partitioned: bool, with_gc: bool) -> None:
+    """Пересоздать refresh_tokens в нужной форме с переносом строк."""
+    _drop_indexes(with_gc=with_gc)
+    op.rename_table("refresh_tokens", "refresh_tokens_unpartitioned")
+    op.execute(
+        "ALTER TABLE refresh_tokens_unpartitioned "
+        "RENAME CONSTRAINT refresh_tokens_pkey TO refresh_tokens_unpartitioned_pkey"
+    )
+    if partitioned:
+        op.create_table(
+            "refresh_tokens",
+            *_columns(),
+            sa.PrimaryKeyConstraint("id", "expires_at", name="refresh_tokens_pkey"),
+            postgresql_partition_by="RANGE (expires_at)",
+        )
+        op.execute(_CREATE_MONTH_PARTITIONS)
+        op.execute(
+            "CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT"
+        )
+    else:
+        op.create_table(
+            "refresh_tokens",
+            *_columns(),
+            sa.PrimaryKeyConstraint("id", name="refresh_tokens_pkey"),
+        )
+    op.execute(
+        f"INSERT INTO refresh_tokens ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM refresh_tokens_unpartitioned"
+    )
+    op.drop_table("refresh_tokens_unpartitioned")
+
+
+def upgrade() -> None:
+    if _partitioned():
+        _recreate(partitioned=True, with_gc=False)
+        _create_indexes(jti_columns=["jti", "expires_at"])
+        return
+    op.create_index(
+        "ix_refresh_tokens_expires_at",
+        "refresh_tokens",
+        ["expires_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_refresh_tokens_revoked_at",
+        "refresh_tokens",
+        ["revoked_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("revoked_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    partitioned = bool(
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = 'refresh_tokens'::regclass)"
+            )
+        )
+        .scalar_one()
+    )
+    if partitioned:
+        _recreate(partitioned=False, with_gc=True)
+        op.create_index("ix_refresh_tokens_jti", "refresh_tokens", ["jti"], unique=True)
+        for name, columns, unique in _INDEXES:
+            if name != "ix_refresh_tokens_expires_at":
+                op.create_index(name, "refresh_tokens", columns, unique=unique)
+        return
+    op.drop_index("ix_refresh_tokens_revoked_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
@@ -0,0 +1,48 @@
+"""user_invites (инвайты при пакетном создании пользователей)
+
+Revision ID: 0006_user_invites
+Revises: 0005_refresh_tokens_expiry
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0006_user_invites"
+down_revision = "0005_refresh_tokens_expiry"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_invites",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("token_hash", sa.String(length=64), nullable=False, unique=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("accepted_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_user_invites_user_id", "user_invites", ["user_id"])
+    op.create_index("ix_user_invites_workspace_id", "user_invites", ["workspace_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_invites_workspace_id", table_name="user_invites")
+    op.drop_index("ix_user_invites_user_id", table_name="user_invites")
+    op.drop_table("user_invites")
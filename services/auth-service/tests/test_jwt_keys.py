@@ -0,0 +1,117 @@
+"""JWT: асимметричная подпись с kid, ротация ключей, JWKS."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from auth_src.config.settings import Settings
+from auth_src.main import create_app
+from auth_src.security.jwt import JwtError, decode_and_verify, issue_tokens
+from auth_src.security.jwt_codec import JwtKey
+from auth_src.security.keys import KeySet, create_key_set
+
+
+def _issue(keys: KeySet) -> str:
+    return issue_tokens(
+        keys=keys,
+        issuer="test",
+        user_id=uuid.UUID(int=1),
+        workspace_id=uuid.UUID(int=2),
+        access_ttl_seconds=60,
+        refresh_ttl_seconds=60,
+    ).access_token
+
+
+def _pem() -> str:
+    return (
+        ed25519.Ed25519PrivateKey.generate()
+        .private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        .decode()
+    )
+
+
+@pytest.mark.parametrize("alg", ["HS256", "EdDSA", "ES256"])
+def test_sign_and_verify(alg: str) -> None:
+    key = JwtKey.hs256("s") if alg == "HS256" else JwtKey.generate(alg, "k1")
+    keys = KeySet(key, [key])
+    token = _issue(keys)
+
+    payload = decode_and_verify(token, keys=keys, issuer="test")
+    assert payload["sub"] == str(uuid.UUID(int=1))
+
+    other = JwtKey.hs256("x") if alg == "HS256" else JwtKey.generate(alg, "k1")
+    with pytest.raises(JwtError):
+        decode_and_verify(token, keys=KeySet(other, [other]), issuer="test")
+
+
+def test_rotation_keeps_tokens_of_previous_key_valid() -> None:
+    pems = {"old": _pem(), "new": _pem()}
+    old = create_key_set(
+        Settings(JWT_ALGORITHM="EdDSA", JWT_SIGNING_KEYS=pems, JWT_ACTIVE_KID="old")
+    )
+    new = create_key_set(
+        Settings(JWT_ALGORITHM="EdDSA", JWT_SIGNING_KEYS=pems, JWT_ACTIVE_KID="new")
+    )
+    token = _issue(old)
+
+    assert decode_and_verify(token, keys=new, issuer="test")["sub"]
+    assert [k["kid"] for k in new.jwks()["keys"]] == ["old", "new"]
+
+    # Ключ убран из набора — его токены больше не принимаются.
+    dropped = create_key_set(
+        Settings(JWT_ALGORITHM="EdDSA", JWT_SIGNING_KEYS={"new": pems["new"]})
+    )
+    with pytest.raises(JwtError):
+        decode_and_verify(token, keys=dropped, issuer="test")
+
+
+def test_jwks_endpoint() -> None:
+    settings = Settings(JWT_ALGORITHM="ES256", JWKS_MAX_AGE_SECONDS=60)
+    client = TestClient(create_app(settings))
+
+    r = client.get("/v1/auth/.well-known/jwks.json")
+
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "public, max-age=60"
+    (jwk,) = r.json()["keys"]
+    assert (jwk["kty"], jwk["crv"], jwk["alg"], jwk["kid"]) == (
+        "EC",
+        "P-256",
+        "ES256",
+        "dev",
+    )
+
+
+def test_hs256_rejected_under_asymmetric_algorithm() -> None:
+    hs256 = JwtKey.hs256("s")
+    token = _issue(KeySet(hs256, [hs256]))
+
+    eddsa = create_key_set(Settings(JWT_ALGORITHM="EdDSA", JWT_SECRET="s"))
+    with pytest.raises(JwtError):
+        decode_and_verify(token, keys=eddsa, issuer="test")
+
+    # Окно миграции: старые HS256-токены ещё принимаются.
+    migrating = create_key_set(
+        Settings(JWT_ALGORITHM="EdDSA", JWT_SECRET="s", JWT_ACCEPT_HS256=True)
+    )
+    assert decode_and_verify(token, keys=migrating, issuer="test")["sub"]
+
+
+def test_default_secret_refused_outside_local() -> None:
+    Settings(APP_ENV="test")
+    Settings(APP_ENV="prod", JWT_ALGORITHM="EdDSA")
+    Settings(APP_ENV="prod", JWT_SECRET="s")
+    with pytest.raises(ValidationError):
+        Settings(APP_ENV="prod")
+    with pytest.raises(ValidationError):
+        Settings(APP_ENV="prod", JWT_ALGORITHM="EdDSA", JWT_ACCEPT_HS256=True)
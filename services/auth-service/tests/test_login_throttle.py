@@ -0,0 +1,106 @@
+"""Защита логина: счётчики неудач, экспоненциальная блокировка, 429 до БД."""
+
+from __future__ import annotations
+
+from ipaddress import ip_network
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from auth_src.config.settings import Settings
+from auth_src.main import create_app
+from auth_src.security.passwords import verify_dummy_password
+from auth_src.use_cases.login_throttle import LoginThrottle, client_ip
+
+
+def _throttle(
+    now: list[float], *, per_email: int = 3, per_ip: int = 10
+) -> LoginThrottle:
+    return LoginThrottle(
+        max_failures_per_email=per_email,
+        max_failures_per_ip=per_ip,
+        lockout_base_s=30,
+        lockout_max_s=100,
+        window_s=600,
+        clock=lambda: now[0],
+    )
+
+
+@pytest.mark.asyncio
+async def test_lockout_grows_exponentially_and_success_resets() -> None:
+    now = [0.0]
+    throttle = _throttle(now)
+    for _ in range(2):
+        await throttle.record_failure("a@x.io", "1.1.1.1")
+    assert await throttle.retry_after("a@x.io", "1.1.1.1") == 0
+
+    await throttle.record_failure("a@x.io", "1.1.1.1")  # 3-я — блокировка 30с
+    assert await throttle.retry_after("a@x.io", "2.2.2.2") == 30
+
+    now[0] = 31
+    await throttle.record_failure("a@x.io", "1.1.1.1")  # 60с
+    assert await throttle.retry_after("a@x.io", "1.1.1.1") == 60
+    now[0] = 92
+    await throttle.record_failure("a@x.io", "1.1.1.1")  # 120 → потолок 100
+    assert await throttle.retry_after("a@x.io", "1.1.1.1") == 100
+
+    now[0] = 193
+    await throttle.record_success("a@x.io")
+    await throttle.record_failure("a@x.io", "1.1.1.1")
+    assert await throttle.retry_after("a@x.io", "1.1.1.1") == 0
+
+
+@pytest.mark.asyncio
+async def test_ip_counter_spans_emails() -> None:
+    now = [0.0]
+    throttle = _throttle(now, per_email=0, per_ip=3)
+    for n in range(3):
+        await throttle.record_failure(f"u{n}@x.io", "1.1.1.1")
+
+    assert await throttle.retry_after("other@x.io", "1.1.1.1") == 30
+    assert await throttle.retry_after("other@x.io", "2.2.2.2") == 0
+
+
+@pytest.mark.asyncio
+async def test_locked_login_is_rejected_before_db_and_hashing() -> None:
+    app = create_app(Settings(LOGIN_MAX_FAILURES_PER_EMAIL=1))
+    throttle: LoginThrottle = app.state.login_throttle
+    await throttle.record_failure("a@x.io", "testclient")
+
+    # БД в тестах нет: 429 без обращения к ней.
+    r = TestClient(app).post(
+        "/v1/auth/login", json={"email": "a@x.io", "password": "password1"}
+    )
+
+    assert r.status_code == 429
+    assert r.json()["code"] == "TOO_MANY_LOGIN_ATTEMPTS"
+    assert r.headers["retry-after"] == "30"
+
+
+def test_dummy_password_check_never_matches() -> None:
+    assert not verify_dummy_password("password1")
+
+
+def _request(peer: str, *forwarded: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_client_ip_trusts_forwarded_for_only_from_trusted_proxies() -> None:
+    gateway = [ip_network("10.0.0.0/8")]
+
+    # Без списка и не от доверенного прокси XFF — просто текст клиента.
+    assert client_ip(_request("10.0.0.2", "6.6.6.6")) == "10.0.0.2"
+    assert client_ip(_request("7.7.7.7", "6.6.6.6"), gateway) == "7.7.7.7"
+    # Через gateway: левее — то, что прислал клиент; правее — что дописал gateway.
+    assert client_ip(_request("10.0.0.2", "6.6.6.6, 7.7.7.7"), gateway) == "7.7.7.7"
+    assert client_ip(_request("10.0.0.2", "7.7.7.7, 10.0.0.3"), gateway) == "7.7.7.7"
+    assert client_ip(_request("10.0.0.2", "junk", "10.0.0.3"), gateway) == "junk"
+    assert client_ip(_request("10.0.0.2"), gateway) == "10.0.0.2"
+
+
+def test_ip_limit_is_off_until_trusted_proxies_are_configured() -> None:
+    assert Settings().login_max_failures_per_ip == 0
+    assert Settings(TRUSTED_PROXIES=["10.0.0.0/8"]).login_max_failures_per_ip == 50
+    assert Settings(LOGIN_MAX_FAILURES_PER_IP=7).login_max_failures_per_ip == 7
@@ -0,0 +1,208 @@
+"""Ротация refresh-токенов: атомарность при гонке и reuse detection."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from auth_src.use_cases.refresh_tokens import (
+    RefreshRejected,
+    RefreshReuseDetected,
+    RotatedToken,
+    rotate_refresh_token,
+)
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+USER = uuid.UUID(int=1)
+WORKSPACE = uuid.UUID(int=2)
+
+
+class _Result:
+    def __init__(self, row: Any) -> None:
+        self._row = row
+
+    def first(self) -> Any:
+        return self._row
+
+
+class _Database:
+    """Таблица refresh_tokens: UPDATE берёт блокировку строки до commit."""
+
+    def __init__(self) -> None:
+        self.rows: dict[uuid.UUID, SimpleNamespace] = {}
+        self.locks: dict[uuid.UUID, asyncio.Lock] = {}
+
+    def add(self, jti: uuid.UUID, family_id: uuid.UUID) -> None:
+        self.rows[jti] = SimpleNamespace(
+            jti=jti,
+            user_id=USER,
+            workspace_id=WORKSPACE,
+            family_id=family_id,
+            expires_at=NOW + timedelta(days=1),
+            revoked_at=None,
+        )
+        self.locks[jti] = asyncio.Lock()
+
+
+class _Session:
+    def __init__(self, db: _Database) -> None:
+        self.db = db
+        self.held: list[asyncio.Lock] = []
+
+    async def execute(self, stmt: Any) -> _Result:
+        sql = str(stmt)
+        params = stmt.compile().params
+        if sql.startswith("WITH rotated"):
+            jti = params["jti_1"]
+            lock = self.db.locks.get(jti)
+            if lock is None:
+                return _Result(None)
+            await lock.acquire()
+            self.held.append(lock)
+            # Как READ COMMITTED: условие перепроверяется после блокировки.
+            row = self.db.rows[jti]
+            await asyncio.sleep(0)
+            if row.revoked_at is not None or row.expires_at <= params["expires_at_1"]:
+                return _Result(None)
+            row.revoked_at = NOW
+            self.db.add(params["param_2"], row.family_id)
+            return _Result(row)
+        if sql.startswith("SELECT"):
+            row = self.db.rows.get(params["jti_1"])
+            if row is None:
+                return _Result(None)
+            # `now()` БД — те же часы, что поставили revoked_at.
+            in_grace = row.revoked_at is not None and (
+                row.revoked_at > NOW - params["now_1"]
+            )
+            return _Result(SimpleNamespace(**vars(row), in_grace=in_grace))
+        assert sql.startswith("UPDATE")
+        for row in self.db.rows.values():
+            if row.family_id == params["family_id_1"] and row.revoked_at is None:
+                row.revoked_at = NOW
+        return _Result(None)
+
+    async def commit(self) -> None:
+        for lock in self.held:
+            lock.release()
+        self.held.clear()
+
+
+async def _refresh(
+    db: _Database, jti: uuid.UUID, *, grace: int = 0
+) -> tuple[uuid.UUID, RotatedToken | Exception]:
+    session = _Session(db)
+    new_jti = uuid.uuid4()
+    try:
+        result: RotatedToken | Exception = await rotate_refresh_token(
+            session,  # type: ignore[arg-type]
+            jti=jti,
+            new_jti=new_jti,
+            now=NOW,
+            ttl_seconds=3600,
+            reuse_grace_seconds=grace,
+        )
+    except RefreshRejected as exc:
+        result = exc
+    await session.commit()
+    return new_jti, result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refresh_with_same_token_rotates_once() -> None:
+    db = _Database()
+    jti = uuid.uuid4()
+    db.add(jti, family_id=uuid.uuid4())
+
+    results = await asyncio.gather(*[_refresh(db, jti, grace=60) for _ in range(5)])
+
+    winners = [new for new, r in results if isinstance(r, RotatedToken)]
+    losers = [r for _, r in results if not isinstance(r, RotatedToken)]
+    assert len(winners) == 1
+    # В пределах grace проигравшие — не кража: семейство живо.
+    assert all(type(r) is RefreshRejected for r in losers)
+    assert db.rows[winners[0]].revoked_at is None
+
+
+@pytest.mark.asyncio
+async def test_reuse_of_rotated_token_revokes_family() -> None:
+    db = _Database()
+    family = uuid.uuid4()
+    first = uuid.uuid4()
+    db.add(first, family_id=family)
+
+    second, rotated = await _refresh(db, first)
+    assert rotated == RotatedToken(USER, WORKSPACE, family)
+
+    _, reused = await _refresh(db, first)
+    assert isinstance(reused, RefreshReuseDetected)
+    assert reused.family_id == family
+    assert db.rows[second].revoked_at is not None
+
+    # Неизвестный токен — просто отказ, без отзыва семейств.
+    _, unknown = await _refresh(db, uuid.uuid4())
+    assert type(unknown) is RefreshRejected
+
+
+class _Recorder:
+    """Записывает SQL (диалект PostgreSQL); ротировать нечего, токен отозван."""
+
+    def __init__(self) -> None:
+        self.sql: list[str] = []
+        self.params: list[dict[str, Any]] = []
+
+    async def execute(self, stmt: Any) -> _Result:
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.sql.append(" ".join(str(compiled).split()))
+        self.params.append(compiled.params)
+        if len(self.sql) == 2:
+            row = SimpleNamespace(
+                user_id=USER,
+                workspace_id=WORKSPACE,
+                family_id=uuid.uuid4(),
+                revoked_at=NOW - timedelta(minutes=1),
+                in_grace=False,
+            )
+            return _Result(row)
+        return _Result(None)
+
+
+@pytest.mark.asyncio
+async def test_rotation_statements() -> None:
+    """Атомарность и часы — в самом SQL: фейк выше их только повторяет."""
+    db = _Recorder()
+
+    with pytest.raises(RefreshReuseDetected):
+        await rotate_refresh_token(
+            db,  # type: ignore[arg-type]
+            jti=uuid.uuid4(),
+            new_jti=uuid.uuid4(),
+            now=NOW,
+            ttl_seconds=3600,
+            reuse_grace_seconds=5,
+        )
+
+    rotate, check, revoke = db.sql
+    # Один оператор: UPDATE с условием `revoked_at IS NULL` (перепроверяется
+    # после блокировки строки) и INSERT только из его RETURNING.
+    assert rotate.startswith(
+        "WITH rotated AS (UPDATE refresh_tokens SET revoked_at=now() "
+        "WHERE refresh_tokens.jti = %(jti_1)s::UUID "
+        "AND refresh_tokens.revoked_at IS NULL "
+    )
+    assert "INSERT INTO refresh_tokens" in rotate
+    assert "FROM rotated RETURNING" in rotate
+    # Grace сравнивается с now() БД, не с часами приложения.
+    assert "refresh_tokens.revoked_at > now() - %(now_1)s AS in_grace" in check
+    assert db.params[1]["now_1"] == timedelta(seconds=5)
+    assert revoke.startswith(
+        "UPDATE refresh_tokens SET revoked_at=now() "
+        "WHERE refresh_tokens.family_id = %(family_id_1)s::UUID "
+        "AND refresh_tokens.revoked_at IS NULL"
+    )
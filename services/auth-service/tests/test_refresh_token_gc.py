@@ -0,0 +1,91 @@
+"""GC refresh_tokens: keyset-батчи по истёкшим и давно отозванным."""
+
+from __future__ import annotations
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from auth_src.adapters.db.refresh_token_gc import RefreshTokenCollector
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+    def scalar_one(self) -> Any:
+        return self._rows[0]
+
+
+class _Engine:
+    def __init__(self, rows: list[SimpleNamespace]) -> None:
+        self.rows = rows
+        self.statements: list[tuple[str, dict[str, Any]]] = []
+
+    @asynccontextmanager
+    async def connect(self) -> Any:
+        yield self
+
+    begin = connect
+
+    async def execute(self, stmt: Any, params: dict[str, Any] | None = None) -> _Result:
+        sql, params = str(stmt), params or {}
+        self.statements.append((sql, params))
+        if "pg_partitioned_table" in sql:
+            return _Result([False])
+        column = "expires_at" if "WHERE expires_at" in sql else "revoked_at"
+        after = (params.get("after_ts"), params.get("after_id"))
+        batch = sorted(
+            (
+                r
+                for r in self.rows
+                if getattr(r, column) is not None
+                and getattr(r, column) < params["cutoff"]
+                and ("after_ts" not in params or (getattr(r, column), r.id) > after)
+            ),
+            key=lambda r: (getattr(r, column), r.id),
+        )[: params["limit"]]
+        for r in batch:
+            self.rows.remove(r)
+        return _Result([(getattr(r, column), r.id) for r in batch])
+
+
+def _row(expires_in: timedelta, revoked_ago: timedelta | None = None) -> Any:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        expires_at=NOW + expires_in,
+        revoked_at=NOW - revoked_ago if revoked_ago is not None else None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_deletes_expired_and_old_revoked_in_keyset_batches() -> None:
+    expired = [_row(timedelta(minutes=-i - 1)) for i in range(7)]
+    old_revoked = [_row(timedelta(days=10), timedelta(days=8)) for _ in range(2)]
+    keep = [_row(timedelta(days=10)), _row(timedelta(days=10), timedelta(days=1))]
+    engine = _Engine(expired + old_revoked + keep)
+
+    report = await RefreshTokenCollector(
+        engine,  # type: ignore[arg-type]
+        revoked_retention_days=7,
+        batch_size=3,
+    ).run(now=NOW)
+
+    assert (report.expired_rows, report.revoked_rows) == (7, 2)
+    assert engine.rows == keep
+    deletes = [p for sql, p in engine.statements if "DELETE" in sql]
+    # 7 истёкших: батчи 3+3+1, каждый следующий — после последнего ключа.
+    assert [d.get("after_ts") for d in deletes[:3]] == [
+        None,
+        expired[4].expires_at,
+        expired[1].expires_at,
+    ]
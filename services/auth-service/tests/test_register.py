@@ -0,0 +1,69 @@
+"""Регистрация: уникальность email — через INSERT ... ON CONFLICT, без SELECT."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from auth_src.adapters.db.unit_of_work import UnitOfWork, get_unit_of_work
+from auth_src.config.settings import Settings
+from auth_src.entrypoints.http import routes_auth
+from auth_src.main import create_app
+
+
+class _Result:
+    def scalar_one_or_none(self) -> Any:
+        return None  # RETURNING пуст: email уже занят
+
+
+class _Db:
+    def __init__(self, calls: list[str]) -> None:
+        self.calls = calls
+        self.sql: list[str] = []
+
+    async def execute(self, stmt: Any) -> _Result:
+        self.calls.append("execute")
+        self.sql.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result()
+
+    async def rollback(self) -> None:
+        self.calls.append("rollback")
+
+    async def commit(self) -> None:
+        self.calls.append("commit")
+
+    async def close(self) -> None:
+        self.calls.append("close")
+
+
+def test_taken_email_returns_409_after_single_insert(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+    db = _Db(calls)
+    hash_password = routes_auth.hash_password
+
+    def _hash(password: str) -> tuple[str, str, int]:
+        calls.append("hash")
+        return hash_password(password)
+
+    monkeypatch.setattr(routes_auth, "hash_password", _hash)
+    app = create_app(Settings())
+    uow = UnitOfWork(lambda: db)  # type: ignore[arg-type, return-value]
+    app.dependency_overrides[get_unit_of_work] = lambda: uow
+
+    r = TestClient(app).post(
+        "/v1/auth/register",
+        json={"email": "a@x.io", "password": "password1", "workspace_name": "W"},
+    )
+
+    assert r.status_code == 409
+    assert r.json()["code"] == "EMAIL_ALREADY_EXISTS"
+    # Хэш — до БД; один оператор вместо SELECT + INSERT; workspace откатан.
+    assert calls == ["hash", "execute", "rollback", "close"]
+    (sql,) = db.sql
+    assert sql.startswith("WITH ws AS")
+    assert "ON CONFLICT (email) DO NOTHING RETURNING users.id" in sql
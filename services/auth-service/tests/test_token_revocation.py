@@ -0,0 +1,107 @@
+"""Отзыв access-токенов: logout и reuse detection публикуют отзыв для gateway."""
+
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth_src.config.settings import Settings
+from auth_src.main import create_app
+from auth_src.security.jwt import decode_and_verify, issue_tokens
+from auth_src.use_cases.token_revocation import RevocationPublisher
+
+
+class _Redis:
+    def __init__(self) -> None:
+        self.added: list[tuple[str, dict[str, Any], dict[str, Any]]] = []
+
+    async def xadd(self, name: str, fields: dict[str, Any], **kwargs: Any) -> bytes:
+        self.added.append((name, fields, kwargs))
+        return b"1-0"
+
+    async def aclose(self) -> None:
+        return None
+
+
+def _publisher(redis: _Redis) -> RevocationPublisher:
+    return RevocationPublisher(redis=redis, access_ttl_s=900, clock=lambda: 1000.0)
+
+
+def test_logout_revokes_access_token_jti() -> None:
+    settings = Settings()
+    app = create_app(settings)
+    redis = _Redis()
+    app.state.revocations = _publisher(redis)
+    tokens = issue_tokens(
+        keys=app.state.jwt_keys,
+        issuer=settings.jwt_issuer,
+        user_id=uuid.uuid4(),
+        workspace_id=uuid.uuid4(),
+        access_ttl_seconds=60,
+        refresh_ttl_seconds=60,
+    )
+    claims = decode_and_verify(
+        tokens.access_token, keys=app.state.jwt_keys, issuer=settings.jwt_issuer
+    )
+
+    # Без refresh_token в теле — БД не нужна.
+    r = TestClient(app).post(
+        "/v1/auth/logout",
+        headers={"Authorization": f"Bearer {tokens.access_token}"},
+    )
+
+    assert r.status_code == 204
+    assert redis.added == [
+        (
+            "auth:revocations",
+            {"kind": "jti", "id": claims["jti"], "exp": claims["exp"]},
+            # Записи старше access TTL отрезаются при записи.
+            {"minid": 100_000, "approximate": True},
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_covers_tokens_issued_before_current_second() -> None:
+    redis = _Redis()
+    user_id = uuid.uuid4()
+
+    await _publisher(redis).revoke_user(user_id)
+    await RevocationPublisher(access_ttl_s=900).revoke_user(user_id)  # без Redis
+
+    ((_, fields, _),) = redis.added
+    assert fields == {"kind": "user", "id": str(user_id), "iat": 999, "exp": 1900}
+
+
+@pytest.mark.asyncio
+async def test_login_in_same_second_as_revoke_user_is_not_revoked() -> None:
+    settings = Settings()
+    app = create_app(settings)
+    redis = _Redis()
+    user_id = uuid.uuid4()
+    revoked_at = time.time()
+
+    await RevocationPublisher(
+        redis=redis, access_ttl_s=900, clock=lambda: revoked_at
+    ).revoke_user(user_id)
+    tokens = issue_tokens(
+        keys=app.state.jwt_keys,
+        issuer=settings.jwt_issuer,
+        user_id=user_id,
+        workspace_id=uuid.uuid4(),
+        access_ttl_seconds=60,
+        refresh_ttl_seconds=60,
+    )
+    claims = decode_and_verify(
+        tokens.access_token, keys=app.state.jwt_keys, issuer=settings.jwt_issuer
+    )
+
+    # Gateway отзывает токены пользователя с iat <= опубликованного iat;
+    # токен, выданный в ту же секунду, что и отзыв, под него не попадает.
+    ((_, fields, _),) = redis.added
+    assert claims["iat"] >= int(revoked_at)
+    assert claims["iat"] > fields["iat"]
@@ -0,0 +1,100 @@
+"""UnitOfWork: сессия на DB-фазу, соединение не держится между фазами."""
+
+from __future__ import annotations
+
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth_src.adapters.db.models import Workspace
+from auth_src.adapters.db.unit_of_work import UnitOfWork, get_unit_of_work
+from auth_src.config.settings import Settings
+from auth_src.entrypoints.http import routes_auth
+from auth_src.main import create_app
+
+
+@pytest.mark.asyncio
+async def test_phase_closes_session_and_discards_uncommitted_work() -> None:
+    sessions: list[AsyncSession] = []
+
+    def _session() -> AsyncSession:
+        sessions.append(AsyncSession())  # без bind: до flush соединение не нужно
+        return sessions[-1]
+
+    uow = UnitOfWork(_session)
+
+    with pytest.raises(RuntimeError):
+        async with uow() as db:
+            db.add(Workspace(id=uuid.uuid4(), name="W"))
+            assert db.in_transaction()
+            raise RuntimeError("handler failed")
+    async with uow() as db:
+        db.add(Workspace(id=uuid.uuid4(), name="W"))  # без commit
+
+    # Каждая фаза — своя сессия; после фазы транзакции нет, добавленное отброшено.
+    assert len(sessions) == 2
+    for session in sessions:
+        assert not session.in_transaction()
+        assert not session.new
+
+
+class _Result:
+    def __init__(self, value: Any) -> None:
+        self._value = value
+
+    def scalar_one_or_none(self) -> Any:
+        return self._value
+
+
+class _Db:
+    def __init__(self, calls: list[str], user: Any) -> None:
+        self.calls = calls
+        self.user = user
+
+    async def execute(self, stmt: Any) -> _Result:
+        self.calls.append("execute")
+        return _Result(self.user)
+
+    def add(self, obj: Any) -> None:
+        self.calls.append("add")
+
+    async def commit(self) -> None:
+        self.calls.append("commit")
+
+    async def close(self) -> None:
+        self.calls.append("close")
+
+
+def test_login_releases_connection_before_pbkdf2(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+    user = SimpleNamespace(
+        id=uuid.uuid4(),
+        workspace_id=uuid.uuid4(),
+        email="a@x.io",
+        password_hash="h",
+        password_salt="s",
+        password_iterations=1,
+    )
+
+    def _verify(password: str, **kwargs: Any) -> bool:
+        calls.append("pbkdf2")
+        return True
+
+    monkeypatch.setattr(routes_auth, "verify_password", _verify)
+    app = create_app(Settings())
+    uow = UnitOfWork(lambda: _Db(calls, user))  # type: ignore[arg-type, return-value]
+    app.dependency_overrides[get_unit_of_work] = lambda: uow
+
+    r = TestClient(app).post(
+        "/v1/auth/login", json={"email": "a@x.io", "password": "password1"}
+    )
+
+    assert r.status_code == 200
+    # Чтение пользователя → close → PBKDF2 → новая сессия на refresh-токен.
+    assert calls == ["execute", "close", "pbkdf2", "add", "commit", "close"]
@@ -0,0 +1,91 @@
+"""/me: ответ из claims и кэш профилей (LRU + TTL + Redis-уровень)."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth_src.config.settings import Settings
+from auth_src.main import create_app
+from auth_src.security.jwt import issue_tokens
+from auth_src.security.keys import create_key_set
+from auth_src.use_cases.user_cache import UserCache, UserProfile
+
+
+def _profile(n: int) -> UserProfile:
+    return UserProfile(
+        user_id=uuid.UUID(int=n),
+        email=f"u{n}@example.com",
+        workspace_id=uuid.UUID(int=0),
+    )
+
+
+class _Redis:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    async def get(self, key: str) -> Any:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: Any, ex: int) -> None:
+        self.data[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_lru_and_ttl() -> None:
+    now = [0.0]
+    cache = UserCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    for n in (1, 2):
+        await cache.set(_profile(n))
+    assert await cache.get(uuid.UUID(int=1)) == _profile(1)  # 1 — свежий
+
+    await cache.set(_profile(3))  # вытесняет 2
+    assert await cache.get(uuid.UUID(int=2)) is None
+
+    now[0] = 11
+    assert await cache.get(uuid.UUID(int=1)) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_invalidated() -> None:
+    redis = _Redis()
+    writer = UserCache(max_size=10, ttl_seconds=30, redis=redis)
+    reader = UserCache(max_size=10, ttl_seconds=30, redis=redis)
+
+    await writer.set(_profile(1))
+    assert await reader.get(uuid.UUID(int=1)) == _profile(1)
+
+    await writer.invalidate(uuid.UUID(int=1))
+    assert not redis.data
+    assert await writer.get(uuid.UUID(int=1)) is None
+
+
+def test_me_is_served_from_claims_without_db() -> None:
+    settings = Settings(JWT_EMBED_EMAIL=True)
+    tokens = issue_tokens(
+        keys=create_key_set(settings),
+        issuer=settings.jwt_issuer,
+        user_id=uuid.UUID(int=1),
+        workspace_id=uuid.UUID(int=2),
+        access_ttl_seconds=60,
+        refresh_ttl_seconds=60,
+        email="u1@example.com",
+    )
+    client = TestClient(create_app(settings))
+
+    r = client.get(
+        "/v1/auth/me", headers={"Authorization": f"Bearer {tokens.access_token}"}
+    )
+
+    assert r.status_code == 200
+    assert r.json() == {
+        "user_id": str(uuid.UUID(int=1)),
+        "email": "u1@example.com",
+        "workspace_id": str(uuid.UUID(int=2)),
+    }
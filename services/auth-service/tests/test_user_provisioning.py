@@ -0,0 +1,125 @@
+"""Пакетное создание пользователей: ошибки по строкам, инвайты, доступ."""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from auth_src.adapters.db.audit_sink import AuditSink
+from auth_src.config.settings import Settings
+from auth_src.main import create_app
+from auth_src.use_cases.user_provisioning import (
+    NewUser,
+    hash_invite_token,
+    provision_users,
+)
+
+WS = uuid.UUID(int=7)
+
+
+class _Row:
+    def __init__(self, **values: Any) -> None:
+        self.__dict__.update(values)
+
+
+class _Db:
+    """AsyncSession без БД: email `taken@x.io` уже есть, `raced@x.io` занимают
+    между проверкой и INSERT."""
+
+    def __init__(self) -> None:
+        self.inserted: dict[str, list[dict[str, Any]]] = {}
+
+    async def get(self, model: Any, ident: Any) -> Any:
+        return object() if ident == WS else None
+
+    async def scalars(self, stmt: Any) -> list[str]:
+        (emails,) = stmt.compile(dialect=postgresql.dialect()).params.values()
+        return [e for e in emails if e == "taken@x.io"]
+
+    async def rollback(self) -> None:
+        return None
+
+    async def execute(self, stmt: Any) -> list[_Row]:
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        rows: dict[str, dict[str, Any]] = {}
+        for key, value in params.items():
+            column, _, n = key.rpartition("_m")
+            rows.setdefault(n, {})[column] = value
+        self.inserted[stmt.table.name] = list(rows.values())
+        return [
+            _Row(id=r["id"], email=r.get("email"))
+            for r in rows.values()
+            if r.get("email") != "raced@x.io"
+        ]
+
+
+class _Hasher:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def hash_many(self, passwords: Sequence[str]) -> list[tuple[str, str, int]]:
+        self.calls.extend(passwords)
+        return [(f"h:{p}", "salt", 1) for p in passwords]
+
+
+@pytest.mark.asyncio
+async def test_rows_fail_independently_and_invites_are_issued() -> None:
+    db, hasher = _Db(), _Hasher()
+    users = [
+        NewUser(email=" New@X.io ", password="password1"),
+        NewUser(email="not-an-email", password="password1"),
+        NewUser(email="short@x.io", password="123"),
+        NewUser(email="nopass@x.io"),
+        NewUser(email="new@x.io", password="password2"),
+        NewUser(email="taken@x.io", password="password3"),
+        NewUser(email="raced@x.io", password="password4"),
+        NewUser(email="invited@x.io", invite=True),
+    ]
+
+    results = await provision_users(
+        db,  # type: ignore[arg-type]
+        workspace_id=WS,
+        users=users,
+        hasher=hasher,  # type: ignore[arg-type]
+        audit=AuditSink(None),  # type: ignore[arg-type]
+        now=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        invite_ttl_seconds=60,
+    )
+
+    assert [r.error for r in results] == [
+        None,
+        "INVALID_EMAIL",
+        "PASSWORD_TOO_SHORT",
+        "PASSWORD_OR_INVITE_REQUIRED",
+        "DUPLICATE_IN_BATCH",
+        "EMAIL_ALREADY_EXISTS",
+        "EMAIL_ALREADY_EXISTS",
+        None,
+    ]
+    assert results[0].email == "new@x.io" and results[0].user_id is not None
+    # Хэшируются только строки, дошедшие до INSERT; у инвайта пароля нет.
+    assert hasher.calls == ["password1", "password4"]
+
+    token = results[7].invite_token
+    assert token is not None
+    (invite,) = db.inserted["user_invites"]
+    assert invite["token_hash"] == hash_invite_token(token)
+    assert invite["user_id"] == results[7].user_id
+    assert len(db.inserted["audit_log"]) == 2
+
+
+def test_batch_requires_admin_token() -> None:
+    client = TestClient(create_app(Settings(ADMIN_API_TOKEN="secret")))
+    url = f"/v1/auth/workspaces/{WS}/users:batch"
+    body = {"users": [{"email": "a@x.io", "password": "password1"}]}
+
+    assert client.post(url, json=body).status_code == 403
+    r = client.post(url, json=body, headers={"X-Admin-Token": "wrong"})
+    assert r.status_code == 403
+    assert r.json()["code"] == "FORBIDDEN"
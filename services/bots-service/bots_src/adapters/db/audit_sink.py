@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import deque
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
+from starlette.requests import Request
+
+from ...config.settings import Settings
+from .audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["transactional", "drop"]
+
+# Ключ `Session.info`: async-события транзакции, ждущие её commit.
+_PENDING = "audit_sink.pending"
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    """Событие аудита (одна строка `audit_log`).
+
+    `id`/`created_at` проставляем на стороне приложения, чтобы строка была
+    одинаковой и при транзакционной, и при отложенной записи.
+    """
+
+    workspace_id: uuid.UUID
+    action: str
+    resource_type: str
+    resource_id: uuid.UUID | None = None
+    user_id: uuid.UUID | None = None
+    operation_id: uuid.UUID | None = None
+    changes: dict[str, Any] | None = None
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def as_row(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "workspace_id": self.workspace_id,
+            "user_id": self.user_id,
+            "operation_id": self.operation_id,
+            "action": self.action,
+            "resource_type": self.resource_type,
+            "resource_id": self.resource_id,
+            "changes": self.changes,
+            "created_at": self.created_at,
+        }
+
+
+class AuditSink:
+    """Запись audit_log в одном из двух режимов (выбирается по `action`).
+
+    • transactional — строка добавляется в сессию запроса и коммитится вместе
+      с бизнес-изменениями (поведение по умолчанию).
+    • async — событие кладётся в ограниченную in-process очередь и пишется
+      фоновой задачей multi-row INSERT'ом каждые `flush_interval_ms`
+      или при накоплении `flush_max_events` событий.
+
+    Async-событие встаёт в очередь только после успешного commit сессии
+    запроса (событие `after_commit`); при откате или закрытии сессии без
+    commit отбрасывается. Атомарности с транзакцией нет: событие после
+    commit может потеряться (`drop`, падение процесса до flush). Поэтому async
+    включаем только для action'ов, где это приемлемо (`AUDIT_ASYNC_ACTIONS`).
+
+    Надёжность async-режима: при ошибке записи пачка возвращается в очередь
+    и повторяется на следующем flush. После `flush_max_attempts` неудач подряд
+    пачка пишется по одному событию: событие, которое не записалось и так,
+    логируется и отбрасывается (считаем в `failed`), остальная очередь пишется
+    дальше — одно плохое событие не блокирует аудит. Та же участь ждёт события
+    при недоступности БД дольше `flush_max_attempts` flush'ей.
+
+    При переполнении очереди срабатывает `overflow_policy` (`transactional` —
+    пишем в транзакции запроса, `drop` — отбрасываем событие и считаем
+    в `dropped`).
+    При остановке приложения `aclose()` дописывает остаток очереди.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        *,
+        async_actions: Collection[str] = (),
+        flush_interval_ms: int = 200,
+        flush_max_events: int = 500,
+        max_queue_size: int = 10_000,
+        overflow_policy: OverflowPolicy = "transactional",
+        flush_max_attempts: int = 5,
+    ) -> None:
+        self._sessionmaker = sessionmaker
+        self.async_actions = frozenset(async_actions)
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_events = max(1, flush_max_events)
+        self.max_queue_size = max(1, max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.flush_max_attempts = max(1, flush_max_attempts)
+
+        self.dropped = 0
+        self.failed = 0
+        # Неудачные попытки записать пачку из головы очереди подряд.
+        self._attempts = 0
+        self._queue: deque[AuditEvent] = deque()
+        # Async-события незавершённых транзакций: место в очереди за ними
+        # зарезервировано, чтобы после commit не превысить max_queue_size.
+        self._uncommitted = 0
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def record(self, db: AsyncSession, event: AuditEvent) -> None:
+        """Записать событие согласно режиму его action.
+
+        Для transactional-режима строка попадёт в БД только после `db.commit()`,
+        async-событие — в очередь.
+        """
+        if not self._deferred(db, event):
+            db.add(AuditLog(**event.as_row()))
+
+    async def record_many(self, db: AsyncSession, events: Sequence[AuditEvent]) -> None:
+        """Как `record` для пачки: transactional-строки — одним multi-row INSERT
+        в транзакции `db` (сразу, без ожидания flush сессии)."""
+        rows = [event.as_row() for event in events if not self._deferred(db, event)]
+        if rows:
+            await db.execute(insert(AuditLog).values(rows))
+
+    async def flush(self) -> int:
+        """Записать всё, что накопилось в очереди. Возвращает число строк."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        written = 0
+        async with self._flush_lock:
+            while self._queue:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.flush_max_events, len(self._queue)))
+                ]
+                try:
+                    await self._write_batch(batch)
+                except Exception:
+                    self._attempts += 1
+                    if self._attempts < self.flush_max_attempts:
+                        # Возвращаем пачку в голову очереди — повторим позже.
+                        self._queue.extendleft(reversed(batch))
+                        raise
+                    written += await self._write_each(batch)
+                else:
+                    written += len(batch)
+                self._attempts = 0
+        return written
+
+    async def aclose(self) -> None:
+        """Остановить фоновую запись и дописать остаток очереди."""
+        self._closed = True
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._queue:
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    "audit sink: не удалось дописать %d событий при остановке",
+                    len(self._queue),
+                )
+
+    # ------------------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------------------
+
+    def _deferred(self, db: AsyncSession, event: AuditEvent) -> bool:
+        """True — событие ждёт commit `db` (или отброшено по `drop`)."""
+        if self._closed or event.action not in self.async_actions:
+            return False
+        if len(self._queue) + self._uncommitted >= self.max_queue_size:
+            if self.overflow_policy == "drop":
+                self.dropped += 1
+                return True
+            return False
+        self._pending(db.sync_session).append(event)
+        self._uncommitted += 1
+        return True
+
+    def _pending(self, session: Session) -> list[AuditEvent]:
+        # Событие принадлежит текущей транзакции: без неё откат до первого
+        # запроса нечего было бы откатывать, и событие ушло бы со следующим commit.
+        if not session.in_transaction():
+            session.begin()
+        pending: list[AuditEvent] | None = session.info.get(_PENDING)
+        if pending is None:
+            pending = session.info[_PENDING] = []
+            sa_event.listen(session, "after_commit", self._after_commit)
+            sa_event.listen(
+                session, "after_transaction_end", self._after_transaction_end
+            )
+        return pending
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info[_PENDING]
+        self._uncommitted -= len(pending)
+        for event in pending:
+            self._enqueue(event)
+        pending.clear()
+
+    def _after_transaction_end(
+        self, session: Session, transaction: SessionTransaction
+    ) -> None:
+        # Корневая транзакция закончилась без commit (после него список пуст).
+        if transaction.parent is None:
+            pending = session.info[_PENDING]
+            self._uncommitted -= len(pending)
+            pending.clear()
+
+    def _enqueue(self, event: AuditEvent) -> None:
+        self._queue.append(event)
+        self._ensure_flusher()
+        if len(self._queue) >= self.flush_max_events and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_flusher(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    "audit sink: ошибка записи, %d событий ждут повтора",
+                    len(self._queue),
+                )
+
+    async def _write_each(self, batch: list[AuditEvent]) -> int:
+        """Записать пачку по одному событию, отбрасывая незаписываемые."""
+        written = 0
+        for event in batch:
+            try:
+                await self._write_batch([event])
+            except Exception:
+                self.failed += 1
+                logger.exception(
+                    "audit sink: событие %s (%s) не записано после %d попыток, "
+                    "отброшено",
+                    event.id,
+                    event.action,
+                    self.flush_max_attempts,
+                )
+            else:
+                written += 1
+        return written
+
+    async def _write_batch(self, batch: list[AuditEvent]) -> None:
+        async with self._sessionmaker() as session:
+            await session.execute(
+                insert(AuditLog).values([event.as_row() for event in batch])
+            )
+            await session.commit()
+
+
+def create_audit_sink(
+    settings: Settings, sessionmaker: async_sessionmaker[AsyncSession]
+) -> AuditSink:
+    return AuditSink(
+        sessionmaker,
+        async_actions=settings.audit_async_actions,
+        flush_interval_ms=settings.audit_flush_interval_ms,
+        flush_max_events=settings.audit_flush_max_events,
+        max_queue_size=settings.audit_queue_max_size,
+        overflow_policy=settings.audit_overflow_policy,
+        flush_max_attempts=settings.audit_flush_max_attempts,
+    )
+
+
+def get_audit_sink(request: Request) -> AuditSink:
+    """FastAPI dependency: общий на процесс AuditSink."""
+    return request.app.state.audit_sink  # type: ignore[no-any-return]
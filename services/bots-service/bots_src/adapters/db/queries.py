@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from collections.abc import Collection, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import Select, func, select
+
+from .models import Bot, BotVersion
+
+
+class Projection:
+    """Набор колонок для read-запроса и имена полей, под которыми они уходят
+    в ответ.
+
+    Read-эндпоинты выбирают только нужные колонки (`select(Bot.id, ...)`)
+    и получают строки-кортежи: без ORM-сущностей, identity map и
+    отслеживания изменений. `rows()` превращает кортежи в dict-ы — их
+    сериализует `TypeAdapter` роута.
+    """
+
+    __slots__ = ("columns", "fields")
+
+    def __init__(self, *columns: Any) -> None:
+        self.columns: tuple[Any, ...] = columns
+        self.fields: tuple[str, ...] = tuple(c.key for c in columns)
+
+    def select(self) -> Select[Any]:
+        return select(*self.columns)
+
+    def only(self, fields: Collection[str]) -> Projection:
+        """Подмножество колонок (порядок исходной проекции сохраняется)."""
+        return Projection(
+            *(
+                c
+                for c, name in zip(self.columns, self.fields, strict=True)
+                if name in fields
+            )
+        )
+
+    def rows(self, result: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+        fields = self.fields
+        return [dict(zip(fields, row, strict=True)) for row in result]
+
+
+# Текущая версия — max(version) по бот-у: коррелированный подзапрос идёт
+# по ux_bot_versions_workspace_bot_version (index-only, одна строка на бота)
+# вместо GROUP BY по всем версиям воркспейса.
+_CURRENT_VERSION = (
+    select(func.coalesce(func.max(BotVersion.version), 0))
+    .where(
+        BotVersion.workspace_id == Bot.workspace_id,
+        BotVersion.bot_id == Bot.id,
+    )
+    .scalar_subquery()
+    .label("current_version")
+)
+
+BOT_ROW = Projection(
+    Bot.id,
+    Bot.workspace_id,
+    Bot.name,
+    Bot.status,
+    Bot.created_at,
+    _CURRENT_VERSION,
+)
@@ -2,16 +2,20 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
+from typing import cast
 
 from fastapi import APIRouter, Depends, Header, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
+from typing_extensions import TypedDict
 
-from ...adapters.db.audit import AuditLog
+from ...adapters.db.audit_sink import AuditEvent, AuditSink, get_audit_sink
 from ...adapters.db.models import Bot, BotVersion
+from ...adapters.db.queries import BOT_ROW
 from ...adapters.db.session import get_db_session
+from .responses import RawJSONResponse
 
 router = APIRouter(prefix="/v1/bots", tags=["bots"])
 
@@ -35,6 +39,27 @@ class BotsListResponse(BaseModel):
     items: list[BotResponse]
 
 
+# Быстрый путь list_bots: строки-кортежи (`BOT_ROW`) сериализуются сразу в
+# байты. `_BotRow` повторяет `BotResponse` поле в поле — ответ тот же, схема
+# OpenAPI берётся из `response_model`.
+
+
+class _BotRow(TypedDict):
+    id: uuid.UUID
+    workspace_id: uuid.UUID
+    name: str
+    status: str
+    created_at: datetime
+    current_version: int
+
+
+class _BotsPayload(TypedDict):
+    items: list[_BotRow]
+
+
+_BOTS_JSON = TypeAdapter(_BotsPayload)
+
+
 class UpdateInstructionRequest(BaseModel):
     instruction: str = Field(min_length=1, max_length=50_000)
     settings: dict = Field(default_factory=dict)
@@ -44,36 +69,15 @@ class UpdateInstructionRequest(BaseModel):
 async def list_bots(
     request: Request,
     db: AsyncSession = Depends(get_db_session),
-) -> BotsListResponse:
+) -> RawJSONResponse:
     workspace_id = _require_workspace_id(request)
-
-    # Для MVP: вытаскиваем “текущую версию” через подзапрос max(version)
-    subq = (
-        select(BotVersion.bot_id, func.max(BotVersion.version).label("max_version"))
-        .where(BotVersion.workspace_id == workspace_id)
-        .group_by(BotVersion.bot_id)
-        .subquery()
-    )
-    q = (
-        select(Bot, subq.c.max_version)
-        .outerjoin(subq, subq.c.bot_id == Bot.id)
+    rows = await db.execute(
+        BOT_ROW.select()
         .where(Bot.workspace_id == workspace_id)
         .order_by(desc(Bot.created_at))
     )
-    rows = (await db.execute(q)).all()
-    items: list[BotResponse] = []
-    for bot, max_version in rows:
-        items.append(
-            BotResponse(
-                id=bot.id,
-                workspace_id=bot.workspace_id,
-                name=bot.name,
-                status=bot.status,
-                created_at=bot.created_at,
-                current_version=int(max_version or 0),
-            )
-        )
-    return BotsListResponse(items=items)
+    items = cast(list[_BotRow], BOT_ROW.rows(rows))
+    return RawJSONResponse(_BOTS_JSON.dump_json({"items": items}))
 
 
 @router.post("", response_model=BotResponse, status_code=201)
@@ -81,6 +85,7 @@ async def create_bot(
     request: Request,
     body: BotCreateRequest,
     db: AsyncSession = Depends(get_db_session),
+    audit: AuditSink = Depends(get_audit_sink),
     x_operation_id: str | None = Header(default=None, alias="X-Operation-Id"),
 ) -> BotResponse:
     workspace_id = _require_workspace_id(request)
@@ -133,16 +138,16 @@ async def create_bot(
         created_at=now,
     )
     db.add(version_row)
-    db.add(
-        AuditLog(
+    audit.record(
+        db,
+        AuditEvent(
             workspace_id=workspace_id,
-            user_id=None,
             operation_id=operation_uuid,
             action="BOT_CREATED",
             resource_type="bot",
             resource_id=bot.id,
             changes={"name": bot.name, "status": bot.status},
-        )
+        ),
     )
     await db.commit()
 
@@ -199,6 +204,7 @@ async def update_instruction(
     bot_id: uuid.UUID,
     body: UpdateInstructionRequest,
     db: AsyncSession = Depends(get_db_session),
+    audit: AuditSink = Depends(get_audit_sink),
     x_operation_id: str | None = Header(default=None, alias="X-Operation-Id"),
 ) -> BotResponse:
     """Создаёт новую версию конфигурации бота."""
@@ -247,6 +253,7 @@ async def update_instruction(
 
     now = datetime.now(timezone.utc)
     version_row = BotVersion(
+        id=uuid.uuid4(),
         workspace_id=workspace_id,
         bot_id=bot.id,
         version=next_version,
@@ -256,10 +263,10 @@ async def update_instruction(
         created_at=now,
     )
     db.add(version_row)
-    db.add(
-        AuditLog(
+    audit.record(
+        db,
+        AuditEvent(
             workspace_id=workspace_id,
-            user_id=None,
             operation_id=operation_uuid,
             action="BOT_INSTRUCTION_UPDATED",
             resource_type="bot_version",
@@ -268,7 +275,7 @@ async def update_instruction(
                 "bot_id": str(bot.id),
                 "version": next_version,
             },
-        )
+        ),
     )
     await db.commit()
 
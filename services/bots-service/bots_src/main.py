@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -10,8 +12,10 @@ from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.requests import Request
 
+from bots_src.adapters.db.audit_sink import create_audit_sink
 from bots_src.adapters.db.session import create_sessionmaker
 from bots_src.config.settings import Settings
+from bots_src.entrypoints.http.responses import FastJSONResponse
 from bots_src.entrypoints.http.routes_bots import router as bots_router
 from bots_src.entrypoints.http.routes_health import router as health_router
 from bots_src.errors.http_errors import ErrorResponse
@@ -70,10 +74,23 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     return JSONResponse(status_code=500, content=payload)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Дописываем отложенные audit-события до остановки процесса.
+    await app.state.audit_sink.aclose()
+
+
 def create_app(settings: Settings) -> FastAPI:
-    app = FastAPI(title="LivAi Bots Service", version="0.1.0")
+    app = FastAPI(
+        title="LivAi Bots Service",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
     app.state.settings = settings
     app.state.db_sessionmaker = create_sessionmaker(settings)
+    app.state.audit_sink = create_audit_sink(settings, app.state.db_sessionmaker)
 
     app.add_middleware(TenantMiddleware)
     app.add_middleware(
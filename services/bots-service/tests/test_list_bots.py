@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi.testclient import TestClient
+
+from bots_src.adapters.db.session import get_db_session
+from bots_src.config.settings import Settings
+from bots_src.entrypoints.http.routes_bots import BotResponse, BotsListResponse
+from bots_src.main import create_app
+
+
+class _Session:
+    def __init__(self, rows: list[tuple[Any, ...]]) -> None:
+        self._rows = rows
+
+    async def execute(self, stmt: object) -> list[tuple[Any, ...]]:
+        return self._rows
+
+
+def test_list_bots_matches_response_model() -> None:
+    workspace_id = uuid.uuid4()
+    bots = [
+        BotResponse(
+            id=uuid.uuid4(),
+            workspace_id=workspace_id,
+            name=f"бот {i}",
+            status="draft",
+            created_at=datetime.now(timezone.utc),
+            current_version=i,
+        )
+        for i in range(3)
+    ]
+    app = create_app(Settings())
+
+    async def _db() -> AsyncIterator[_Session]:
+        yield _Session([tuple(b.model_dump().values()) for b in bots])
+
+    app.dependency_overrides[get_db_session] = _db
+    r = TestClient(app).get("/v1/bots", headers={"X-Workspace-Id": str(workspace_id)})
+
+    assert r.status_code == 200
+    assert r.content == BotsListResponse(items=bots).model_dump_json().encode()
@@ -0,0 +1,128 @@
+"""Стоимость сборки ответа `GET /threads/{id}/messages`.
+
+Одни и те же строки из БД (по умолчанию 1000 сообщений, кортежи колонок)
+превращаются в тело HTTP-ответа несколькими способами:
+
+- `stdlib`  — модели → `JSONResponse(jsonable_encoder(model))`: dict-обход +
+  `json.dumps` (так отвечает роут, вернувший dict);
+- `default` — модели → путь FastAPI для `response_model`: повторная
+  валидация + `dump_json` (так было до `FastJSONResponse`);
+- `direct`  — модели → `FastJSONResponse(model)`: без повторной валидации;
+- `rows`    — кортежи → dict → `TypeAdapter.dump_json` без Pydantic-моделей
+  (текущий вариант роута);
+- `meta`    — то же с `?fields=id,role,created_at` (без `content`).
+
+БД и HTTP не участвуют: меряется только сборка тела ответа.
+
+Запуск (из каталога сервиса):
+
+    python -m benchmarks.bench_list_messages --messages 1000 --rounds 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from conversations_src.adapters.db.queries import MESSAGE_ROW
+from conversations_src.entrypoints.http.responses import (
+    FastJSONResponse,
+    RawJSONResponse,
+)
+from conversations_src.entrypoints.http.routes_conversations import (
+    _MESSAGES_JSON,
+    MessageResponse,
+    MessagesListResponse,
+)
+
+Row = tuple[Any, ...]
+
+
+def _rows(messages: int) -> list[Row]:
+    thread_id = uuid.uuid4()
+    started = datetime.now(timezone.utc)
+    return [
+        (
+            uuid.uuid4(),
+            thread_id,
+            "user" if i % 2 == 0 else "assistant",
+            f"Сообщение {i}: " + "lorem ipsum dolor sit amet " * 8,
+            started + timedelta(milliseconds=i),
+            uuid.uuid4(),
+        )
+        for i in range(messages)
+    ]
+
+
+def _model(rows: list[Row]) -> MessagesListResponse:
+    return MessagesListResponse(
+        items=[MessageResponse(**item) for item in MESSAGE_ROW.rows(rows)]
+    )
+
+
+def _cases(rows: list[Row]) -> dict[str, Callable[[], bytes]]:
+    adapter = TypeAdapter(MessagesListResponse)
+
+    def stdlib() -> bytes:
+        return bytes(JSONResponse(jsonable_encoder(_model(rows))).body)
+
+    def default() -> bytes:
+        validated = adapter.validate_python(_model(rows), from_attributes=True)
+        content = adapter.dump_json(validated)
+        return bytes(Response(content, media_type="application/json").body)
+
+    def direct() -> bytes:
+        return bytes(FastJSONResponse(_model(rows)).body)
+
+    def raw() -> bytes:
+        items = MESSAGE_ROW.rows(rows)
+        return bytes(RawJSONResponse(_MESSAGES_JSON.dump_json({"items": items})).body)
+
+    # `?fields=id,role,created_at`: content не читается из БД и не пишется.
+    meta = MESSAGE_ROW.only({"id", "role", "created_at"})
+    meta_idx = [MESSAGE_ROW.fields.index(name) for name in meta.fields]
+    meta_rows = [tuple(row[i] for i in meta_idx) for row in rows]
+
+    def raw_meta() -> bytes:
+        items = meta.rows(meta_rows)
+        return bytes(RawJSONResponse(_MESSAGES_JSON.dump_json({"items": items})).body)
+
+    return {
+        "stdlib": stdlib,
+        "default": default,
+        "direct": direct,
+        "rows": raw,
+        "meta": raw_meta,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    cases = _cases(_rows(args.messages))
+    print(f"messages={args.messages} rounds={args.rounds}")
+    print(f"{'case':<8} {'ms/response':>12} {'bytes':>10}")
+    for name, render in cases.items():
+        body = render()
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            render()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<8} {elapsed / args.rounds * 1e3:>12.3f} {len(body):>10}")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=500)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(_parse_args())
@@ -0,0 +1,195 @@
+"""Бенчмарк занятости пула соединений: сессия на запрос против UnitOfWork.
+
+Сколько одновременных логинов и turn'ов выдерживает пул фиксированного
+размера, если соединение держится весь обработчик (`request` — как с
+`get_db_session`) или только DB-фазы (`uow` — adapters/db/unit_of_work.py).
+
+Postgres не нужен: пул моделируется (`--pool-size` соединений, ожидание
+свободного не дольше `--pool-timeout`, как у `QueuePool`), запрос к БД —
+задержка `--db-ms`. Сессия берёт соединение первым запросом и отдаёт при
+`close()` — как AsyncSession. Сценарии (не-БД работа — между фазами):
+
+- `login` — SELECT пользователя; PBKDF2-HMAC-SHA256 (`--pbkdf2-iterations`,
+  по умолчанию как в auth-service) прямо в event loop; INSERT refresh-токена
+  и COMMIT;
+- `turn` — чтение треда и дедуп; ожидание генерации LLM (`--llm-ms`);
+  INSERT сообщений, UPDATE счётчиков, COMMIT.
+
+Колонки: `ok/s` — успешные запросы в секунду, `timeouts` — не дождались
+соединения, `p99 wait` — ожидание соединения, `busy` — доля времени,
+когда соединения пула выданы, `idle in tx` — доля выданного времени без
+запроса к БД.
+
+Запуск (из каталога сервиса):
+
+    python -m benchmarks.bench_pool_occupancy --pool-size 10 --concurrency 10 50 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from conversations_src.adapters.db.unit_of_work import UnitOfWork
+
+# Запросов к БД в фазе чтения и в фазе записи.
+SCENARIOS: dict[str, tuple[int, int]] = {"login": (1, 2), "turn": (2, 3)}
+MODES = ("request", "uow")
+
+
+class _Pool:
+    def __init__(self, *, size: int, timeout_s: float) -> None:
+        self.size = size
+        self.timeout_s = timeout_s
+        self.slots = asyncio.Semaphore(size)
+        self.held_s = 0.0
+        self.query_s = 0.0
+        self.waits: list[float] = []
+
+
+class _Session:
+    """Минимум AsyncSession: соединение — с первого запроса до `close()`."""
+
+    def __init__(self, pool: _Pool, db_s: float) -> None:
+        self._pool = pool
+        self._db_s = db_s
+        self._acquired_at: float | None = None
+
+    async def execute(self) -> None:
+        if self._acquired_at is None:
+            started = time.perf_counter()
+            await asyncio.wait_for(self._pool.slots.acquire(), self._pool.timeout_s)
+            self._acquired_at = time.perf_counter()
+            self._pool.waits.append(self._acquired_at - started)
+        await asyncio.sleep(self._db_s)
+        self._pool.query_s += self._db_s
+
+    async def close(self) -> None:
+        if self._acquired_at is not None:
+            self._pool.held_s += time.perf_counter() - self._acquired_at
+            self._acquired_at = None
+            self._pool.slots.release()
+
+
+async def _handle(
+    uow: UnitOfWork, mode: str, scenario: str, work: Callable[[], Awaitable[None]]
+) -> None:
+    reads, writes = SCENARIOS[scenario]
+    if mode == "request":
+        async with uow() as db:
+            await _queries(db, reads)
+            await work()
+            await _queries(db, writes)
+        return
+    async with uow() as db:
+        await _queries(db, reads)
+    await work()
+    async with uow() as db:
+        await _queries(db, writes)
+
+
+async def _queries(db: Any, n: int) -> None:
+    for _ in range(n):
+        await db.execute()
+
+
+async def _run(
+    args: argparse.Namespace, scenario: str, mode: str, concurrency: int
+) -> dict[str, float]:
+    pool = _Pool(size=args.pool_size, timeout_s=args.pool_timeout)
+    db_s = args.db_ms / 1000
+
+    def session() -> Any:
+        return _Session(pool, db_s)
+
+    uow = UnitOfWork(session)
+    salt = os.urandom(16)
+
+    async def work() -> None:
+        if scenario == "login":
+            hashlib.pbkdf2_hmac("sha256", b"password1", salt, args.pbkdf2_iterations)
+        else:
+            await asyncio.sleep(args.llm_ms / 1000)
+
+    latencies: list[float] = []
+    timeouts = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker() -> None:
+        nonlocal timeouts
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await _handle(uow, mode, scenario, work)
+            except TimeoutError:
+                timeouts += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    waits = sorted(pool.waits)
+    return {
+        "ok_per_s": len(latencies) / elapsed,
+        "timeouts": timeouts,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "p99_wait_ms": _percentile(waits, 0.99) * 1000,
+        "busy": pool.held_s / (pool.size * elapsed),
+        "idle_in_tx": 1 - pool.query_s / pool.held_s if pool.held_s else 0.0,
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(
+        f"pool={args.pool_size} timeout={args.pool_timeout}s db={args.db_ms}ms "
+        f"pbkdf2={args.pbkdf2_iterations} llm={args.llm_ms}ms "
+        f"duration={args.duration}s"
+    )
+    print(
+        f"{'scenario':<8} {'mode':<8} {'conc':>5} {'ok/s':>8} {'timeouts':>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'p99 wait':>9} {'busy':>6} {'idle in tx':>11}"
+    )
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            for mode in MODES:
+                r = await _run(args, scenario, mode, concurrency)
+                print(
+                    f"{scenario:<8} {mode:<8} {concurrency:>5} {r['ok_per_s']:>8.1f} "
+                    f"{r['timeouts']:>9.0f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+                    f"{r['p99_wait_ms']:>9.1f} {r['busy']:>6.0%} "
+                    f"{r['idle_in_tx']:>11.0%}"
+                )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--pool-timeout", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--db-ms", type=float, default=1.0)
+    parser.add_argument("--pbkdf2-iterations", type=int, default=210_000)
+    parser.add_argument("--llm-ms", type=float, default=2_000.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parse_args()))
@@ -3,12 +3,18 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Index, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Computed, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
 
+# Конфигурация полнотекстового поиска по сообщениям. `russian` стеммит
+# кириллицу snowball-стеммером русского, а ASCII-слова — английского, что
+# подходит для смешанного RU/EN контента. Смена требует миграции
+# (генерируемая колонка conversation_messages.content_tsv).
+SEARCH_TS_CONFIG = "russian"
+
 
 class Thread(Base):
     """Диалог/тред (в рамках workspace)."""
@@ -29,61 +35,172 @@ class Thread(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    # Счётчики треда: обновляются в транзакции turn'а (без COUNT/MAX по
+    # conversation_messages при выдаче списка тредов).
+    message_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    last_message_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
-    __table_args__ = (Index("ix_threads_workspace_id_id", "workspace_id", "id"),)
+    __table_args__ = (
+        Index("ix_threads_workspace_id_id", "workspace_id", "id"),
+        # "Недавние диалоги" воркспейса — один index scan.
+        Index(
+            "ix_threads_workspace_last_message_at",
+            "workspace_id",
+            text("last_message_at DESC NULLS LAST"),
+        ),
+    )
 
 
 class Message(Base):
-    """Сообщение в треде."""
+    """Сообщение в треде.
+
+    Таблица секционирована помесячно по `created_at` (RANGE), поэтому
+    `created_at` входит в первичный ключ. Запросы стоит ограничивать снизу
+    `created_at >= thread.created_at`, чтобы Postgres отсекал старые секции.
+
+    Индексы: turn пишет 2 строки на запрос, поэтому держим один покрывающий
+    индекс под чтение треда (и поиск turn'а по created_at + operation_id).
+    Использование проверяется `scripts/index-usage-report.py`.
+    """
 
     __tablename__ = "conversation_messages"
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    workspace_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), nullable=False, index=True
-    )
-    thread_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), nullable=False, index=True
-    )
-    bot_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True), nullable=True, index=True
-    )
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    thread_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    bot_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
 
     role: Mapped[str] = mapped_column(
         String(16), nullable=False
     )  # user|assistant|system
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Токены content (adapters/tokenizers.py), считаются при записи; NULL — у
+    # сообщений, записанных до появления колонки.
+    token_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     # Для идемпотентности turn/операций (ретраи без дублей).
     operation_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True), nullable=True, index=True
+        UUID(as_uuid=True), nullable=True
     )
 
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    # Полнотекстовый поиск (GET /v1/conversations/search): считается БД при
+    # INSERT, приложением не читается (deferred) и не пишется.
+    content_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{SEARCH_TS_CONFIG}'::regconfig, content)", persisted=True
+        ),
+        deferred=True,
     )
 
     __table_args__ = (
-        Index("ix_messages_workspace_thread", "workspace_id", "thread_id"),
         Index(
-            "ix_messages_workspace_thread_operation",
+            "ix_messages_workspace_thread_created_at",
             "workspace_id",
             "thread_id",
-            "operation_id",
+            "created_at",
+            "id",
+            postgresql_include=["role", "operation_id"],
         ),
-        # Уникальность по (workspace, thread, operation, role) даёт идемпотентность
-        # при retry.
-        # NULL operation_id допускается (уникальный индекс это разрешит).
+        # GIN по (workspace_id, content_tsv) — нужен btree_gin: отбор по
+        # воркспейсу и по словам идёт внутри одного индекса.
         Index(
-            "ux_messages_workspace_thread_operation_role",
+            "ix_messages_workspace_content_tsv",
             "workspace_id",
-            "thread_id",
-            "operation_id",
-            "role",
-            unique=True,
+            "content_tsv",
+            postgresql_using="gin",
         ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # Без RETURNING content_tsv после INSERT: tsvector приложению не нужен.
+    __mapper_args__ = {"eager_defaults": False}
+
+
+class TurnOperation(Base):
+    """Ключ идемпотентности turn: (workspace, thread, operation_id).
+
+    Глобальный unique-индекс на секционированной `conversation_messages`
+    невозможен без `created_at`, поэтому уникальность операции держим здесь.
+    `created_at` совпадает с `created_at` сообщений turn'а — по нему повторный
+    запрос читает ровно одну секцию.
+    """
+
+    __tablename__ = "conversation_turn_operations"
+
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    thread_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    operation_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+class ThreadSummary(Base):
+    """Свёртка старой части треда (use_cases/summarization.py).
+
+    Сообщения до `(covered_until_created_at, covered_until_id)` включительно
+    свёрнуты в `summary`; контекстное окно берёт summary и читает сообщения
+    только после этой позиции.
+    """
+
+    __tablename__ = "conversation_thread_summaries"
+
+    thread_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    workspace_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    token_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    covered_messages: Mapped[int] = mapped_column(Integer, nullable=False)
+    covered_until_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    covered_until_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ImportBatch(Base):
+    """Закоммиченный батч импорта (`POST /threads:import`).
+
+    Каждый батч пишется в своей транзакции вместе с этой строкой. Повторный
+    запрос с тем же `X-Operation-Id` пропускает уже записанные записи потока:
+    `first_record + records` последнего батча — откуда продолжать.
+    """
+
+    __tablename__ = "conversation_import_batches"
+
+    workspace_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    operation_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    batch_no: Mapped[int] = mapped_column(Integer, primary_key=True)
+    first_record: Mapped[int] = mapped_column(Integer, nullable=False)
+    records: Mapped[int] = mapped_column(Integer, nullable=False)
+    threads: Mapped[int] = mapped_column(Integer, nullable=False)
+    messages: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
 
 
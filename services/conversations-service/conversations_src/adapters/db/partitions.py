@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import logging
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    total = value.year * 12 + value.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Срок хранения строк: по умолчанию и переопределения по workspace.
+
+    `default_days=None` — хранить бессрочно (для workspace'ов без override).
+    """
+
+    default_days: int | None = None
+    overrides: dict[uuid.UUID, int] = field(default_factory=dict)
+
+    def partition_cutoff(self, now: datetime) -> datetime | None:
+        """Граница, раньше которой данные не нужны НИ одному workspace'у.
+
+        Секции целиком старше неё можно отцеплять/удалять.
+        """
+        if self.default_days is None:
+            return None
+        days = max([self.default_days, *self.overrides.values()])
+        return now - timedelta(days=days)
+
+
+@dataclass
+class MaintenanceReport:
+    created: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    deleted_rows: int = 0
+
+
+class MonthlyPartitionManager:
+    """Обслуживание таблицы, секционированной помесячно по `created_at`.
+
+    Соглашения (совпадают с миграциями):
+    - секция месяца называется `<table>_pYYYY_MM`;
+    - `<table>_default` — DEFAULT-секция для строк вне созданных диапазонов.
+
+    Каждая операция выполняется в своей транзакции, чтобы не держать
+    блокировки родительской таблицы дольше необходимого.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        table: str,
+        *,
+        delete_batch_size: int = 5_000,
+    ) -> None:
+        self.engine = engine
+        self.table = table
+        self.default_partition = f"{table}_default"
+        self.delete_batch_size = max(1, delete_batch_size)
+
+    async def list_partitions(self) -> dict[date, str]:
+        """Месячные секции таблицы: {начало месяца: имя секции}."""
+        async with self.engine.connect() as conn:
+            rows = await conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = CAST(:table AS regclass)"
+                ),
+                {"table": self.table},
+            )
+            names = [r[0] for r in rows]
+
+        result: dict[date, str] = {}
+        for name in names:
+            m = _PARTITION_SUFFIX.search(name)
+            if m is not None and name.startswith(self.table):
+                result[date(int(m.group(1)), int(m.group(2)), 1)] = name
+        return result
+
+    async def ensure_partitions(
+        self, *, months_ahead: int, now: datetime | None = None, dry_run: bool = False
+    ) -> list[str]:
+        """Создать секции с текущего месяца на `months_ahead` месяцев вперёд."""
+        now = now or datetime.now(timezone.utc)
+        existing = await self.list_partitions()
+        current = month_start(now.date())
+
+        created: list[str] = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            name = partition_name(self.table, month)
+            if not dry_run:
+                async with self.engine.begin() as conn:
+                    await self._create_partition(conn, name, month)
+            created.append(name)
+        return created
+
+    async def remove_expired_partitions(
+        self,
+        policy: RetentionPolicy,
+        *,
+        detach: bool = False,
+        now: datetime | None = None,
+        dry_run: bool = False,
+    ) -> list[str]:
+        """Отцепить (detach) или удалить секции, целиком старше retention."""
+        cutoff = policy.partition_cutoff(now or datetime.now(timezone.utc))
+        if cutoff is None:
+            return []
+
+        removed: list[str] = []
+        for month, name in sorted((await self.list_partitions()).items()):
+            # Секция содержит [month, next_month) — удаляем, только если
+            # вся она раньше cutoff.
+            upper = datetime.combine(
+                add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc
+            )
+            if upper > cutoff:
+                break
+            if not dry_run:
+                async with self.engine.begin() as conn:
+                    if detach:
+                        stmt = f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"'
+                    else:
+                        stmt = f'DROP TABLE "{name}"'
+                    await conn.execute(text(stmt))
+            removed.append(name)
+        return removed
+
+    async def delete_expired_rows(
+        self,
+        policy: RetentionPolicy,
+        *,
+        now: datetime | None = None,
+        dry_run: bool = False,
+    ) -> int:
+        """Удалить строки старше retention своего workspace'а.
+
+        Секции удаляются только по максимальному сроку, поэтому workspace'ы
+        с более коротким сроком (и хвост неполного месяца) дочищаем
+        батчами по `(id, created_at)` — по одной короткой транзакции на батч.
+        """
+        now = now or datetime.now(timezone.utc)
+        deleted = 0
+        for workspace_id, days in policy.overrides.items():
+            deleted += await self._delete_batched(
+                "workspace_id = :workspace_id",
+                {"workspace_id": workspace_id, "cutoff": now - timedelta(days=days)},
+                dry_run=dry_run,
+            )
+        if policy.default_days is not None:
+            params: dict[str, object] = {
+                "cutoff": now - timedelta(days=policy.default_days)
+            }
+            condition = "TRUE"
+            if policy.overrides:
+                condition = "workspace_id <> ALL(:excluded)"
+                params["excluded"] = list(policy.overrides)
+            deleted += await self._delete_batched(condition, params, dry_run=dry_run)
+        return deleted
+
+    async def run(
+        self,
+        policy: RetentionPolicy,
+        *,
+        months_ahead: int,
+        detach: bool = False,
+        dry_run: bool = False,
+    ) -> MaintenanceReport:
+        now = datetime.now(timezone.utc)
+        report = MaintenanceReport()
+        report.created = await self.ensure_partitions(
+            months_ahead=months_ahead, now=now, dry_run=dry_run
+        )
+        report.removed = await self.remove_expired_partitions(
+            policy, detach=detach, now=now, dry_run=dry_run
+        )
+        report.deleted_rows = await self.delete_expired_rows(
+            policy, now=now, dry_run=dry_run
+        )
+        return report
+
+    # ------------------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------------------
+
+    async def _create_partition(
+        self, conn: AsyncConnection, name: str, month: date
+    ) -> None:
+        lower, upper = month, add_months(month, 1)
+        stray = (
+            await conn.execute(
+                text(
+                    f'SELECT EXISTS (SELECT 1 FROM "{self.default_partition}" '
+                    "WHERE created_at >= :lower AND created_at < :upper)"
+                ),
+                {"lower": lower, "upper": upper},
+            )
+        ).scalar_one()
+
+        if not stray:
+            await conn.execute(
+                text(
+                    f'CREATE TABLE "{name}" PARTITION OF "{self.table}" '
+                    f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                )
+            )
+            return
+
+        # В DEFAULT-секции уже есть строки этого месяца — CREATE ... PARTITION OF
+        # упадёт. Переносим их в новую таблицу и подключаем её как секцию.
+        logger.warning(
+            "partitions: переносим строки из %s в %s", self.default_partition, name
+        )
+        await conn.execute(
+            text(
+                f'CREATE TABLE "{name}" (LIKE "{self.table}" '
+                "INCLUDING DEFAULTS INCLUDING GENERATED)"
+            )
+        )
+        # Генерируемые колонки (STORED) вставлять нельзя — переносим
+        # только обычные, генерируемые пересчитаются при INSERT.
+        columns = (
+            await conn.execute(
+                text(
+                    "SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) "
+                    "FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) "
+                    "AND attnum > 0 AND NOT attisdropped AND attgenerated = ''"
+                ),
+                {"table": self.table},
+            )
+        ).scalar_one()
+        await conn.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{self.default_partition}" '
+                "WHERE created_at >= :lower AND created_at < :upper "
+                f"RETURNING {columns}) "
+                f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+            ),
+            {"lower": lower, "upper": upper},
+        )
+        await conn.execute(
+            text(
+                f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+        )
+
+    async def _delete_batched(
+        self, condition: str, params: dict[str, object], *, dry_run: bool
+    ) -> int:
+        where = f"created_at < :cutoff AND {condition}"
+        if dry_run:
+            async with self.engine.connect() as conn:
+                return int(
+                    (
+                        await conn.execute(
+                            text(f'SELECT count(*) FROM "{self.table}" WHERE {where}'),
+                            params,
+                        )
+                    ).scalar_one()
+                )
+
+        stmt = text(
+            f'DELETE FROM "{self.table}" WHERE (id, created_at) IN ('
+            f'SELECT id, created_at FROM "{self.table}" WHERE {where} LIMIT :limit)'
+        )
+        total = 0
+        while True:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(
+                    stmt, {**params, "limit": self.delete_batch_size}
+                )
+            total += result.rowcount
+            if result.rowcount < self.delete_batch_size:
+                return total
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Collection, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Message, Thread
+
+
+class Projection:
+    """Набор колонок для read-запроса и имена полей, под которыми они уходят
+    в ответ.
+
+    Read-эндпоинты выбирают только нужные колонки (`select(Thread.id, ...)`)
+    и получают строки-кортежи: без ORM-сущностей, identity map и
+    отслеживания изменений. `rows()` превращает кортежи в dict-ы — их
+    сериализует `TypeAdapter` роута.
+    """
+
+    __slots__ = ("columns", "fields")
+
+    def __init__(self, *columns: Any) -> None:
+        self.columns: tuple[Any, ...] = columns
+        self.fields: tuple[str, ...] = tuple(c.key for c in columns)
+
+    def select(self) -> Select[Any]:
+        return select(*self.columns)
+
+    def only(self, fields: Collection[str]) -> Projection:
+        """Подмножество колонок (порядок исходной проекции сохраняется)."""
+        return Projection(
+            *(
+                c
+                for c, name in zip(self.columns, self.fields, strict=True)
+                if name in fields
+            )
+        )
+
+    def rows(self, result: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+        fields = self.fields
+        return [dict(zip(fields, row, strict=True)) for row in result]
+
+
+THREAD_ROW = Projection(
+    Thread.id,
+    Thread.workspace_id,
+    Thread.bot_id,
+    Thread.status,
+    Thread.created_at,
+    Thread.message_count,
+    Thread.last_message_at,
+)
+
+# Минимум, который нужен роутам для проверки доступа к треду.
+THREAD_HEAD = Projection(Thread.id, Thread.bot_id, Thread.created_at)
+
+MESSAGE_ROW = Projection(
+    Message.id,
+    Message.thread_id,
+    Message.role,
+    Message.content,
+    Message.created_at,
+    Message.operation_id,
+)
+
+
+async def fetch_thread_head(
+    db: AsyncSession, *, workspace_id: uuid.UUID, thread_id: uuid.UUID
+) -> Row[Any] | None:
+    """`(id, bot_id, created_at)` треда воркспейса или None."""
+    result = await db.execute(
+        THREAD_HEAD.select().where(
+            Thread.id == thread_id, Thread.workspace_id == workspace_id
+        )
+    )
+    return result.first()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import base64
+import html
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlalchemy import REAL, Select, desc, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from .models import SEARCH_TS_CONFIG, Message
+
+# Маркеры подсветки в ts_headline: управляющие символы, которых нет в
+# обычном тексте. После выборки текст экранируется, а маркеры заменяются
+# на <mark>/</mark> — сниппет можно вставлять в HTML как есть.
+_START_SEL = "\x02"
+_STOP_SEL = "\x03"
+_HEADLINE_OPTIONS = (
+    f'StartSel="{_START_SEL}", StopSel="{_STOP_SEL}", '
+    'MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" … "'
+)
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    """Позиция keyset-пагинации: последний хит страницы.
+
+    Порядок выдачи — `(rank DESC, created_at DESC, id DESC)`; следующая
+    страница начинается строго после этой тройки. В API уходит
+    непрозрачным base64url-токеном.
+    """
+
+    rank: float
+    created_at: datetime
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        raw = orjson.dumps([self.rank, self.created_at.isoformat(), str(self.id)])
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> SearchCursor:
+        """Разобрать токен; `ValueError`, если он битый."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            rank, created_at, id_ = orjson.loads(raw)
+            return cls(
+                rank=float(rank),
+                created_at=datetime.fromisoformat(created_at),
+                id=uuid.UUID(id_),
+            )
+        except (ValueError, TypeError) as exc:
+            raise ValueError("invalid search cursor") from exc
+
+
+def _ts_config() -> Any:
+    return literal(SEARCH_TS_CONFIG, REGCONFIG)
+
+
+def search_statement(
+    *,
+    workspace_id: uuid.UUID,
+    query: str,
+    limit: int,
+    thread_id: uuid.UUID | None = None,
+    after: SearchCursor | None = None,
+) -> Select[Any]:
+    """Запрос страницы поиска по сообщениям воркспейса.
+
+    `query` — в синтаксисе `websearch_to_tsquery` (слова, "фраза", -исключение,
+    or). Совпадения отбираются по GIN-индексу (workspace_id, content_tsv),
+    `ts_headline` (дорогой — перечитывает текст) считается только для строк
+    страницы во внешнем запросе.
+    """
+    tsquery = func.websearch_to_tsquery(_ts_config(), query)
+    rank = func.ts_rank_cd(Message.content_tsv, tsquery, type_=REAL)
+
+    page = select(
+        Message.id,
+        Message.thread_id,
+        Message.role,
+        Message.created_at,
+        Message.content,
+        rank.label("rank"),
+    ).where(
+        Message.workspace_id == workspace_id,
+        Message.content_tsv.bool_op("@@")(tsquery),
+    )
+    if thread_id is not None:
+        page = page.where(Message.thread_id == thread_id)
+    if after is not None:
+        page = page.where(
+            tuple_(rank, Message.created_at, Message.id)
+            < tuple_(
+                literal(after.rank, REAL),
+                literal(after.created_at),
+                literal(after.id),
+            )
+        )
+    hits = (
+        page.order_by(desc(rank), desc(Message.created_at), desc(Message.id))
+        .limit(limit)
+        .subquery("hits")
+    )
+
+    snippet = func.ts_headline(_ts_config(), hits.c.content, tsquery, _HEADLINE_OPTIONS)
+    return select(
+        hits.c.id,
+        hits.c.thread_id,
+        hits.c.role,
+        hits.c.created_at,
+        hits.c.rank,
+        snippet.label("snippet"),
+    ).order_by(desc(hits.c.rank), desc(hits.c.created_at), desc(hits.c.id))
+
+
+def render_snippet(raw: str) -> str:
+    """Сниппет ts_headline → безопасный HTML с подсветкой `<mark>`."""
+    return (
+        html.escape(raw, quote=False)
+        .replace(_START_SEL, "<mark>")
+        .replace(_STOP_SEL, "</mark>")
+    )
@@ -0,0 +1,48 @@
+"""Unit of work: сессия БД только на время DB-фаз обработчика.
+
+`get_db_session` открывает сессию на весь запрос: после первого запроса
+соединение из пула держится (idle in transaction) до конца обработчика —
+и пока идёт не-БД работа: PBKDF2 в логине, генерация ответа в turn. Под
+нагрузкой пул заканчивается на простаивающих соединениях.
+
+`UnitOfWork` отдаёт сессию на фазу. Соединение берётся из пула первым
+запросом фазы и возвращается при выходе из неё; незакоммиченное
+откатывается:
+
+    async with uow() as db:
+        user = ...                 # чтение
+    verify_password(...)           # соединение уже в пуле
+    async with uow() as db:
+        db.add(...)
+        await db.commit()
+
+Объекты, загруженные в фазе, после неё отсоединены от сессии: загруженные
+атрибуты читаются (`expire_on_commit=False`), ленивые relationship — нет.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+
+class UnitOfWork:
+    def __init__(self, sessionmaker: Callable[[], AsyncSession]) -> None:
+        self._sessionmaker = sessionmaker
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[AsyncSession]:
+        """Одна DB-фаза: сессия на время блока `async with`."""
+        session = self._sessionmaker()
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def get_unit_of_work(request: Request) -> UnitOfWork:
+    """FastAPI dependency: сессия не открывается, пока обработчик не начнёт фазу."""
+    return UnitOfWork(request.app.state.db_sessionmaker)
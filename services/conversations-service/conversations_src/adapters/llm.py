@@ -0,0 +1,81 @@
+"""LLM-бэкенды свёртки тредов (`SUMMARIZER_BACKEND`).
+
+• `fake` — локальная детерминированная заглушка без сети: склеивает
+  предыдущую свёртку и начала сообщений. Для dev и тестов.
+• `http` — POST на `SUMMARIZER_URL`:
+
+      {"previous_summary": "..." | null,
+       "messages": [{"role": "user", "content": "..."}, ...]}
+
+  ответ — `{"summary": "..."}`. За URL — сервис/шлюз, который ходит в модель.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Protocol
+
+import httpx
+
+from ..config.settings import Settings
+
+# (role, content)
+ChatMessage = tuple[str, str]
+
+
+class SummarizerBackend(Protocol):
+    async def summarize(
+        self, previous: str | None, messages: Sequence[ChatMessage]
+    ) -> str: ...
+
+
+class FakeSummarizer:
+    """Заглушка: «свёртка» — первые `excerpt_chars` символов каждого сообщения,
+    итог обрезается до `max_chars` с конца (новое важнее)."""
+
+    def __init__(self, *, excerpt_chars: int = 80, max_chars: int = 4_000) -> None:
+        self.excerpt_chars = excerpt_chars
+        self.max_chars = max_chars
+        self.calls = 0
+
+    async def summarize(
+        self, previous: str | None, messages: Sequence[ChatMessage]
+    ) -> str:
+        self.calls += 1
+        lines = [previous] if previous else []
+        lines.extend(
+            f"{role}: {content[: self.excerpt_chars]}" for role, content in messages
+        )
+        return "\n".join(lines)[-self.max_chars :]
+
+
+class HttpSummarizer:
+    def __init__(self, url: str, *, timeout_s: float) -> None:
+        self.url = url
+        self.timeout_s = timeout_s
+
+    async def summarize(
+        self, previous: str | None, messages: Sequence[ChatMessage]
+    ) -> str:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(self.timeout_s)) as client:
+            resp = await client.post(
+                self.url,
+                json={
+                    "previous_summary": previous,
+                    "messages": [
+                        {"role": role, "content": content} for role, content in messages
+                    ],
+                },
+            )
+        resp.raise_for_status()
+        return str(resp.json()["summary"])
+
+
+def create_summarizer(settings: Settings) -> SummarizerBackend:
+    if settings.summarizer_backend == "http":
+        if not settings.summarizer_url:
+            raise ValueError("SUMMARIZER_URL is required for SUMMARIZER_BACKEND=http")
+        return HttpSummarizer(
+            settings.summarizer_url, timeout_s=settings.summarizer_timeout_s
+        )
+    return FakeSummarizer()
@@ -0,0 +1,231 @@
+"""Admission control в Redis — общий для всех реплик (`ADMISSION_BACKEND=redis`).
+
+Семантика та же, что у `InProcessAdmission` (use_cases/admission.py); всё
+состояние меняется Lua-скриптами атомарно, время — Redis `TIME` (часы реплик
+не важны). Все ключи с хэш-тегом `{admission}` — в одном слоте Redis Cluster.
+
+• `{admission}:bucket:<ws>` — hash `tokens`/`ts` token bucket'а воркспейса.
+• `{admission}:inflight` и `{admission}:inflight:<ws>` — ZSET выданных слотов,
+  score — срок аренды (мс). Слоты упавших реплик истекают через
+  `ADMISSION_LEASE_S`.
+• `{admission}:queue` — ZSET ожидающих, score = номер в очереди воркспейса *
+  1e13 + время постановки: сначала первые ожидающие каждого воркспейса,
+  потом вторые и т.д. — round-robin между воркспейсами.
+  `{admission}:queue:<ws>` — те же билеты воркспейса со сроком ожидания
+  (брошенные билеты упавших реплик вычищаются).
+
+Ожидающий опрашивает Redis (`ACQUIRE`) с джиттером: слот получает только
+первый в очереди, для кого он есть, — остальные ждут своей очереди.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from redis import asyncio as redis_async
+
+from ..use_cases.admission import AdmissionRejected
+
+_PREFIX = "{admission}"
+
+# KEYS: bucket; ARGV: capacity, tokens/сек, cost (<0 — вернуть токены).
+# -> {1, 0} | {0, retry_after_ms}
+_TAKE = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2]) / 1000
+local cost = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+if cost > tokens then
+  return {0, math.ceil((cost - tokens) / rate)}
+end
+tokens = math.min(capacity, tokens - cost)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return {1, 0}
+"""
+
+# KEYS: inflight, queue, queue:<ws>
+# ARGV: prefix, ws, ticket, global_limit, ws_limit, max_queue, wait_ms, lease_ms
+# -> 1 — слот выдан; 0 — ждать; -1 — очередь воркспейса полна.
+_ACQUIRE = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local prefix, ws, ticket = ARGV[1], ARGV[2], ARGV[3]
+local global_limit, ws_limit = tonumber(ARGV[4]), tonumber(ARGV[5])
+local lease_ms = tonumber(ARGV[8])
+local member = ws .. ':' .. ticket
+
+local function inflight(w)
+  local key = prefix .. ':inflight:' .. w
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+  return redis.call('ZCARD', key)
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if not redis.call('ZSCORE', KEYS[3], ticket) then
+  redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+  local waiting = redis.call('ZCARD', KEYS[3])
+  if waiting >= tonumber(ARGV[6]) then
+    return -1
+  end
+  redis.call('ZADD', KEYS[3], now + tonumber(ARGV[7]), ticket)
+  redis.call('ZADD', KEYS[2], string.format('%.0f', waiting * 1e13 + now), member)
+  redis.call('PEXPIRE', KEYS[3], tonumber(ARGV[7]) + 1000)
+end
+
+if redis.call('ZCARD', KEYS[1]) >= global_limit then
+  return 0
+end
+local queued = redis.call('ZRANGE', KEYS[2], 0, 255)
+for _, entry in ipairs(queued) do
+  local sep = string.find(entry, ':', 1, true)
+  local w, tk = string.sub(entry, 1, sep - 1), string.sub(entry, sep + 1)
+  local deadline = tonumber(redis.call('ZSCORE', prefix .. ':queue:' .. w, tk))
+  if not deadline or deadline < now then
+    redis.call('ZREM', KEYS[2], entry)
+    redis.call('ZREM', prefix .. ':queue:' .. w, tk)
+  elseif inflight(w) < ws_limit then
+    if entry ~= member then
+      return 0
+    end
+    redis.call('ZREM', KEYS[2], member)
+    redis.call('ZREM', KEYS[3], ticket)
+    redis.call('ZADD', KEYS[1], now + lease_ms, member)
+    local key = prefix .. ':inflight:' .. ws
+    redis.call('ZADD', key, now + lease_ms, ticket)
+    redis.call('PEXPIRE', key, lease_ms)
+    return 1
+  end
+end
+return 0
+"""
+
+# KEYS: inflight, inflight:<ws>, queue, queue:<ws>; ARGV: ws, ticket
+_RELEASE = """
+local member = ARGV[1] .. ':' .. ARGV[2]
+redis.call('ZREM', KEYS[1], member)
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('ZREM', KEYS[3], member)
+redis.call('ZREM', KEYS[4], ARGV[2])
+return 1
+"""
+
+# Интервал опроса ожидающих, сек (растёт до максимума; плюс джиттер).
+_POLL_MIN_S = 0.02
+_POLL_MAX_S = 0.25
+
+
+class RedisAdmission:
+    """Admission control поверх Redis (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        global_limit: int,
+        workspace_limit: int,
+        tokens_per_minute: int,
+        max_wait_s: float,
+        max_queue: int,
+        lease_s: float,
+    ) -> None:
+        self._client = client
+        self.global_limit = global_limit
+        self.workspace_limit = workspace_limit
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_s = max_wait_s
+        self.max_queue = max_queue
+        self.lease_s = lease_s
+        self._take = client.register_script(_TAKE)
+        self._acquire = client.register_script(_ACQUIRE)
+        self._release = client.register_script(_RELEASE)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> RedisAdmission:
+        return cls(redis_async.from_url(url, decode_responses=True), **kwargs)
+
+    @asynccontextmanager
+    async def admit(self, workspace_id: uuid.UUID, cost: int) -> AsyncIterator[None]:
+        ws = str(workspace_id)
+        cost = await self._take_tokens(ws, cost)
+        ticket = uuid.uuid4().hex
+        try:
+            await self._wait_slot(ws, ticket)
+        except BaseException:
+            await self._release_slot(ws, ticket)
+            if cost:
+                await self._take(
+                    keys=[self._bucket_key(ws)],
+                    args=[self.tokens_per_minute, self.tokens_per_minute / 60, -cost],
+                )
+            raise
+        try:
+            yield
+        finally:
+            await self._release_slot(ws, ticket)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _bucket_key(self, ws: str) -> str:
+        return f"{_PREFIX}:bucket:{ws}"
+
+    async def _take_tokens(self, ws: str, cost: int) -> int:
+        if self.tokens_per_minute <= 0:
+            return 0
+        cost = min(cost, self.tokens_per_minute)
+        ok, retry_ms = await self._take(
+            keys=[self._bucket_key(ws)],
+            args=[self.tokens_per_minute, self.tokens_per_minute / 60, cost],
+        )
+        if not ok:
+            raise AdmissionRejected("tokens", int(retry_ms) / 1000)
+        return cost
+
+    async def _wait_slot(self, ws: str, ticket: str) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_s
+        delay = _POLL_MIN_S
+        keys = [f"{_PREFIX}:inflight", f"{_PREFIX}:queue", f"{_PREFIX}:queue:{ws}"]
+        args = [
+            _PREFIX,
+            ws,
+            ticket,
+            self.global_limit,
+            self.workspace_limit,
+            self.max_queue,
+            int(self.max_wait_s * 1000) + 1000,
+            int(self.lease_s * 1000),
+        ]
+        while True:
+            granted = int(await self._acquire(keys=keys, args=args))
+            if granted == 1:
+                return
+            if granted == -1:
+                raise AdmissionRejected("queue_full", self.max_wait_s)
+            left = deadline - loop.time()
+            if left <= 0:
+                raise AdmissionRejected("wait_timeout", self.max_wait_s)
+            await asyncio.sleep(min(left, delay * random.uniform(0.5, 1.5)))
+            delay = min(_POLL_MAX_S, delay * 2)
+
+    async def _release_slot(self, ws: str, ticket: str) -> None:
+        await self._release(
+            keys=[
+                f"{_PREFIX}:inflight",
+                f"{_PREFIX}:inflight:{ws}",
+                f"{_PREFIX}:queue",
+                f"{_PREFIX}:queue:{ws}",
+            ],
+            args=[ws, ticket],
+        )
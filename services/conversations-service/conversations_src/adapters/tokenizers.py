@@ -0,0 +1,52 @@
+"""Подсчёт токенов для бюджета контекстного окна.
+
+`token_count` сообщения считается один раз — при записи (turn, импорт) —
+токенайзером из настройки `TOKENIZER`:
+
+• `approx` (по умолчанию) — оценка по длине: ~4 символа на токен. Без
+  зависимостей, завышает редко и ненамного — годится для бюджета.
+• `tiktoken:<encoding>` — точный BPE-подсчёт (например,
+  `tiktoken:cl100k_base`); нужен пакет `tiktoken`.
+
+Смена токенайзера не пересчитывает уже записанные значения.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Protocol
+
+
+class Tokenizer(Protocol):
+    name: str
+
+    def count(self, text: str) -> int: ...
+
+
+class ApproxTokenizer:
+    name = "approx"
+
+    def __init__(self, chars_per_token: int = 4) -> None:
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return max(1, -(-len(text) // self.chars_per_token))
+
+
+class TiktokenTokenizer:
+    def __init__(self, encoding: str) -> None:
+        import tiktoken  # type: ignore[import-not-found]  # опциональная
+
+        self.name = f"tiktoken:{encoding}"
+        self._encoding: Any = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+def create_tokenizer(spec: str) -> Tokenizer:
+    """Токенайзер по значению настройки `TOKENIZER`."""
+    if spec == "approx":
+        return ApproxTokenizer()
+    if spec.startswith("tiktoken:"):
+        return TiktokenTokenizer(spec.removeprefix("tiktoken:"))
+    raise ValueError(f"Unknown tokenizer: {spec!r}")
@@ -0,0 +1,106 @@
+"""Заполнение message_count / last_message_at у существующих тредов.
+
+Запуск (из каталога сервиса, один раз после миграции 0006; повторный
+запуск безопасен — значения пересчитываются заново):
+
+    make backfill-thread-counters ARGS="--batch-size 1000"
+
+Треды обходятся батчами по id (keyset), каждый батч — отдельная транзакция.
+Строки батча сначала блокируются (`FOR UPDATE`): параллельный turn ждёт
+пересчёта и затем прибавляет свои сообщения к уже посчитанному значению,
+поэтому счётчики не расходятся при работающем сервисе.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ...adapters.db.session import create_engine
+from ...config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_LOCK_BATCH = text(
+    """
+    SELECT id, workspace_id FROM conversation_threads
+    WHERE (CAST(:after AS uuid) IS NULL OR id > CAST(:after AS uuid))
+    ORDER BY id
+    LIMIT :limit
+    FOR UPDATE
+    """
+)
+
+# Пары (workspace_id, thread_id) — под индекс
+# ix_messages_workspace_thread_created_at; треды без сообщений получают 0/NULL.
+_UPDATE_BATCH = text(
+    """
+    UPDATE conversation_threads AS t
+    SET message_count = coalesce(s.message_count, 0),
+        last_message_at = s.last_message_at
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:workspace_ids AS uuid[]))
+         AS b(id, workspace_id)
+    LEFT JOIN LATERAL (
+        SELECT count(*) AS message_count, max(m.created_at) AS last_message_at
+        FROM conversation_messages AS m
+        WHERE m.workspace_id = b.workspace_id AND m.thread_id = b.id
+    ) AS s ON true
+    WHERE t.id = b.id
+    """
+)
+
+
+async def backfill(engine: AsyncEngine, *, batch_size: int) -> int:
+    """Пересчитать счётчики всех тредов; вернуть число обработанных тредов."""
+    after: uuid.UUID | None = None
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            batch = (
+                await conn.execute(_LOCK_BATCH, {"after": after, "limit": batch_size})
+            ).all()
+            if not batch:
+                return total
+            await conn.execute(
+                _UPDATE_BATCH,
+                {
+                    "ids": [row.id for row in batch],
+                    "workspace_ids": [row.workspace_id for row in batch],
+                },
+            )
+        after = batch[-1].id
+        total += len(batch)
+        logger.info("backfilled %d threads (last id %s)", total, after)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="тредов в одной транзакции"
+    )
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    engine = create_engine(Settings())
+    started = time.perf_counter()
+    try:
+        total = await backfill(engine, batch_size=args.batch_size)
+    finally:
+        await engine.dispose()
+    print(f"threads: {total}, elapsed: {time.perf_counter() - started:.1f}s")
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
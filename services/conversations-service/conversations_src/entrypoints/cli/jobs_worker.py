@@ -0,0 +1,92 @@
+"""Обработчик job_queue: выбирает pending-задачи и выполняет их.
+
+Запуск (из каталога сервиса; процессов можно несколько — задачи захватываются
+через `FOR UPDATE SKIP LOCKED`, см. use_cases/job_queue.py):
+
+    make jobs-worker ARGS="--batch 20 --poll-interval 1"
+    make jobs-worker ARGS="--once"          # одна пачка и выход (cron)
+
+Зарегистрированные типы задач:
+• `thread_summarize` — свёртка длинного треда (use_cases/summarization.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ...adapters.db.session import create_engine
+from ...config.settings import Settings
+from ...use_cases.dlq import DLQService
+from ...use_cases.job_queue import JobHandler, JobQueueService
+from ...use_cases.summarization import JOB_TYPE as SUMMARIZE_JOB
+from ...use_cases.summarization import create_thread_summarizer
+
+logger = logging.getLogger(__name__)
+
+
+def create_handlers(settings: Settings) -> dict[str, JobHandler]:
+    return {SUMMARIZE_JOB: create_thread_summarizer(settings)}
+
+
+async def run(
+    settings: Settings, *, batch: int, poll_interval: float, once: bool
+) -> int:
+    """Обрабатывать задачи; вернуть число обработанных (для `--once`)."""
+    engine = create_engine(settings)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    handlers = create_handlers(settings)
+    total = 0
+    try:
+        while True:
+            async with sessionmaker() as session:
+                service = JobQueueService(
+                    session,
+                    settings,
+                    DLQService(session, settings),
+                    handlers,
+                    sessionmaker=sessionmaker,
+                )
+                processed = await service.process_pending_jobs(limit=batch)
+            total += processed
+            if processed:
+                logger.info("processed %d jobs", processed)
+            if once:
+                return total
+            if processed < batch:
+                await asyncio.sleep(poll_interval)
+    finally:
+        await engine.dispose()
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=10, help="задач за выборку")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="пауза (с), когда очередь пуста",
+    )
+    parser.add_argument("--once", action="store_true", help="одна выборка и выход")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    total = await run(
+        Settings(), batch=args.batch, poll_interval=args.poll_interval, once=args.once
+    )
+    if args.once:
+        print(f"jobs: {total}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
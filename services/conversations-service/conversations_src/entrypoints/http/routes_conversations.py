@@ -1,21 +1,46 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal, cast
 
-from fastapi import APIRouter, Depends, Header, HTTPException
-from pydantic import BaseModel, Field
-from sqlalchemy import asc, desc, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import Row, asc, desc, func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
-
-from ...adapters.db.audit import AuditLog
-from ...adapters.db.models import Message, Thread
+from typing_extensions import Required, TypedDict
+
+from ...adapters.db.audit_sink import AuditEvent, AuditSink, get_audit_sink
+from ...adapters.db.models import Message, Thread, TurnOperation
+from ...adapters.db.queries import (
+    MESSAGE_ROW,
+    THREAD_ROW,
+    Projection,
+    fetch_thread_head,
+)
+from ...adapters.db.search import SearchCursor, render_snippet, search_statement
 from ...adapters.db.session import get_db_session
+from ...adapters.db.unit_of_work import UnitOfWork, get_unit_of_work
+from ...use_cases.admission import admit_turn
+from ...use_cases.context_window import ContextAssembler, get_context_assembler
+from ...use_cases.summarization import summary_due, summary_job
+from ...use_cases.thread_export import ExportCursor, export_workspace, gzip_stream
+from ...use_cases.thread_import import (
+    ImportConflictError,
+    ImportRecordError,
+    ThreadImporter,
+    iter_lines,
+)
+from .responses import RawJSONResponse
 
 router = APIRouter(prefix="/v1/conversations", tags=["conversations"])
 
+# created_at треда ставит БД, сообщений — приложение; запас на рассинхрон часов.
+_CLOCK_SKEW_MARGIN = timedelta(hours=1)
+
 
 class ThreadCreateRequest(BaseModel):
     bot_id: uuid.UUID | None = None
@@ -27,6 +52,8 @@ class ThreadResponse(BaseModel):
     bot_id: uuid.UUID | None
     status: str
     created_at: datetime
+    message_count: int = 0
+    last_message_at: datetime | None = None
 
 
 class ThreadsListResponse(BaseModel):
@@ -46,6 +73,82 @@ class MessagesListResponse(BaseModel):
     items: list[MessageResponse]
 
 
+class MessageFieldsResponse(TypedDict, total=False):
+    """Сообщение при `?fields=`: `id` и запрошенные поля, остальных ключей нет."""
+
+    id: Required[uuid.UUID]
+    thread_id: uuid.UUID
+    role: str
+    content: str
+    created_at: datetime
+    operation_id: uuid.UUID | None
+
+
+class MessageFieldsListResponse(BaseModel):
+    items: list[MessageFieldsResponse]
+
+
+# ---------------------------------------------------------------------------
+# Быстрый путь list-эндпоинтов
+# ---------------------------------------------------------------------------
+# Строки читаются кортежами колонок (проекции из `adapters/db/queries.py`) и
+# сериализуются сразу в байты — без ORM-сущностей, Pydantic-объектов и
+# повторной валидации `response_model`. TypedDict-ы повторяют
+# `ThreadResponse`/`MessageResponse` поле в поле (порядок тоже): байты ответа
+# те же, а схема OpenAPI по-прежнему берётся из `response_model`. Сообщения
+# сериализуются как `MessageFieldsResponse`: при `?fields=` ключей меньше.
+
+
+class _ThreadRow(TypedDict):
+    id: uuid.UUID
+    workspace_id: uuid.UUID
+    bot_id: uuid.UUID | None
+    status: str
+    created_at: datetime
+    message_count: int
+    last_message_at: datetime | None
+
+
+class _ThreadsPayload(TypedDict):
+    items: list[_ThreadRow]
+
+
+class _MessagesPayload(TypedDict):
+    items: list[MessageFieldsResponse]
+
+
+_THREADS_JSON = TypeAdapter(_ThreadsPayload)
+_MESSAGES_JSON = TypeAdapter(_MessagesPayload)
+
+
+class SearchHit(BaseModel):
+    id: uuid.UUID
+    thread_id: uuid.UUID
+    role: str
+    created_at: datetime
+    rank: float
+    snippet: str = Field(
+        description="Фрагмент текста (HTML-экранирован), совпадения в <mark>"
+    )
+
+
+class SearchResponse(BaseModel):
+    items: list[SearchHit]
+    next_cursor: str | None = None
+
+
+class ThreadImportResponse(BaseModel):
+    operation_id: uuid.UUID
+    resumed_from: int = Field(
+        description="Сколько записей потока пропущено как записанные ранее"
+    )
+    batches: int
+    threads: int
+    messages: int
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class TurnRequest(BaseModel):
     content: str = Field(min_length=1, max_length=50_000)
 
@@ -61,20 +164,22 @@ async def create_thread(
     request: Request,
     body: ThreadCreateRequest,
     db: AsyncSession = Depends(get_db_session),
+    audit: AuditSink = Depends(get_audit_sink),
 ) -> ThreadResponse:
     workspace_id = _require_workspace_id(request)
-    row = Thread(workspace_id=workspace_id, bot_id=body.bot_id, status="active")
+    row = Thread(
+        id=uuid.uuid4(), workspace_id=workspace_id, bot_id=body.bot_id, status="active"
+    )
     db.add(row)
-    db.add(
-        AuditLog(
+    audit.record(
+        db,
+        AuditEvent(
             workspace_id=workspace_id,
-            user_id=None,
-            operation_id=None,
             action="THREAD_CREATED",
             resource_type="thread",
             resource_id=row.id,
             changes={"bot_id": str(body.bot_id) if body.bot_id else None},
-        )
+        ),
     )
     await db.commit()
     await db.refresh(row)
@@ -84,63 +189,282 @@ async def create_thread(
         bot_id=row.bot_id,
         status=row.status,
         created_at=row.created_at,
+        message_count=row.message_count,
+        last_message_at=row.last_message_at,
     )
 
 
 @router.get("/threads", response_model=ThreadsListResponse)
 async def list_threads(
     request: Request,
+    sort: Literal["created_at", "last_message_at"] = Query(
+        default="created_at",
+        description=(
+            "Порядок (по убыванию): `created_at` — новые треды первыми, "
+            "`last_message_at` — недавняя активность первой (треды без "
+            "сообщений — в конце)."
+        ),
+    ),
     db: AsyncSession = Depends(get_db_session),
-) -> ThreadsListResponse:
+) -> RawJSONResponse:
     workspace_id = _require_workspace_id(request)
-    rows = (
-        await db.execute(
-            select(Thread)
-            .where(Thread.workspace_id == workspace_id)
-            .order_by(desc(Thread.created_at))
-        )
-    ).scalars()
-    items = [
-        ThreadResponse(
-            id=t.id,
-            workspace_id=t.workspace_id,
-            bot_id=t.bot_id,
-            status=t.status,
-            created_at=t.created_at,
-        )
-        for t in rows
-    ]
-    return ThreadsListResponse(items=items)
+    order_by = (
+        desc(Thread.last_message_at).nulls_last()
+        if sort == "last_message_at"
+        else desc(Thread.created_at)
+    )
+    rows = await db.execute(
+        THREAD_ROW.select()
+        .where(Thread.workspace_id == workspace_id)
+        .order_by(order_by)
+    )
+    items = cast(list[_ThreadRow], THREAD_ROW.rows(rows))
+    return RawJSONResponse(_THREADS_JSON.dump_json({"items": items}))
 
 
-@router.get("/threads/{thread_id}/messages", response_model=MessagesListResponse)
+@router.get(
+    "/threads/{thread_id}/messages",
+    # Без `fields` — полные сообщения, с `fields` — только запрошенные ключи.
+    response_model=MessagesListResponse | MessageFieldsListResponse,
+)
 async def list_messages(
     request: Request,
     thread_id: uuid.UUID,
+    fields: str | None = Query(
+        default=None,
+        description=(
+            "Поля сообщений через запятую (например, `id,role,created_at`): "
+            "остальные в ответ не попадают и не читаются из БД. `id` "
+            "возвращается всегда. По умолчанию — все поля."
+        ),
+    ),
+    db: AsyncSession = Depends(get_db_session),
+) -> RawJSONResponse:
+    workspace_id = _require_workspace_id(request)
+    projection = _message_projection(fields)
+    thread = await _get_thread(db, workspace_id=workspace_id, thread_id=thread_id)
+
+    rows = await db.execute(
+        projection.select()
+        .where(
+            Message.workspace_id == workspace_id,
+            Message.thread_id == thread_id,
+            # Нижняя граница для partition pruning: сообщения не старше треда.
+            Message.created_at >= thread.created_at - _CLOCK_SKEW_MARGIN,
+        )
+        .order_by(asc(Message.created_at), asc(Message.id))
+    )
+    items = cast(list[MessageFieldsResponse], projection.rows(rows))
+    return RawJSONResponse(_MESSAGES_JSON.dump_json({"items": items}))
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_messages(
+    request: Request,
+    q: str = Query(
+        min_length=1,
+        max_length=256,
+        description=(
+            'Запрос: слова, "фраза", -исключение, or. Русский и английский '
+            "текст ищется с учётом словоформ."
+        ),
+    ),
+    thread_id: uuid.UUID | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(
+        default=None, description="`next_cursor` предыдущей страницы"
+    ),
     db: AsyncSession = Depends(get_db_session),
-) -> MessagesListResponse:
+) -> SearchResponse:
+    """Полнотекстовый поиск по сообщениям воркспейса (по релевантности)."""
     workspace_id = _require_workspace_id(request)
-    _ = await _get_thread(db, workspace_id=workspace_id, thread_id=thread_id)
+    after = None
+    if cursor:
+        try:
+            after = SearchCursor.decode(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "INVALID_CURSOR", "message": "Некорректный cursor"},
+            ) from None
 
+    # +1 строка — признак того, что есть следующая страница.
     rows = (
         await db.execute(
-            select(Message)
-            .where(Message.workspace_id == workspace_id, Message.thread_id == thread_id)
-            .order_by(asc(Message.created_at))
+            search_statement(
+                workspace_id=workspace_id,
+                query=q,
+                limit=limit + 1,
+                thread_id=thread_id,
+                after=after,
+            )
         )
-    ).scalars()
-    items = [
-        MessageResponse(
-            id=m.id,
-            thread_id=m.thread_id,
-            role=m.role,
-            content=m.content,
-            created_at=m.created_at,
-            operation_id=m.operation_id,
+    ).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = SearchCursor(last.rank, last.created_at, last.id).encode()
+    return SearchResponse(
+        items=[
+            SearchHit(
+                id=r.id,
+                thread_id=r.thread_id,
+                role=r.role,
+                created_at=r.created_at,
+                rank=r.rank,
+                snippet=render_snippet(r.snippet),
+            )
+            for r in page
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "NDJSON-поток тредов и сообщений воркспейса",
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def export_conversations(
+    request: Request,
+    cursor: str | None = Query(
+        default=None,
+        description="Курсор последней строки `checkpoint` прерванного экспорта",
+    ),
+    db: AsyncSession = Depends(get_db_session),
+) -> StreamingResponse:
+    """Все треды и сообщения воркспейса одним NDJSON-потоком.
+
+    Память не зависит от размера воркспейса (server-side курсор). При
+    `Accept-Encoding: gzip` поток сжимается. Формат и возобновление — в
+    `use_cases/thread_export.py`; вывод принимает `POST /threads:import`.
+    """
+    workspace_id = _require_workspace_id(request)
+    after = None
+    if cursor is not None:
+        try:
+            after = ExportCursor.decode(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "INVALID_CURSOR", "message": "Некорректный cursor"},
+            ) from None
+
+    body = export_workspace(
+        db,
+        workspace_id=workspace_id,
+        after=after,
+        batch_size=request.app.state.settings.export_batch_size,
+    )
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+@router.post(
+    "/threads:import",
+    response_model=ThreadImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_threads(
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
+    audit: AuditSink = Depends(get_audit_sink),
+    x_operation_id: str | None = Header(default=None, alias="X-Operation-Id"),
+) -> ThreadImportResponse:
+    """Потоковый импорт тредов и сообщений из NDJSON.
+
+    Записи пишутся батчами через COPY, каждый батч — отдельная транзакция.
+    При ошибке записи уже закоммиченные батчи остаются; повтор с тем же
+    `X-Operation-Id` продолжит с первой незаписанной записи (формат и
+    правила — в `use_cases/thread_import.py`).
+    """
+    workspace_id = _require_workspace_id(request)
+    try:
+        operation_uuid = uuid.UUID(x_operation_id) if x_operation_id else uuid.uuid4()
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_OPERATION_ID",
+                "message": "Некорректный X-Operation-Id",
+            },
+        ) from None
+
+    settings = request.app.state.settings
+    importer = ThreadImporter(
+        db,
+        workspace_id=workspace_id,
+        operation_id=operation_uuid,
+        batch_size=settings.import_batch_size,
+        tokenizer=request.app.state.context_assembler.tokenizer,
+    )
+    try:
+        report = await importer.run(
+            iter_lines(request.stream(), max_line_bytes=settings.import_max_line_bytes)
         )
-        for m in rows
-    ]
-    return MessagesListResponse(items=items)
+    except ImportRecordError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "code": exc.code,
+                "message": exc.message,
+                "details": {
+                    **exc.details,
+                    "line": exc.line,
+                    "operation_id": str(operation_uuid),
+                },
+            },
+        ) from None
+    except (IntegrityError, ImportConflictError):
+        # PK conversation_import_batches (параллельный импорт с тем же
+        # operation_id) или id сообщения, который уже есть в БД.
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "IMPORT_CONFLICT",
+                "message": "Конфликт при записи батча импорта",
+                "details": {"operation_id": str(operation_uuid)},
+            },
+        ) from None
+
+    audit.record(
+        db,
+        AuditEvent(
+            workspace_id=workspace_id,
+            operation_id=operation_uuid,
+            action="THREADS_IMPORTED",
+            resource_type="thread",
+            changes={
+                "threads": report.threads,
+                "messages": report.messages,
+                "resumed_from": report.resumed_from,
+            },
+        ),
+    )
+    await db.commit()
+    return ThreadImportResponse(
+        operation_id=operation_uuid,
+        resumed_from=report.resumed_from,
+        batches=report.batches,
+        threads=report.threads,
+        messages=report.messages,
+        elapsed_seconds=round(report.elapsed_seconds, 3),
+        rows_per_second=round(report.rows_per_second, 1),
+    )
 
 
 @router.post("/threads/{thread_id}/turn", response_model=TurnResponse)
@@ -148,7 +472,11 @@ async def turn(
     request: Request,
     thread_id: uuid.UUID,
     body: TurnRequest,
-    db: AsyncSession = Depends(get_db_session),
+    # До сессии БД: ожидание в очереди admission не держит соединение.
+    _admitted: None = Depends(admit_turn, scope="function"),
+    uow: UnitOfWork = Depends(get_unit_of_work),
+    audit: AuditSink = Depends(get_audit_sink),
+    context: ContextAssembler = Depends(get_context_assembler),
     x_operation_id: str | None = Header(default=None, alias="X-Operation-Id"),
 ) -> TurnResponse:
     """Запускает “turn” (пока stub/эхо) и сохраняет user+assistant сообщения.
@@ -156,10 +484,15 @@ async def turn(
     Идемпотентность:
     - если `X-Operation-Id` уже встречался для этого треда,
       возвращаем уже сохранённый результат.
+
+    Admission control (use_cases/admission.py): при исчерпании лимитов
+    воркспейса — 429 ADMISSION_REJECTED с `Retry-After`.
+
+    Соединение с БД берётся на две фазы (adapters/db/unit_of_work.py):
+    чтение треда/дедуп и запись результата. Генерация ответа идёт между
+    ними и соединение не держит.
     """
     workspace_id = _require_workspace_id(request)
-    thread = await _get_thread(db, workspace_id=workspace_id, thread_id=thread_id)
-
     operation_uuid = None
     if x_operation_id:
         try:
@@ -173,51 +506,21 @@ async def turn(
                 },
             ) from None
 
-    # Дедуп: если assistant уже есть по operation_id — возвращаем его
-    # (и user, если есть).
-    if operation_uuid is not None:
-        existing = (
-            await db.execute(
-                select(Message)
-                .where(
-                    Message.workspace_id == workspace_id,
-                    Message.thread_id == thread_id,
-                    Message.operation_id == operation_uuid,
-                    Message.role == "assistant",
-                )
-                .limit(1)
-            )
-        ).scalar_one_or_none()
-        if existing is not None:
-            user_existing = (
-                await db.execute(
-                    select(Message)
-                    .where(
-                        Message.workspace_id == workspace_id,
-                        Message.thread_id == thread_id,
-                        Message.operation_id == operation_uuid,
-                        Message.role == "user",
-                    )
-                    .limit(1)
-                )
-            ).scalar_one_or_none()
-            if user_existing is None:
-                # редкий случай, но на всякий
-                user_existing = Message(
-                    workspace_id=workspace_id,
-                    thread_id=thread_id,
-                    bot_id=thread.bot_id,
-                    role="user",
-                    content=body.content,
-                    operation_id=operation_uuid,
-                    created_at=datetime.now(timezone.utc),
-                )
-            return TurnResponse(
+    async with uow() as db:
+        thread = await _get_thread(db, workspace_id=workspace_id, thread_id=thread_id)
+        # Дедуп: операция уже выполнялась — возвращаем сохранённый результат.
+        if operation_uuid is not None:
+            replay = await _load_turn_replay(
+                db,
+                workspace_id=workspace_id,
                 thread_id=thread_id,
-                user_message=_to_msg(user_existing),
-                assistant_message=_to_msg(existing),
+                operation_id=operation_uuid,
             )
+            if replay is not None:
+                return replay
 
+    # Генерация — без соединения с БД.
+    assistant_content = f"Эхо: {body.content}"
     now = datetime.now(timezone.utc)
     user_msg = Message(
         workspace_id=workspace_id,
@@ -225,6 +528,7 @@ async def turn(
         bot_id=thread.bot_id,
         role="user",
         content=body.content,
+        token_count=context.tokenizer.count(body.content),
         operation_id=operation_uuid,
         created_at=now,
     )
@@ -233,64 +537,130 @@ async def turn(
         thread_id=thread_id,
         bot_id=thread.bot_id,
         role="assistant",
-        content=f"Эхо: {body.content}",
+        content=assistant_content,
+        token_count=context.tokenizer.count(assistant_content),
         operation_id=operation_uuid,
         created_at=now,
     )
 
-    db.add(user_msg)
-    db.add(assistant_msg)
-    db.add(
-        AuditLog(
-            workspace_id=workspace_id,
-            user_id=None,
-            operation_id=operation_uuid,
-            action="TURN_EXECUTED",
-            resource_type="thread",
-            resource_id=thread_id,
-            changes={"bot_id": str(thread.bot_id) if thread.bot_id else None},
-        )
-    )
-    try:
-        await db.commit()
-    except IntegrityError:
-        # Если поймали гонку по unique (operation_id, role) — значит уже сохранено,
-        # пробуем дочитать.
-        await db.rollback()
-        if operation_uuid is None:
-            raise
-        existing = (
-            await db.execute(
-                select(Message)
-                .where(
-                    Message.workspace_id == workspace_id,
-                    Message.thread_id == thread_id,
-                    Message.operation_id == operation_uuid,
-                    Message.role == "assistant",
+    async with uow() as db:
+        if operation_uuid is not None:
+            db.add(
+                TurnOperation(
+                    workspace_id=workspace_id,
+                    thread_id=thread_id,
+                    operation_id=operation_uuid,
+                    created_at=now,
                 )
-                .limit(1)
             )
-        ).scalar_one()
-        user_existing = (
-            await db.execute(
-                select(Message)
-                .where(
-                    Message.workspace_id == workspace_id,
-                    Message.thread_id == thread_id,
-                    Message.operation_id == operation_uuid,
-                    Message.role == "user",
+        db.add(user_msg)
+        db.add(assistant_msg)
+        audit.record(
+            db,
+            AuditEvent(
+                workspace_id=workspace_id,
+                operation_id=operation_uuid,
+                action="TURN_EXECUTED",
+                resource_type="thread",
+                resource_id=thread_id,
+                changes={"bot_id": str(thread.bot_id) if thread.bot_id else None},
+            ),
+        )
+        try:
+            # Счётчики треда — в той же транзакции, атомарным UPDATE без
+            # read-modify-write. Autoflush перед ним может поднять
+            # IntegrityError по conversation_turn_operations — он
+            # обрабатывается ниже.
+            message_count = (
+                await db.execute(
+                    update(Thread)
+                    .where(Thread.id == thread_id, Thread.workspace_id == workspace_id)
+                    .values(
+                        message_count=Thread.message_count + 2,
+                        # GREATEST игнорирует NULL — подходит и для первого turn'а.
+                        last_message_at=func.greatest(Thread.last_message_at, now),
+                    )
+                    .returning(Thread.message_count)
+                    .execution_options(synchronize_session=False)
+                )
+            ).scalar_one_or_none()
+            if message_count is None:
+                # Тред удалён, пока шла генерация.
+                await db.rollback()
+                raise HTTPException(
+                    status_code=404,
+                    detail={"code": "THREAD_NOT_FOUND", "message": "Тред не найден"},
                 )
-                .limit(1)
+            # Свёртка длинного треда — фоновой задачей, в той же транзакции.
+            settings = request.app.state.settings
+            if summary_due(message_count, 2, settings.summary_check_every):
+                db.add(summary_job(workspace_id, thread_id))
+            await db.commit()
+        except IntegrityError:
+            # Гонка по PK conversation_turn_operations — параллельный запрос
+            # уже сохранил turn, дочитываем его.
+            await db.rollback()
+            if operation_uuid is None:
+                raise
+            replay = await _load_turn_replay(
+                db,
+                workspace_id=workspace_id,
+                thread_id=thread_id,
+                operation_id=operation_uuid,
+            )
+            if replay is None:
+                raise
+            return replay
+
+        context.invalidate(thread_id)
+        await db.refresh(user_msg)
+        await db.refresh(assistant_msg)
+    return TurnResponse(
+        thread_id=thread_id,
+        user_message=_to_msg(user_msg),
+        assistant_message=_to_msg(assistant_msg),
+    )
+
+
+async def _load_turn_replay(
+    db: AsyncSession,
+    *,
+    workspace_id: uuid.UUID,
+    thread_id: uuid.UUID,
+    operation_id: uuid.UUID,
+) -> TurnResponse | None:
+    """Результат ранее выполненного turn'а по operation_id (или None).
+
+    Сообщения turn'а имеют `created_at` операции, поэтому фильтр по нему
+    оставляет одну секцию `conversation_messages`.
+    """
+    op = (
+        await db.execute(
+            select(TurnOperation).where(
+                TurnOperation.workspace_id == workspace_id,
+                TurnOperation.thread_id == thread_id,
+                TurnOperation.operation_id == operation_id,
             )
-        ).scalar_one()
-        return TurnResponse(
-            thread_id=thread_id,
-            user_message=_to_msg(user_existing),
-            assistant_message=_to_msg(existing),
         )
+    ).scalar_one_or_none()
+    if op is None:
+        return None
 
-    await db.refresh(user_msg)
-    await db.refresh(assistant_msg)
+    rows = (
+        await db.execute(
+            select(Message).where(
+                Message.workspace_id == workspace_id,
+                Message.thread_id == thread_id,
+                Message.operation_id == operation_id,
+                Message.created_at == op.created_at,
+            )
+        )
+    ).scalars()
+    by_role = {m.role: m for m in rows}
+    user_msg = by_role.get("user")
+    assistant_msg = by_role.get("assistant")
+    if user_msg is None or assistant_msg is None:
+        return None
     return TurnResponse(
         thread_id=thread_id,
         user_message=_to_msg(user_msg),
@@ -309,16 +679,27 @@ def _to_msg(m: Message) -> MessageResponse:
     )
 
 
+def _message_projection(fields: str | None) -> Projection:
+    if not fields:
+        return MESSAGE_ROW
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted.difference(MESSAGE_ROW.fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_FIELDS",
+                "message": "Неизвестные поля: " + ", ".join(sorted(unknown)),
+            },
+        )
+    wanted.add("id")
+    return MESSAGE_ROW.only(wanted)
+
+
 async def _get_thread(
     db: AsyncSession, *, workspace_id: uuid.UUID, thread_id: uuid.UUID
-) -> Thread:
-    t = (
-        await db.execute(
-            select(Thread).where(
-                Thread.id == thread_id, Thread.workspace_id == workspace_id
-            )
-        )
-    ).scalar_one_or_none()
+) -> Row[Any]:
+    t = await fetch_thread_head(db, workspace_id=workspace_id, thread_id=thread_id)
     if t is None:
         raise HTTPException(
             status_code=404,
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -10,8 +12,10 @@ from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.requests import Request
 
+from conversations_src.adapters.db.audit_sink import create_audit_sink
 from conversations_src.adapters.db.session import create_sessionmaker
 from conversations_src.config.settings import Settings
+from conversations_src.entrypoints.http.responses import FastJSONResponse
 from conversations_src.entrypoints.http.routes_conversations import (
     router as conversations_router,
 )
@@ -19,6 +23,8 @@ from conversations_src.entrypoints.http.routes_health import router as health_ro
 from conversations_src.errors.http_errors import ErrorResponse
 from conversations_src.middleware.dedupe import DedupeMiddleware
 from conversations_src.middleware.tenant import TenantMiddleware
+from conversations_src.use_cases.admission import create_admission_controller
+from conversations_src.use_cases.context_window import create_context_assembler
 
 
 async def validation_exception_handler(
@@ -59,7 +65,10 @@ async def http_exception_handler(request: Request, exc: Exception) -> JSONRespon
     payload = ErrorResponse(
         code=code, message=message, trace_id=trace_id, details=details
     ).model_dump()
-    return JSONResponse(status_code=exc.status_code, content=payload)
+    # Заголовки исключения (например, Retry-After у 429) — в ответ.
+    return JSONResponse(
+        status_code=exc.status_code, content=payload, headers=exc.headers
+    )
 
 
 async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -70,10 +79,26 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     return JSONResponse(status_code=500, content=payload)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Дописываем отложенные audit-события до остановки процесса.
+    await app.state.audit_sink.aclose()
+    await app.state.admission.aclose()
+
+
 def create_app(settings: Settings) -> FastAPI:
-    app = FastAPI(title="LivAi Conversations Service", version="0.1.0")
+    app = FastAPI(
+        title="LivAi Conversations Service",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
     app.state.settings = settings
     app.state.db_sessionmaker = create_sessionmaker(settings)
+    app.state.audit_sink = create_audit_sink(settings, app.state.db_sessionmaker)
+    app.state.context_assembler = create_context_assembler(settings)
+    app.state.admission = create_admission_controller(settings)
 
     app.add_middleware(DedupeMiddleware)
     app.add_middleware(TenantMiddleware)
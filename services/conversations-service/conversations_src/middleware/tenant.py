@@ -1,53 +1,60 @@
 from __future__ import annotations
 
 import uuid
-from collections.abc import Awaitable, Callable
 
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from ..errors.http_errors import ErrorResponse
+from ..errors.fast_errors import ErrorTemplate
 
 
-class TenantMiddleware(BaseHTTPMiddleware):
+class TenantMiddleware:
     """Требует tenant context (workspace_id) для всех /v1/* маршрутов.
 
     Ожидаем заголовок: `X-Workspace-Id: <uuid>`.
+
+    Чистое ASGI-middleware (без `BaseHTTPMiddleware`): ответы 401 собраны
+    заранее и отправляются сырыми ASGI-сообщениями.
     """
 
     header_name = "X-Workspace-Id"
-
-    async def dispatch(  # type: ignore[override]
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        if request.method.upper() == "OPTIONS":
-            return await call_next(request)
-
-        path = request.url.path
-        if path in {"/healthz", "/readyz"}:
-            return await call_next(request)
-
-        if path.startswith("/v1/"):
-            raw = request.headers.get(self.header_name)
-            if not raw:
-                return self._error(request, message="Нет X-Workspace-Id")
+    _header_key = b"x-workspace-id"
+    _missing_workspace = ErrorTemplate(401, "UNAUTHORIZED", "Нет X-Workspace-Id")
+    _invalid_workspace = ErrorTemplate(
+        401, "UNAUTHORIZED", "Некорректный X-Workspace-Id"
+    )
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in {"/healthz", "/readyz"} or not path.startswith("/v1/"):
+            await self.app(scope, receive, send)
+            return
+
+        raw = None
+        for key, value in scope["headers"]:
+            if key == self._header_key:
+                raw = value.decode("latin-1")
+                break
+
+        error = None
+        if not raw:
+            error = self._missing_workspace
+        else:
             try:
                 workspace_id = uuid.UUID(raw)
-            except Exception:
-                return self._error(request, message="Некорректный X-Workspace-Id")
-
-            request.state.workspace_id = str(workspace_id)
+            except ValueError:
+                error = self._invalid_workspace
 
-        return await call_next(request)
+        state = scope.setdefault("state", {})
+        if error is not None:
+            await error.send(send, trace_id=state.get("trace_id"))
+            return
 
-    @staticmethod
-    def _error(request: Request, *, message: str) -> JSONResponse:
-        trace_id = getattr(request.state, "trace_id", None)
-        payload = ErrorResponse(
-            code="UNAUTHORIZED", message=message, trace_id=trace_id
-        ).model_dump()
-        return JSONResponse(status_code=401, content=payload)
+        state["workspace_id"] = str(workspace_id)
+        await self.app(scope, receive, send)
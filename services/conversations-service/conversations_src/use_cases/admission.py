@@ -0,0 +1,274 @@
+"""Admission control для turn: чтобы один воркспейс не занял всех.
+
+На каждый turn:
+
+1. Token bucket воркспейса (`ADMISSION_TOKENS_PER_MINUTE`, ёмкость —
+   минутный объём): списывается оценка токенов запроса. Не хватает — сразу
+   429 с `Retry-After` до пополнения.
+2. Слот выполнения: не больше `ADMISSION_WORKSPACE_LIMIT` turn'ов воркспейса
+   и `ADMISSION_GLOBAL_LIMIT` всего одновременно. Нет слота — запрос ждёт в
+   очереди воркспейса (до `ADMISSION_MAX_QUEUE` ожидающих), освободившиеся
+   слоты раздаются воркспейсам по кругу (round-robin), внутри воркспейса —
+   FIFO. Не дождался за `ADMISSION_MAX_WAIT_S` — 429, токены возвращаются.
+
+Реализации: `memory` — в процессе (одна реплика или лимиты на реплику),
+`redis` — общие для всех реплик (adapters/redis_admission.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Protocol
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from ..config.settings import Settings
+
+
+class AdmissionRejected(Exception):
+    """Запрос не допущен; `retry_after` — через сколько секунд повторить."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def to_http(self) -> HTTPException:
+        seconds = max(1, math.ceil(self.retry_after))
+        return HTTPException(
+            status_code=429,
+            detail={
+                "code": "ADMISSION_REJECTED",
+                "message": "Слишком много запросов воркспейса, повторите позже",
+                "details": {"reason": self.reason, "retry_after": seconds},
+            },
+            headers={"Retry-After": str(seconds)},
+        )
+
+
+class AdmissionController(Protocol):
+    def admit(
+        self, workspace_id: uuid.UUID, cost: int
+    ) -> AbstractAsyncContextManager[None]:
+        """Слот на время блока; `AdmissionRejected`, если не допущен."""
+        ...
+
+    async def aclose(self) -> None: ...
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class InProcessAdmission:
+    """Admission control в памяти процесса (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        *,
+        global_limit: int,
+        workspace_limit: int,
+        tokens_per_minute: int,
+        max_wait_s: float,
+        max_queue: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.global_limit = global_limit
+        self.workspace_limit = workspace_limit
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_s = max_wait_s
+        self.max_queue = max_queue
+        self._clock = clock
+        self._total = 0
+        self._inflight: dict[uuid.UUID, int] = {}
+        # Очереди ожидающих по воркспейсам; порядок ключей — очередь обхода.
+        self._waiters: OrderedDict[uuid.UUID, deque[asyncio.Future[None]]] = (
+            OrderedDict()
+        )
+        self._buckets: dict[uuid.UUID, _Bucket] = {}
+
+    @asynccontextmanager
+    async def admit(self, workspace_id: uuid.UUID, cost: int) -> AsyncIterator[None]:
+        cost = self._take_tokens(workspace_id, cost)
+        try:
+            await self._acquire(workspace_id)
+        except BaseException:
+            self._refund(workspace_id, cost)
+            raise
+        try:
+            yield
+        finally:
+            self._release(workspace_id)
+
+    async def aclose(self) -> None:
+        return None
+
+    # ------------------------------------------------------------------
+    # token bucket
+    # ------------------------------------------------------------------
+
+    def _take_tokens(self, workspace_id: uuid.UUID, cost: int) -> int:
+        if self.tokens_per_minute <= 0:
+            return 0
+        # Запрос дороже ёмкости всё равно проходит — при полном bucket'е.
+        cost = min(cost, self.tokens_per_minute)
+        now = self._clock()
+        rate = self.tokens_per_minute / 60.0
+        bucket = self._buckets.get(workspace_id)
+        if bucket is None:
+            bucket = self._buckets[workspace_id] = _Bucket(self.tokens_per_minute, now)
+        bucket.tokens = min(
+            self.tokens_per_minute, bucket.tokens + (now - bucket.updated) * rate
+        )
+        bucket.updated = now
+        if bucket.tokens < cost:
+            raise AdmissionRejected("tokens", (cost - bucket.tokens) / rate)
+        bucket.tokens -= cost
+        return cost
+
+    def _refund(self, workspace_id: uuid.UUID, cost: int) -> None:
+        bucket = self._buckets.get(workspace_id)
+        if bucket is not None and cost:
+            bucket.tokens = min(self.tokens_per_minute, bucket.tokens + cost)
+
+    # ------------------------------------------------------------------
+    # слоты и очередь
+    # ------------------------------------------------------------------
+
+    def _can_run(self, workspace_id: uuid.UUID) -> bool:
+        return (
+            self._total < self.global_limit
+            and self._inflight.get(workspace_id, 0) < self.workspace_limit
+        )
+
+    def _grant(self, workspace_id: uuid.UUID) -> None:
+        self._total += 1
+        self._inflight[workspace_id] = self._inflight.get(workspace_id, 0) + 1
+
+    async def _acquire(self, workspace_id: uuid.UUID) -> None:
+        if self._can_run(workspace_id) and workspace_id not in self._waiters:
+            self._grant(workspace_id)
+            return
+        queue = self._waiters.get(workspace_id)
+        if queue is None:
+            queue = self._waiters[workspace_id] = deque()
+        if len(queue) >= self.max_queue:
+            raise AdmissionRejected("queue_full", self.max_wait_s)
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_s)
+        except (TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # Слот выдали одновременно с таймаутом/отменой — вернуть его.
+                self._release(workspace_id)
+            else:
+                waiter.cancel()
+                self._drop_waiter(workspace_id, waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected("wait_timeout", self.max_wait_s) from None
+
+    def _drop_waiter(
+        self, workspace_id: uuid.UUID, waiter: asyncio.Future[None]
+    ) -> None:
+        queue = self._waiters.get(workspace_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiters[workspace_id]
+
+    def _release(self, workspace_id: uuid.UUID) -> None:
+        self._total -= 1
+        left = self._inflight[workspace_id] - 1
+        if left:
+            self._inflight[workspace_id] = left
+        else:
+            del self._inflight[workspace_id]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Раздать свободные слоты ожидающим: воркспейсы по кругу."""
+        progressed = True
+        while progressed and self._total < self.global_limit and self._waiters:
+            progressed = False
+            for workspace_id in list(self._waiters):
+                if self._total >= self.global_limit:
+                    return
+                if not self._can_run(workspace_id):
+                    continue
+                queue = self._waiters[workspace_id]
+                waiter = queue.popleft()
+                if not queue:
+                    del self._waiters[workspace_id]
+                else:
+                    self._waiters.move_to_end(workspace_id)
+                self._grant(workspace_id)
+                waiter.set_result(None)
+                progressed = True
+
+
+def create_admission_controller(settings: Settings) -> AdmissionController:
+    if settings.admission_backend == "redis":
+        from ..adapters.redis_admission import RedisAdmission
+
+        if not settings.redis_url:
+            raise ValueError("REDIS_URL is required for ADMISSION_BACKEND=redis")
+        return RedisAdmission.from_url(
+            settings.redis_url,
+            global_limit=settings.admission_global_limit,
+            workspace_limit=settings.admission_workspace_limit,
+            tokens_per_minute=settings.admission_tokens_per_minute,
+            max_wait_s=settings.admission_max_wait_s,
+            max_queue=settings.admission_max_queue,
+            lease_s=settings.admission_lease_s,
+        )
+    return InProcessAdmission(
+        global_limit=settings.admission_global_limit,
+        workspace_limit=settings.admission_workspace_limit,
+        tokens_per_minute=settings.admission_tokens_per_minute,
+        max_wait_s=settings.admission_max_wait_s,
+        max_queue=settings.admission_max_queue,
+    )
+
+
+async def admit_turn(request: Request) -> AsyncIterator[None]:
+    """FastAPI dependency (scope="function"): слот на время обработчика turn."""
+    settings = request.app.state.settings
+    raw = getattr(request.state, "workspace_id", None)
+    if settings.admission_backend == "off" or not raw:
+        # Без воркспейса обработчик сам ответит 401.
+        yield
+        return
+    workspace_id = uuid.UUID(str(raw))
+    # Оценка: текст запроса (тело уже прочитано FastAPI) + запас на контекст
+    # и ответ.
+    body = (await request.body()).decode(errors="replace")
+    tokenizer = request.app.state.context_assembler.tokenizer
+    cost = tokenizer.count(body) + settings.admission_turn_overhead_tokens
+    admission: AdmissionController = request.app.state.admission
+    try:
+        async with admission.admit(workspace_id, cost):
+            yield
+    except AdmissionRejected as exc:
+        raise exc.to_http() from None
+
+
+def get_admission(request: Request) -> AdmissionController:
+    """FastAPI dependency: общий на процесс AdmissionController."""
+    return request.app.state.admission  # type: ignore[no-any-return]
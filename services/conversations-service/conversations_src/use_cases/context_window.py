@@ -0,0 +1,230 @@
+"""Сборка контекстного окна треда под бюджет токенов.
+
+Последние сообщения треда, которые вместе помещаются в `budget` токенов:
+
+• Сообщения читаются от новых к старым keyset-страницами
+  (`(created_at, id) < последней прочитанной`) по индексу
+  ix_messages_workspace_thread_created_at; чтение прекращается на первом
+  сообщении, которое в бюджет уже не влезает. Стоимость — O(окна), а не
+  O(истории треда).
+• Токены не считаются на каждом turn'е: берётся `token_count`, записанный
+  при вставке. Для старых сообщений (NULL) считается токенайзером на лету.
+• Окно — непрерывный «хвост» истории: более старые сообщения за
+  не влезшим не добираются.
+• Если тред свёрнут (use_cases/summarization.py), окно — свёртка плюс
+  сообщения после неё: старше позиции свёртки чтение не идёт.
+
+Опционально (`CONTEXT_CACHE_SIZE` > 0) собранные окна кэшируются в
+процессе (LRU по треду). Запись валидна, пока не изменился
+`message_count` треда и его свёртка: новое сообщение или свёртка от
+любого процесса делает запись устаревшей, turn этого процесса к тому же
+сбрасывает её сразу (`invalidate`).
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import desc, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from ..adapters.db.models import Message, Thread, ThreadSummary
+from ..adapters.tokenizers import Tokenizer, create_tokenizer
+from ..config.settings import Settings
+
+# Нижняя граница created_at для отсечения секций (как в list_messages).
+_CLOCK_SKEW_MARGIN = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class ContextMessage:
+    id: uuid.UUID
+    role: str
+    content: str
+    created_at: datetime
+    token_count: int
+
+
+@dataclass(frozen=True)
+class ContextWindow:
+    messages: tuple[ContextMessage, ...]  # от старых к новым
+    tokens: int  # вместе со свёрткой
+    # True — в окно вошла вся история треда (со свёрткой, если есть).
+    complete: bool
+    # Свёртка сообщений старше `messages` (None — треда не сворачивали).
+    summary: str | None = None
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    version: tuple[int, int]  # (message_count, свёрнуто сообщений)
+    budget: int
+    window: ContextWindow
+
+
+class ContextAssembler:
+    """Сборщик окон; один на процесс (`app.state.context_assembler`)."""
+
+    def __init__(
+        self, tokenizer: Tokenizer, *, page_size: int = 64, cache_size: int = 0
+    ) -> None:
+        self.tokenizer = tokenizer
+        self.page_size = page_size
+        self.cache_size = cache_size
+        self._cache: OrderedDict[uuid.UUID, _CacheEntry] = OrderedDict()
+
+    async def assemble(
+        self,
+        db: AsyncSession,
+        *,
+        workspace_id: uuid.UUID,
+        thread_id: uuid.UUID,
+        budget: int,
+    ) -> ContextWindow:
+        """Окно треда в пределах `budget`; `LookupError`, если треда нет."""
+        head = (
+            await db.execute(
+                select(
+                    Thread.created_at,
+                    Thread.message_count,
+                    ThreadSummary.summary,
+                    ThreadSummary.token_count,
+                    ThreadSummary.covered_messages,
+                    ThreadSummary.covered_until_created_at,
+                    ThreadSummary.covered_until_id,
+                )
+                .outerjoin(ThreadSummary, ThreadSummary.thread_id == Thread.id)
+                .where(Thread.id == thread_id, Thread.workspace_id == workspace_id)
+            )
+        ).first()
+        if head is None:
+            raise LookupError(thread_id)
+        version = (head.message_count, head.covered_messages or 0)
+
+        entry = self._cache.get(thread_id)
+        if entry is not None and entry.version == version and entry.budget == budget:
+            self._cache.move_to_end(thread_id)
+            return entry.window
+
+        window = await self._read(
+            db,
+            workspace_id=workspace_id,
+            thread_id=thread_id,
+            head=head,
+            budget=budget,
+        )
+        if self.cache_size > 0:
+            self._cache[thread_id] = _CacheEntry(version, budget, window)
+            self._cache.move_to_end(thread_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return window
+
+    def invalidate(self, thread_id: uuid.UUID) -> None:
+        """Сбросить кэш треда (после записи в него новых сообщений)."""
+        self._cache.pop(thread_id, None)
+
+    async def _read(
+        self,
+        db: AsyncSession,
+        *,
+        workspace_id: uuid.UUID,
+        thread_id: uuid.UUID,
+        head: Any,
+        budget: int,
+    ) -> ContextWindow:
+        picked: list[ContextMessage] = []
+        tokens = 0
+        after: Any = None
+        since = head.created_at - _CLOCK_SKEW_MARGIN
+        # Свёртка, не влезающая в бюджет, не берётся: тогда окно читается
+        # с начала треда, как без свёртки.
+        summary: tuple[str, int] | None = None
+        if head.summary is not None and head.token_count <= budget:
+            summary = (head.summary, head.token_count)
+            budget -= head.token_count
+            since = max(since, head.covered_until_created_at)
+        while True:
+            stmt = select(
+                Message.id,
+                Message.role,
+                Message.content,
+                Message.created_at,
+                Message.token_count,
+            ).where(
+                Message.workspace_id == workspace_id,
+                Message.thread_id == thread_id,
+                Message.created_at >= since,
+            )
+            if summary is not None:
+                stmt = stmt.where(
+                    tuple_(Message.created_at, Message.id)
+                    > tuple_(
+                        literal(head.covered_until_created_at),
+                        literal(head.covered_until_id),
+                    )
+                )
+            if after is not None:
+                stmt = stmt.where(
+                    tuple_(Message.created_at, Message.id)
+                    < tuple_(literal(after.created_at), literal(after.id))
+                )
+            rows = (
+                await db.execute(
+                    stmt.order_by(desc(Message.created_at), desc(Message.id)).limit(
+                        self.page_size
+                    )
+                )
+            ).all()
+            for row in rows:
+                count = row.token_count
+                if count is None:
+                    count = self.tokenizer.count(row.content)
+                if tokens + count > budget:
+                    return _window(picked, tokens, summary, complete=False)
+                tokens += count
+                picked.append(
+                    ContextMessage(
+                        id=row.id,
+                        role=row.role,
+                        content=row.content,
+                        created_at=row.created_at,
+                        token_count=count,
+                    )
+                )
+            if len(rows) < self.page_size:
+                return _window(picked, tokens, summary, complete=True)
+            after = rows[-1]
+
+
+def _window(
+    newest_first: list[ContextMessage],
+    tokens: int,
+    summary: tuple[str, int] | None,
+    *,
+    complete: bool,
+) -> ContextWindow:
+    return ContextWindow(
+        messages=tuple(reversed(newest_first)),
+        tokens=tokens + (summary[1] if summary else 0),
+        complete=complete,
+        summary=summary[0] if summary else None,
+    )
+
+
+def create_context_assembler(settings: Settings) -> ContextAssembler:
+    return ContextAssembler(
+        create_tokenizer(settings.tokenizer),
+        page_size=settings.context_page_size,
+        cache_size=settings.context_cache_size,
+    )
+
+
+def get_context_assembler(request: Request) -> ContextAssembler:
+    """FastAPI dependency: общий на процесс ContextAssembler."""
+    return request.app.state.context_assembler  # type: ignore[no-any-return]
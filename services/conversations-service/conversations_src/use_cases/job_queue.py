@@ -1,12 +1,26 @@
+"""Очередь задач job_queue.
+
+Воркеров может быть несколько (entrypoints/cli/jobs_worker.py). Задачи
+захватываются атомарно: один `UPDATE ... SET status='processing'` по
+подзапросу `SELECT ... FOR UPDATE SKIP LOCKED` с `RETURNING` — строки,
+захваченные другим воркером, пропускаются, а не выполняются второй раз.
+Захват коммитится до начала работы.
+
+Обработчик получает собственную сессию (`sessionmaker`): его commit/rollback
+не трогают сессию сервиса, в которой пишутся статусы задач.
+"""
+
 from __future__ import annotations
 
 import uuid
+from collections.abc import Awaitable, Callable, Mapping
 from datetime import datetime, timezone
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..adapters.db.models import JobQueue
+from ..adapters.db.unit_of_work import UnitOfWork
 from ..config.settings import Settings
 from ..use_cases.dlq import DLQService
 from .retry_utils import process_job
@@ -15,16 +29,27 @@ from .retry_utils import process_job
 JSONValue = str | int | float | bool | None | list["JSONValue"] | dict[str, "JSONValue"]
 JSONObject = dict[str, JSONValue]
 
+# Обработчик задачи своего job_type: (своя сессия, задача).
+JobHandler = Callable[[AsyncSession, JobQueue], Awaitable[None]]
+
 
 class JobQueueService:
     """Сервис для обработки очереди задач с retry/dedupe логикой."""
 
     def __init__(
-        self, db_session: AsyncSession, settings: Settings, dlq_service: DLQService
+        self,
+        db_session: AsyncSession,
+        settings: Settings,
+        dlq_service: DLQService,
+        handlers: Mapping[str, JobHandler] | None = None,
+        *,
+        sessionmaker: Callable[[], AsyncSession],
     ):
         self.db_session = db_session
         self.settings = settings
         self.dlq_service = dlq_service
+        self.handlers = dict(handlers or {})
+        self.uow = UnitOfWork(sessionmaker)
 
     async def enqueue_job(
         self,
@@ -67,16 +92,13 @@ class JobQueueService:
     async def process_pending_jobs(self, limit: int = 10) -> int:
         """Обработать ожидающие задачи из очереди."""
 
-        # Получаем задачи для обработки (сортировка по приоритету и времени создания)
-        pending_jobs = await self._get_pending_jobs(limit)
+        # Захватываем задачи (status -> processing) и сразу коммитим захват
+        pending_jobs = await self._claim_pending_jobs(limit)
 
         processed_count = 0
 
         for job in pending_jobs:
             try:
-                # Помечаем как обрабатываемую
-                await self._mark_job_started(job.id)
-
                 # Обрабатываем задачу
                 await self._process_job(job)
 
@@ -116,7 +138,9 @@ class JobQueueService:
                     # retry (например, scheduler или отдельный процесс)
                     pass
 
-        await self.db_session.commit()
+            # Статус каждой задачи фиксируем сразу, не в конце пачки.
+            await self.db_session.commit()
+
         return processed_count
 
     async def process_job_with_retry(self, job: JobQueue) -> None:
@@ -137,26 +161,30 @@ class JobQueueService:
         result = await self.db_session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def _get_pending_jobs(self, limit: int) -> list[JobQueue]:
-        """Получить задачи для обработки, отсортированные по приоритету."""
-        stmt = (
-            select(JobQueue)
+    async def _claim_pending_jobs(self, limit: int) -> list[JobQueue]:
+        """Захватить до `limit` pending-задач (по приоритету и времени создания).
+
+        Строки, заблокированные другим воркером, пропускаются (SKIP LOCKED).
+        """
+        picked = (
+            select(JobQueue.id)
             .where(JobQueue.status == "pending")
             .order_by(JobQueue.priority.desc(), JobQueue.created_at.asc())
             .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
         )
-
-        result = await self.db_session.execute(stmt)
-        return list(result.scalars().all())
-
-    async def _mark_job_started(self, job_id: uuid.UUID) -> None:
-        """Пометить задачу как начатую обработку."""
         stmt = (
             update(JobQueue)
-            .where(JobQueue.id == job_id)
-            .values(status="processing", started_at=datetime.now(timezone.utc))
+            .where(JobQueue.id.in_(picked), JobQueue.status == "pending")
+            .values(status="processing", started_at=func.now())
+            .returning(JobQueue)
         )
-        await self.db_session.execute(stmt)
+        jobs = list((await self.db_session.execute(stmt)).scalars().all())
+        await self.db_session.commit()
+        # RETURNING не сохраняет порядок подзапроса.
+        jobs.sort(key=lambda job: (-job.priority, job.created_at))
+        return jobs
 
     async def _mark_job_completed(self, job_id: uuid.UUID) -> None:
         """Пометить задачу как завершенную."""
@@ -186,10 +214,13 @@ class JobQueueService:
         await self.db_session.execute(stmt)
 
     async def _process_job(self, job: JobQueue) -> None:
-        """Обработать задачу (заглушка для конкретной логики)."""
-        # Здесь должна быть логика обработки конкретного типа задачи
-        # Пока просто симулируем успешную обработку
-        if job.job_type == "example_job":
+        """Обработать задачу зарегистрированным обработчиком её job_type."""
+        handler = self.handlers.get(job.job_type)
+        if handler is not None:
+            # Своя сессия: commit/rollback обработчика не трогают статусы задач.
+            async with self.uow() as db:
+                await handler(db, job)
+        elif job.job_type == "example_job":
             # Пример обработки
             pass
         else:
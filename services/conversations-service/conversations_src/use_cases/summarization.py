@@ -0,0 +1,260 @@
+"""Скользящая свёртка длинных тредов (задача `thread_summarize` в job_queue).
+
+• turn ставит задачу в той же транзакции, что и сообщения, — каждые
+  `SUMMARY_CHECK_EVERY` сообщений треда (по `message_count`), без лишних
+  чтений. По умолчанию выключено; вне local/test — только с
+  `SUMMARIZER_BACKEND=http` (fake-свёртка обрезает текст).
+• Задача читает несвёрнутые сообщения (после позиции свёртки) и, если их
+  больше `SUMMARY_TRIGGER_TOKENS` токенов, сворачивает старые в
+  `conversation_thread_summaries`, оставляя хвост ~`SUMMARY_TAIL_TOKENS`.
+  LLM вызывается кусками по `SUMMARY_CHUNK_TOKENS`: предыдущая свёртка +
+  очередной кусок → новая свёртка. Каждый кусок коммитится сразу.
+• Контекстное окно (use_cases/context_window.py) берёт свёртку и читает
+  сообщения только после неё — стоимость turn'а ограничена и по токенам,
+  и по чтениям из БД.
+
+Задача идемпотентна: повтор или параллельный запуск ничего не сворачивает
+дважды — запись свёртки условная (`covered_messages` не изменился с
+момента чтения).
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..adapters.db.models import JobQueue, Message, Thread, ThreadSummary
+from ..adapters.llm import SummarizerBackend, create_summarizer
+from ..adapters.tokenizers import Tokenizer, create_tokenizer
+from ..config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "thread_summarize"
+
+# Нижняя граница created_at для отсечения секций (как в list_messages).
+_CLOCK_SKEW_MARGIN = timedelta(hours=1)
+
+
+def summary_job(workspace_id: uuid.UUID, thread_id: uuid.UUID) -> JobQueue:
+    """Строка job_queue для свёртки треда (добавляется в сессию turn'а)."""
+    return JobQueue(
+        id=uuid.uuid4(),
+        workspace_id=workspace_id,
+        job_type=JOB_TYPE,
+        payload={"thread_id": str(thread_id)},
+        status="pending",
+        priority=0,
+        attempts=0,
+        max_attempts=3,
+    )
+
+
+def summary_due(message_count: int, added: int, every: int) -> bool:
+    """Пересёк ли тред очередную отметку в `every` сообщений."""
+    return every > 0 and message_count // every > (message_count - added) // every
+
+
+@dataclass(frozen=True)
+class _Pending:
+    id: uuid.UUID
+    role: str
+    content: str
+    created_at: Any
+    tokens: int
+
+
+class ThreadSummarizer:
+    """Обработчик задачи `thread_summarize` (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        backend: SummarizerBackend,
+        tokenizer: Tokenizer,
+        *,
+        trigger_tokens: int,
+        tail_tokens: int,
+        chunk_tokens: int,
+    ) -> None:
+        self.backend = backend
+        self.tokenizer = tokenizer
+        self.trigger_tokens = trigger_tokens
+        self.tail_tokens = tail_tokens
+        self.chunk_tokens = chunk_tokens
+
+    async def __call__(self, db: AsyncSession, job: JobQueue) -> None:
+        await self.summarize(
+            db,
+            workspace_id=job.workspace_id,
+            thread_id=uuid.UUID(job.payload["thread_id"]),
+        )
+
+    async def summarize(
+        self, db: AsyncSession, *, workspace_id: uuid.UUID, thread_id: uuid.UUID
+    ) -> int:
+        """Свернуть старые сообщения треда; вернуть число свёрнутых."""
+        head = (
+            await db.execute(
+                select(
+                    Thread.created_at,
+                    ThreadSummary.summary,
+                    ThreadSummary.covered_messages,
+                    ThreadSummary.covered_until_created_at,
+                    ThreadSummary.covered_until_id,
+                )
+                .outerjoin(ThreadSummary, ThreadSummary.thread_id == Thread.id)
+                .where(Thread.id == thread_id, Thread.workspace_id == workspace_id)
+            )
+        ).first()
+        if head is None:
+            return 0  # тред удалён
+        summary: str | None = head.summary
+        covered: int = head.covered_messages or 0
+
+        pending = await self._pending(db, workspace_id, thread_id, head)
+        # Дальше — только LLM: не держим транзакцию открытой на время вызова.
+        await db.commit()
+        if sum(m.tokens for m in pending) <= self.trigger_tokens:
+            return 0
+
+        # Хвост (новейшие сообщения до tail_tokens) остаётся как есть.
+        cut, tail = len(pending), 0
+        while cut > 0 and tail + pending[cut - 1].tokens <= self.tail_tokens:
+            cut -= 1
+            tail += pending[cut].tokens
+
+        folded = 0
+        for chunk in _chunks(pending[:cut], self.chunk_tokens):
+            summary = await self.backend.summarize(
+                summary, [(m.role, m.content) for m in chunk]
+            )
+            saved = await self._save(
+                db,
+                workspace_id=workspace_id,
+                thread_id=thread_id,
+                summary=summary,
+                expected_covered=covered,
+                covered=covered + len(chunk),
+                last=chunk[-1],
+            )
+            if not saved:
+                # Параллельная задача уже продвинула свёртку.
+                await db.rollback()
+                break
+            await db.commit()
+            covered += len(chunk)
+            folded += len(chunk)
+        logger.info("thread %s: summarised %d messages", thread_id, folded)
+        return folded
+
+    async def _pending(
+        self,
+        db: AsyncSession,
+        workspace_id: uuid.UUID,
+        thread_id: uuid.UUID,
+        head: Any,
+    ) -> list[_Pending]:
+        """Несвёрнутые сообщения треда, от старых к новым."""
+        since = head.created_at - _CLOCK_SKEW_MARGIN
+        stmt = select(
+            Message.id,
+            Message.role,
+            Message.content,
+            Message.created_at,
+            Message.token_count,
+        ).where(
+            Message.workspace_id == workspace_id,
+            Message.thread_id == thread_id,
+        )
+        if head.covered_until_id is not None:
+            since = max(since, head.covered_until_created_at)
+            stmt = stmt.where(
+                tuple_(Message.created_at, Message.id)
+                > tuple_(
+                    literal(head.covered_until_created_at),
+                    literal(head.covered_until_id),
+                )
+            )
+        rows = await db.execute(
+            stmt.where(Message.created_at >= since).order_by(
+                Message.created_at, Message.id
+            )
+        )
+        return [
+            _Pending(
+                id=row.id,
+                role=row.role,
+                content=row.content,
+                created_at=row.created_at,
+                tokens=(
+                    row.token_count
+                    if row.token_count is not None
+                    else self.tokenizer.count(row.content)
+                ),
+            )
+            for row in rows
+        ]
+
+    async def _save(
+        self,
+        db: AsyncSession,
+        *,
+        workspace_id: uuid.UUID,
+        thread_id: uuid.UUID,
+        summary: str,
+        expected_covered: int,
+        covered: int,
+        last: _Pending,
+    ) -> bool:
+        values = {
+            "summary": summary,
+            "token_count": self.tokenizer.count(summary),
+            "covered_messages": covered,
+            "covered_until_created_at": last.created_at,
+            "covered_until_id": last.id,
+        }
+        stmt = (
+            insert(ThreadSummary)
+            .values(thread_id=thread_id, workspace_id=workspace_id, **values)
+            .on_conflict_do_update(
+                index_elements=[ThreadSummary.thread_id],
+                set_={**values, "updated_at": func.now()},
+                where=ThreadSummary.covered_messages == expected_covered,
+            )
+        )
+        result: Any = await db.execute(stmt)
+        return bool(result.rowcount == 1)
+
+
+def _chunks(messages: Sequence[_Pending], max_tokens: int) -> list[list[_Pending]]:
+    """Куски подряд идущих сообщений до `max_tokens` (минимум одно в куске)."""
+    chunks: list[list[_Pending]] = []
+    current: list[_Pending] = []
+    tokens = 0
+    for m in messages:
+        if current and tokens + m.tokens > max_tokens:
+            chunks.append(current)
+            current, tokens = [], 0
+        current.append(m)
+        tokens += m.tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def create_thread_summarizer(settings: Settings) -> ThreadSummarizer:
+    return ThreadSummarizer(
+        create_summarizer(settings),
+        create_tokenizer(settings.tokenizer),
+        trigger_tokens=settings.summary_trigger_tokens,
+        tail_tokens=settings.summary_tail_tokens,
+        chunk_tokens=settings.summary_chunk_tokens,
+    )
@@ -0,0 +1,166 @@
+"""Потоковый экспорт тредов и сообщений воркспейса (`GET /v1/conversations/export`).
+
+Формат — NDJSON тех же записей, что принимает `POST /threads:import`
+(лишние поля импорт игнорирует):
+
+    {"type": "thread", "id": ..., "bot_id": ..., "created_at": ..., ...}
+    ...
+    {"type": "message", "id": ..., "thread_id": ..., "role": ..., ...}
+    {"type": "checkpoint", "cursor": "..."}
+    ...
+    {"type": "end", "threads": 12, "messages": 340}
+
+• Сначала все треды (по id), затем все сообщения (по thread_id,
+  created_at, id) — импорт видит тред раньше его сообщений.
+• Чтение — server-side курсором (`yield_per`): в памяти одна пачка строк,
+  независимо от размера воркспейса. Обе фазы — в одной транзакции
+  REPEATABLE READ, т.е. на одном снимке.
+• После каждой пачки — строка `checkpoint` с курсором. Если поток оборвался,
+  повтор с `?cursor=<последний checkpoint>` продолжает с места обрыва.
+  Отсутствие строки `end` означает, что экспорт не завершён.
+"""
+
+from __future__ import annotations
+
+import base64
+import uuid
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
+import orjson
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..adapters.db.models import Message, Thread
+from ..adapters.db.queries import MESSAGE_ROW, THREAD_ROW
+
+
+@dataclass(frozen=True)
+class ExportCursor:
+    """Позиция экспорта: последняя отданная запись фазы `threads`/`messages`."""
+
+    phase: Literal["threads", "messages"]
+    id: uuid.UUID
+    thread_id: uuid.UUID | None = None
+    created_at: datetime | None = None
+
+    def encode(self) -> str:
+        raw = orjson.dumps([self.phase, self.id, self.thread_id, self.created_at])
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> ExportCursor:
+        """Разобрать токен; `ValueError`, если он битый."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            phase, id_, thread_id, created_at = orjson.loads(raw)
+            if phase == "threads":
+                return cls(phase="threads", id=uuid.UUID(id_))
+            if phase == "messages":
+                return cls(
+                    phase="messages",
+                    id=uuid.UUID(id_),
+                    thread_id=uuid.UUID(thread_id),
+                    created_at=datetime.fromisoformat(created_at),
+                )
+        except (ValueError, TypeError) as exc:
+            raise ValueError("invalid export cursor") from exc
+        raise ValueError("invalid export cursor")
+
+
+def threads_statement(
+    workspace_id: uuid.UUID, after: ExportCursor | None
+) -> Select[Any]:
+    stmt = THREAD_ROW.select().where(Thread.workspace_id == workspace_id)
+    if after is not None:
+        stmt = stmt.where(Thread.id > after.id)
+    return stmt.order_by(Thread.id)
+
+
+def messages_statement(
+    workspace_id: uuid.UUID, after: ExportCursor | None
+) -> Select[Any]:
+    # Порядок — под ix_messages_workspace_thread_created_at.
+    stmt = MESSAGE_ROW.select().where(Message.workspace_id == workspace_id)
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(Message.thread_id, Message.created_at, Message.id)
+            > tuple_(
+                literal(after.thread_id), literal(after.created_at), literal(after.id)
+            )
+        )
+    return stmt.order_by(Message.thread_id, Message.created_at, Message.id)
+
+
+def _line(record: dict[str, Any]) -> bytes:
+    return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def export_workspace(
+    db: AsyncSession,
+    *,
+    workspace_id: uuid.UUID,
+    after: ExportCursor | None = None,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """NDJSON-экспорт воркспейса кусками (по куску на пачку строк)."""
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    threads = messages = 0
+    try:
+        if after is None or after.phase == "threads":
+            result = await db.stream(
+                threads_statement(workspace_id, after).execution_options(
+                    yield_per=batch_size
+                )
+            )
+            fields = THREAD_ROW.fields
+            async for rows in result.partitions():
+                chunk = bytearray()
+                for row in rows:
+                    chunk += _line(
+                        {"type": "thread", **dict(zip(fields, row, strict=True))}
+                    )
+                threads += len(rows)
+                cursor = ExportCursor(phase="threads", id=rows[-1].id)
+                chunk += _line({"type": "checkpoint", "cursor": cursor.encode()})
+                yield bytes(chunk)
+            after = None
+
+        result = await db.stream(
+            messages_statement(workspace_id, after).execution_options(
+                yield_per=batch_size
+            )
+        )
+        fields = MESSAGE_ROW.fields
+        async for rows in result.partitions():
+            chunk = bytearray()
+            for row in rows:
+                chunk += _line(
+                    {"type": "message", **dict(zip(fields, row, strict=True))}
+                )
+            messages += len(rows)
+            last = rows[-1]
+            cursor = ExportCursor(
+                phase="messages",
+                id=last.id,
+                thread_id=last.thread_id,
+                created_at=last.created_at,
+            )
+            chunk += _line({"type": "checkpoint", "cursor": cursor.encode()})
+            yield bytes(chunk)
+
+        yield _line({"type": "end", "threads": threads, "messages": messages})
+    finally:
+        await db.rollback()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Сжать поток gzip'ом, не дожидаясь конца: каждый кусок — с SYNC_FLUSH,
+    клиент может распаковывать по мере получения."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
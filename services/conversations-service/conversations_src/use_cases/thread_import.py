@@ -0,0 +1,398 @@
+"""Потоковый импорт тредов и сообщений (`POST /v1/conversations/threads:import`).
+
+Тело запроса — NDJSON, по записи на строку:
+
+    {"type": "thread", "id": "...", "created_at": "...", "bot_id": null}
+    {"type": "message", "thread_id": "...", "role": "user", "content": "...",
+     "created_at": "..."}
+
+• Поток разбирается построчно, в памяти — не больше одного батча
+  (`IMPORT_BATCH_SIZE` записей).
+• Батч пишется в своей транзакции через asyncpg `copy_records_to_table`
+  (COPY) в `conversation_threads` / `conversation_messages`; счётчики тредов
+  (`message_count`, `last_message_at`) обновляются там же.
+• Владение: `workspace_id` в записях (если указан) должен совпадать с
+  воркспейсом запроса, сообщения — ссылаться на треды этого воркспейса.
+• Возобновление: вместе с батчем коммитится строка `conversation_import_batches`
+  по `(workspace_id, operation_id, batch_no)`. Повтор запроса с тем же
+  `X-Operation-Id` пропускает уже записанные записи (без разбора JSON) и
+  продолжает с первой незаписанной.
+
+Сообщения месяцев, для которых нет секции, попадают в
+`conversation_messages_default`.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Literal
+
+import asyncpg
+from pydantic import AwareDatetime, BaseModel, Field, TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..adapters.db.models import ImportBatch, Thread
+from ..adapters.tokenizers import ApproxTokenizer, Tokenizer
+
+# created_at треда ставится историческим, сообщения не должны быть раньше
+# (list_messages ограничивает выборку снизу created_at треда с этим запасом).
+_CLOCK_SKEW_MARGIN = timedelta(hours=1)
+
+_THREAD_COLUMNS = ["id", "workspace_id", "bot_id", "status", "created_at"]
+_MESSAGE_COLUMNS = [
+    "id",
+    "workspace_id",
+    "thread_id",
+    "bot_id",
+    "role",
+    "content",
+    "token_count",
+    "operation_id",
+    "created_at",
+]
+
+_BUMP_THREAD_COUNTERS = text(
+    """
+    UPDATE conversation_threads AS t
+    SET message_count = t.message_count + s.message_count,
+        last_message_at = GREATEST(t.last_message_at, s.last_message_at)
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:counts AS integer[]),
+        CAST(:last_at AS timestamptz[])
+    ) AS s(id, message_count, last_message_at)
+    WHERE t.id = s.id AND t.workspace_id = :workspace_id
+    """
+)
+
+
+class ImportThread(BaseModel):
+    type: Literal["thread"]
+    id: uuid.UUID
+    workspace_id: uuid.UUID | None = None
+    bot_id: uuid.UUID | None = None
+    status: str = Field(default="active", min_length=1, max_length=32)
+    created_at: AwareDatetime
+
+
+class ImportMessage(BaseModel):
+    type: Literal["message"]
+    id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    workspace_id: uuid.UUID | None = None
+    thread_id: uuid.UUID
+    role: Literal["user", "assistant", "system"]
+    content: str = Field(min_length=1, max_length=50_000)
+    created_at: AwareDatetime
+
+
+class ImportMarker(BaseModel):
+    """Служебные строки экспорта (`GET /export`) — при импорте пропускаются."""
+
+    type: Literal["checkpoint", "end"]
+
+
+_Record = ImportThread | ImportMessage | ImportMarker
+_RECORD: TypeAdapter[_Record] = TypeAdapter(
+    Annotated[_Record, Field(discriminator="type")]
+)
+
+
+class ImportRecordError(Exception):
+    """Запись потока не прошла проверку; `line` — номер строки (с 1)."""
+
+    def __init__(self, line: int, code: str, message: str, **details: Any) -> None:
+        super().__init__(message)
+        self.line = line
+        self.code = code
+        self.message = message
+        self.details = details
+
+
+class ImportConflictError(Exception):
+    """COPY упёрся в уникальный ключ (id сообщения/треда уже в БД)."""
+
+
+@dataclass
+class ImportReport:
+    operation_id: uuid.UUID
+    resumed_from: int = 0
+    batches: int = 0
+    threads: int = 0
+    messages: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.threads + self.messages
+        return rows / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+@dataclass
+class _Batch:
+    first_record: int
+    first_line: int
+    records: int = 0
+    threads: list[ImportThread] = field(default_factory=list)
+    thread_ids: set[uuid.UUID] = field(default_factory=set)
+    messages: list[tuple[int, ImportMessage]] = field(default_factory=list)
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], *, max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes]]:
+    """Строки NDJSON-потока `(номер строки, байты)`; пустые пропускаются."""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            line = line.strip()
+            if line:
+                yield line_no, line
+        if len(buffer) > max_line_bytes:
+            raise ImportRecordError(
+                line_no + 1, "LINE_TOO_LONG", f"Строка длиннее {max_line_bytes} байт"
+            )
+    line_no += 1
+    tail = buffer.strip()
+    if tail:
+        yield line_no, tail
+
+
+class ThreadImporter:
+    """Импорт NDJSON-потока одного запроса (см. docstring модуля)."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        *,
+        workspace_id: uuid.UUID,
+        operation_id: uuid.UUID,
+        batch_size: int,
+        tokenizer: Tokenizer | None = None,
+    ) -> None:
+        self.db = db
+        self.workspace_id = workspace_id
+        self.operation_id = operation_id
+        self.batch_size = batch_size
+        self.tokenizer = tokenizer or ApproxTokenizer()
+        # Треды воркспейса, уже проверенные/записанные: id -> (bot_id, created_at).
+        self._threads: dict[uuid.UUID, tuple[uuid.UUID | None, datetime]] = {}
+        self._next_batch_no = 0
+
+    async def run(self, lines: AsyncIterable[tuple[int, bytes]]) -> ImportReport:
+        started = time.perf_counter()
+        report = ImportReport(operation_id=self.operation_id)
+        report.resumed_from, self._next_batch_no = await self._resume_point()
+
+        record_no = 0
+        batch: _Batch | None = None
+        async for line_no, line in lines:
+            record_no += 1
+            if record_no <= report.resumed_from:
+                continue  # уже записано прошлым запросом с этим operation_id
+            if batch is None:
+                batch = _Batch(first_record=record_no - 1, first_line=line_no)
+            self._add(batch, line_no, self._parse(line_no, line))
+            if batch.records >= self.batch_size:
+                await self._commit(batch, report)
+                batch = None
+        if batch is not None:
+            await self._commit(batch, report)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    # ------------------------------------------------------------------
+    # разбор и проверка
+    # ------------------------------------------------------------------
+
+    def _parse(self, line_no: int, line: bytes) -> _Record:
+        try:
+            record = _RECORD.validate_json(line)
+        except ValidationError as exc:
+            raise ImportRecordError(
+                line_no,
+                "INVALID_RECORD",
+                "Некорректная запись",
+                errors=exc.errors(include_input=False, include_context=False),
+            ) from None
+        if isinstance(record, ImportMarker):
+            return record
+        if record.workspace_id not in (None, self.workspace_id):
+            raise ImportRecordError(
+                line_no, "WORKSPACE_MISMATCH", "Запись другого воркспейса"
+            )
+        return record
+
+    def _add(self, batch: _Batch, line_no: int, record: _Record) -> None:
+        batch.records += 1
+        if isinstance(record, ImportMarker):
+            return
+        if isinstance(record, ImportThread):
+            if record.id in self._threads or record.id in batch.thread_ids:
+                raise ImportRecordError(
+                    line_no, "DUPLICATE_THREAD", "Тред уже есть в потоке"
+                )
+            batch.threads.append(record)
+            batch.thread_ids.add(record.id)
+        else:
+            batch.messages.append((line_no, record))
+
+    async def _resolve_threads(self, batch: _Batch) -> None:
+        """Проверить треды батча и сообщения, ссылающиеся на треды из БД."""
+        if batch.thread_ids:
+            taken = (
+                await self.db.execute(
+                    select(Thread.id).where(Thread.id.in_(batch.thread_ids)).limit(1)
+                )
+            ).scalar_one_or_none()
+            if taken is not None:
+                raise ImportRecordError(
+                    batch.first_line,
+                    "THREAD_EXISTS",
+                    "Тред с таким id уже существует",
+                    thread_id=str(taken),
+                )
+            for t in batch.threads:
+                self._threads[t.id] = (t.bot_id, t.created_at)
+
+        unknown = {m.thread_id for _, m in batch.messages} - self._threads.keys()
+        if unknown:
+            rows = await self.db.execute(
+                select(Thread.id, Thread.bot_id, Thread.created_at).where(
+                    Thread.workspace_id == self.workspace_id,
+                    Thread.id.in_(unknown),
+                )
+            )
+            for thread_id, bot_id, created_at in rows:
+                self._threads[thread_id] = (bot_id, created_at)
+
+        for line_no, m in batch.messages:
+            thread = self._threads.get(m.thread_id)
+            if thread is None:
+                raise ImportRecordError(
+                    line_no,
+                    "THREAD_NOT_FOUND",
+                    "Тред не найден в воркспейсе",
+                    thread_id=str(m.thread_id),
+                )
+            if m.created_at < thread[1] - _CLOCK_SKEW_MARGIN:
+                raise ImportRecordError(
+                    line_no,
+                    "MESSAGE_BEFORE_THREAD",
+                    "created_at сообщения раньше created_at треда",
+                )
+
+    # ------------------------------------------------------------------
+    # запись
+    # ------------------------------------------------------------------
+
+    async def _resume_point(self) -> tuple[int, int]:
+        """(сколько записей уже записано, номер следующего батча)."""
+        row = (
+            await self.db.execute(
+                select(
+                    func.coalesce(
+                        func.max(ImportBatch.first_record + ImportBatch.records), 0
+                    ),
+                    func.count(),
+                ).where(
+                    ImportBatch.workspace_id == self.workspace_id,
+                    ImportBatch.operation_id == self.operation_id,
+                )
+            )
+        ).one()
+        await self.db.commit()
+        return int(row[0]), int(row[1])
+
+    async def _commit(self, batch: _Batch, report: ImportReport) -> None:
+        try:
+            await self._resolve_threads(batch)
+            await self._write(batch)
+            await self.db.commit()
+        except BaseException:
+            await self.db.rollback()
+            # Треды батча не записаны — забываем их.
+            for t in batch.threads:
+                self._threads.pop(t.id, None)
+            raise
+        self._next_batch_no += 1
+        report.batches += 1
+        report.threads += len(batch.threads)
+        report.messages += len(batch.messages)
+
+    async def _write(self, batch: _Batch) -> None:
+        # Строка батча — первой: открывает транзакцию до COPY (asyncpg
+        # COPY идёт по тому же соединению) и ловит параллельный запрос с
+        # тем же operation_id (PK).
+        await self.db.execute(
+            insert(ImportBatch).values(
+                workspace_id=self.workspace_id,
+                operation_id=self.operation_id,
+                batch_no=self._next_batch_no,
+                first_record=batch.first_record,
+                records=batch.records,
+                threads=len(batch.threads),
+                messages=len(batch.messages),
+            )
+        )
+        conn = await (await self.db.connection()).get_raw_connection()
+        driver = conn.driver_connection
+        assert driver is not None
+        try:
+            await self._copy(driver, batch)
+        except asyncpg.UniqueViolationError as exc:
+            raise ImportConflictError(str(exc)) from exc
+
+    async def _copy(self, driver: Any, batch: _Batch) -> None:
+        if batch.threads:
+            await driver.copy_records_to_table(
+                "conversation_threads",
+                columns=_THREAD_COLUMNS,
+                records=[
+                    (t.id, self.workspace_id, t.bot_id, t.status, t.created_at)
+                    for t in batch.threads
+                ],
+            )
+        if not batch.messages:
+            return
+
+        counters: dict[uuid.UUID, tuple[int, datetime]] = {}
+        records = []
+        for _, m in batch.messages:
+            bot_id, _created_at = self._threads[m.thread_id]
+            records.append(
+                (
+                    m.id,
+                    self.workspace_id,
+                    m.thread_id,
+                    bot_id,
+                    m.role,
+                    m.content,
+                    self.tokenizer.count(m.content),
+                    self.operation_id,
+                    m.created_at,
+                )
+            )
+            count, last_at = counters.get(m.thread_id, (0, m.created_at))
+            counters[m.thread_id] = (count + 1, max(last_at, m.created_at))
+        await driver.copy_records_to_table(
+            "conversation_messages", columns=_MESSAGE_COLUMNS, records=records
+        )
+        await self.db.execute(
+            _BUMP_THREAD_COUNTERS,
+            {
+                "workspace_id": self.workspace_id,
+                "ids": list(counters),
+                "counts": [count for count, _ in counters.values()],
+                "last_at": [last_at for _, last_at in counters.values()],
+            },
+        )
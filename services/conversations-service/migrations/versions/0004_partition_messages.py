@@ -0,0 +1,167 @@
+"""partition conversation_messages by month, move turn idempotency key
+
+Revision ID: 0004_partition_messages
+Revises: 0003_alter_llm_turns
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_partition_messages"
+down_revision = "0003_alter_llm_turns"
+branch_labels = None
+depends_on = None
+
+_INDEXES: list[tuple[str, list[str]]] = [
+    ("ix_conversation_messages_workspace_id", ["workspace_id"]),
+    ("ix_conversation_messages_thread_id", ["thread_id"]),
+    ("ix_conversation_messages_bot_id", ["bot_id"]),
+    ("ix_conversation_messages_operation_id", ["operation_id"]),
+    ("ix_messages_workspace_thread", ["workspace_id", "thread_id"]),
+    (
+        "ix_messages_workspace_thread_operation",
+        ["workspace_id", "thread_id", "operation_id"],
+    ),
+]
+
+# Секции создаём от самого старого месяца с данными до now() + 3 месяца;
+# дальше их досоздаёт `python -m conversations_src.entrypoints.cli.partitions`.
+_CREATE_MONTH_PARTITIONS = """
+DO $$
+DECLARE
+    m date := date_trunc('month', coalesce(
+        (SELECT min(created_at) FROM conversation_messages_unpartitioned), now()
+    ))::date;
+    last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    WHILE m <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF conversation_messages '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'conversation_messages_p' || to_char(m, 'YYYY_MM'),
+            m,
+            (m + interval '1 month')::date
+        );
+        m := (m + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("thread_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("bot_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("role", sa.String(length=16), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("operation_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    ]
+
+
+def _drop_indexes() -> None:
+    for name, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name="conversation_messages")
+
+
+def _create_indexes() -> None:
+    for name, columns in _INDEXES:
+        op.create_index(name, "conversation_messages", columns, unique=False)
+
+
+def upgrade() -> None:
+    # Уникальность (operation_id, role) на секционированной таблице без
+    # created_at в ключе невозможна — ключ идемпотентности turn переезжает
+    # в отдельную таблицу.
+    op.create_table(
+        "conversation_turn_operations",
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("thread_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("workspace_id", "thread_id", "operation_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO conversation_turn_operations
+            (workspace_id, thread_id, operation_id, created_at)
+        SELECT DISTINCT ON (workspace_id, thread_id, operation_id)
+            workspace_id, thread_id, operation_id, created_at
+        FROM conversation_messages
+        WHERE operation_id IS NOT NULL AND role = 'assistant'
+        ORDER BY workspace_id, thread_id, operation_id, created_at
+        """
+    )
+
+    op.drop_index(
+        "ux_messages_workspace_thread_operation_role",
+        table_name="conversation_messages",
+    )
+    _drop_indexes()
+    op.rename_table("conversation_messages", "conversation_messages_unpartitioned")
+    op.execute(
+        "ALTER INDEX conversation_messages_pkey "
+        "RENAME TO conversation_messages_unpartitioned_pkey"
+    )
+
+    op.create_table(
+        "conversation_messages",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name="conversation_messages_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute(_CREATE_MONTH_PARTITIONS)
+    # Страховка: строки вне созданных секций не должны ронять INSERT.
+    op.execute(
+        "CREATE TABLE conversation_messages_default "
+        "PARTITION OF conversation_messages DEFAULT"
+    )
+
+    op.execute(
+        "INSERT INTO conversation_messages "
+        "SELECT * FROM conversation_messages_unpartitioned"
+    )
+    op.drop_table("conversation_messages_unpartitioned")
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _drop_indexes()
+    op.rename_table("conversation_messages", "conversation_messages_partitioned")
+    op.execute(
+        "ALTER INDEX conversation_messages_pkey "
+        "RENAME TO conversation_messages_partitioned_pkey"
+    )
+
+    op.create_table(
+        "conversation_messages",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", name="conversation_messages_pkey"),
+    )
+    op.execute(
+        "INSERT INTO conversation_messages "
+        "SELECT * FROM conversation_messages_partitioned"
+    )
+    # Секции удаляются вместе с родительской таблицей.
+    op.drop_table("conversation_messages_partitioned")
+
+    _create_indexes()
+    op.create_index(
+        "ux_messages_workspace_thread_operation_role",
+        "conversation_messages",
+        ["workspace_id", "thread_id", "operation_id", "role"],
+        unique=True,
+    )
+    op.drop_table("conversation_turn_operations")
@@ -0,0 +1,52 @@
+"""replace conversation_messages indexes with one covering index
+
+Revision ID: 0005_slim_message_indexes
+Revises: 0004_partition_messages
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0005_slim_message_indexes"
+down_revision = "0004_partition_messages"
+branch_labels = None
+depends_on = None
+
+# Одиночные индексы и префиксы (workspace_id, thread_id[, operation_id])
+# покрываются новым индексом; по bot_id сообщения не читаются.
+_REDUNDANT_INDEXES: list[tuple[str, list[str]]] = [
+    ("ix_conversation_messages_workspace_id", ["workspace_id"]),
+    ("ix_conversation_messages_thread_id", ["thread_id"]),
+    ("ix_conversation_messages_bot_id", ["bot_id"]),
+    ("ix_conversation_messages_operation_id", ["operation_id"]),
+    ("ix_messages_workspace_thread", ["workspace_id", "thread_id"]),
+    (
+        "ix_messages_workspace_thread_operation",
+        ["workspace_id", "thread_id", "operation_id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    # Чтение треда (ORDER BY created_at, id) и поиск turn'а по
+    # (created_at, operation_id) обслуживаются index-only scan'ом.
+    op.create_index(
+        "ix_messages_workspace_thread_created_at",
+        "conversation_messages",
+        ["workspace_id", "thread_id", "created_at", "id"],
+        unique=False,
+        postgresql_include=["role", "operation_id"],
+    )
+    for name, _ in _REDUNDANT_INDEXES:
+        op.drop_index(name, table_name="conversation_messages")
+
+
+def downgrade() -> None:
+    for name, columns in _REDUNDANT_INDEXES:
+        op.create_index(name, "conversation_messages", columns, unique=False)
+    op.drop_index(
+        "ix_messages_workspace_thread_created_at",
+        table_name="conversation_messages",
+    )
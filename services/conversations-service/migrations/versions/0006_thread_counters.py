@@ -0,0 +1,44 @@
+"""add message_count / last_message_at to conversation_threads
+
+Revision ID: 0006_thread_counters
+Revises: 0005_slim_message_indexes
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_thread_counters"
+down_revision = "0005_slim_message_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # DEFAULT-константа: колонка добавляется без переписывания таблицы.
+    # Значения для существующих тредов заполняет
+    # `python -m conversations_src.entrypoints.cli.backfill_thread_counters`.
+    op.add_column(
+        "conversation_threads",
+        sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "conversation_threads",
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_threads_workspace_last_message_at",
+        "conversation_threads",
+        ["workspace_id", sa.text("last_message_at DESC NULLS LAST")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_threads_workspace_last_message_at", table_name="conversation_threads"
+    )
+    op.drop_column("conversation_threads", "last_message_at")
+    op.drop_column("conversation_threads", "message_count")
@@ -0,0 +1,47 @@
+"""full-text search column and GIN index on conversation_messages
+
+Revision ID: 0007_message_search
+Revises: 0006_thread_counters
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0007_message_search"
+down_revision = "0006_thread_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GIN по uuid-колонке (workspace_id) требует btree_gin.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # STORED-колонка переписывает все секции: на больших данных выполнять
+    # в окно обслуживания.
+    op.add_column(
+        "conversation_messages",
+        sa.Column(
+            "content_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('russian'::regconfig, content)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_messages_workspace_content_tsv",
+        "conversation_messages",
+        ["workspace_id", "content_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_messages_workspace_content_tsv", table_name="conversation_messages"
+    )
+    op.drop_column("conversation_messages", "content_tsv")
@@ -0,0 +1,41 @@
+"""conversation_import_batches for resumable thread import
+
+Revision ID: 0008_import_batches
+Revises: 0007_message_search
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0008_import_batches"
+down_revision = "0007_message_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_import_batches",
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("batch_no", sa.Integer(), nullable=False),
+        sa.Column("first_record", sa.Integer(), nullable=False),
+        sa.Column("records", sa.Integer(), nullable=False),
+        sa.Column("threads", sa.Integer(), nullable=False),
+        sa.Column("messages", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("workspace_id", "operation_id", "batch_no"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("conversation_import_batches")
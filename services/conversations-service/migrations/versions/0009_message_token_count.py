@@ -0,0 +1,28 @@
+"""conversation_messages.token_count for context window assembly
+
+Revision ID: 0009_message_token_count
+Revises: 0008_import_batches
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_message_token_count"
+down_revision = "0008_import_batches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable без default — только правка каталога, без перезаписи таблицы.
+    # У старых сообщений NULL: их считает ContextAssembler при чтении.
+    op.add_column(
+        "conversation_messages", sa.Column("token_count", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("conversation_messages", "token_count")
@@ -0,0 +1,43 @@
+"""conversation_thread_summaries for rolling thread summarisation
+
+Revision ID: 0010_thread_summaries
+Revises: 0009_message_token_count
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0010_thread_summaries"
+down_revision = "0009_message_token_count"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_thread_summaries",
+        sa.Column("thread_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("workspace_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("token_count", sa.Integer(), nullable=False),
+        sa.Column("covered_messages", sa.Integer(), nullable=False),
+        sa.Column(
+            "covered_until_created_at", sa.DateTime(timezone=True), nullable=False
+        ),
+        sa.Column("covered_until_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("thread_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("conversation_thread_summaries")
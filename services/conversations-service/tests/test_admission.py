@@ -0,0 +1,97 @@
+"""Admission control turn'ов: лимиты, справедливая очередь, token bucket."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+
+from conversations_src.use_cases.admission import AdmissionRejected, InProcessAdmission
+
+WS_A = uuid.UUID(int=1)
+WS_B = uuid.UUID(int=2)
+
+
+def _admission(**kwargs: Any) -> InProcessAdmission:
+    options: dict[str, Any] = {
+        "global_limit": 1,
+        "workspace_limit": 1,
+        "tokens_per_minute": 0,
+        "max_wait_s": 1.0,
+        "max_queue": 8,
+    }
+    options.update(kwargs)
+    return InProcessAdmission(**options)
+
+
+@pytest.mark.asyncio
+async def test_waiting_workspaces_are_served_round_robin() -> None:
+    admission = _admission()
+    order: list[str] = []
+    hold = asyncio.Event()
+
+    async def turn(name: str, ws: uuid.UUID) -> None:
+        async with admission.admit(ws, 0):
+            order.append(name)
+            await hold.wait()
+
+    first = asyncio.create_task(turn("a0", WS_A))
+    await asyncio.sleep(0)
+    # Воркспейс A набил очередь раньше B — B всё равно не ждёт их всех.
+    waiters = [asyncio.create_task(turn(f"a{i}", WS_A)) for i in (1, 2, 3)]
+    await asyncio.sleep(0)
+    waiters.append(asyncio.create_task(turn("b1", WS_B)))
+    await asyncio.sleep(0)
+    hold.set()
+    await asyncio.gather(first, *waiters)
+
+    assert order == ["a0", "a1", "b1", "a2", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_workspace_limit_leaves_room_for_others() -> None:
+    admission = _admission(global_limit=4, workspace_limit=2, max_wait_s=0.01)
+
+    async with admission.admit(WS_A, 0), admission.admit(WS_A, 0):
+        with pytest.raises(AdmissionRejected) as exc:
+            async with admission.admit(WS_A, 0):
+                pass
+        assert exc.value.reason == "wait_timeout"
+        # Другой воркспейс проходит без ожидания.
+        async with admission.admit(WS_B, 0):
+            pass
+
+    # Брошенный по таймауту ожидающий не занимает слот.
+    async with admission.admit(WS_A, 0):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rejects_with_retry_after_and_refunds_on_timeout() -> None:
+    now = [0.0]
+    admission = _admission(
+        global_limit=1, tokens_per_minute=600, max_wait_s=0.01, clock=lambda: now[0]
+    )
+
+    async with admission.admit(WS_A, 500):
+        # Не дождался слота — токены вернулись в bucket.
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit(WS_A, 100):
+                pass
+    async with admission.admit(WS_A, 100):
+        pass
+
+    with pytest.raises(AdmissionRejected) as exc:
+        async with admission.admit(WS_A, 50):
+            pass
+    # 600 токенов в минуту = 10 в секунду: до 50 не хватает 50.
+    assert (exc.value.reason, exc.value.retry_after) == ("tokens", 5.0)
+
+    now[0] += 5.0
+    async with admission.admit(WS_A, 50):
+        pass
+
+    http = exc.value.to_http()
+    assert (http.status_code, http.headers) == (429, {"Retry-After": "5"})
@@ -0,0 +1,200 @@
+"""Тесты для AuditSink (транзакционный и асинхронный режимы)."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conversations_src.adapters.db.audit import AuditLog
+from conversations_src.adapters.db.audit_sink import AuditEvent, AuditSink
+
+
+class _FakeSession:
+    def __init__(self, owner: _FakeSessionmaker) -> None:
+        self.owner = owner
+
+    async def __aenter__(self) -> _FakeSession:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def execute(self, stmt: Any) -> None:
+        if self.owner.fail:
+            raise RuntimeError("db down")
+        params = stmt.compile(dialect=postgresql.dialect()).params.values()
+        if self.owner.bad & set(params):
+            raise RuntimeError("bad row")
+        self.owner.statements.append(stmt)
+
+    async def commit(self) -> None:
+        return None
+
+
+class _FakeSessionmaker:
+    def __init__(self) -> None:
+        self.statements: list[object] = []
+        self.fail = False
+        self.bad: set[uuid.UUID] = set()
+
+    def __call__(self) -> _FakeSession:
+        return _FakeSession(self)
+
+
+def _event(action: str = "TURN_EXECUTED") -> AuditEvent:
+    return AuditEvent(workspace_id=uuid.uuid4(), action=action, resource_type="thread")
+
+
+class TestAuditSink:
+    """Тесты для AuditSink."""
+
+    @pytest.mark.asyncio
+    async def test_transactional_action_goes_to_request_session(self):
+        """Action без async-режима добавляется в сессию запроса."""
+        sessionmaker = _FakeSessionmaker()
+        sink = AuditSink(sessionmaker, async_actions=["TURN_EXECUTED"])  # type: ignore[arg-type]
+        db = MagicMock()
+
+        sink.record(db, _event("THREAD_CREATED"))
+
+        db.add.assert_called_once()
+        assert isinstance(db.add.call_args.args[0], AuditLog)
+        assert sink.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_async_action_is_flushed_in_one_batch(self):
+        """Async-события пишутся одним multi-row INSERT."""
+        sessionmaker = _FakeSessionmaker()
+        sink = AuditSink(
+            sessionmaker,  # type: ignore[arg-type]
+            async_actions=["TURN_EXECUTED"],
+            flush_interval_ms=60_000,
+        )
+        # Без bind: commit без соединения, но события сессии срабатывают.
+        db = AsyncSession()
+
+        for _ in range(3):
+            sink.record(db, _event())
+
+        assert not db.new
+        assert sink.pending == 0
+        await db.commit()
+        assert sink.pending == 3
+        assert await sink.flush() == 3
+        assert len(sessionmaker.statements) == 1
+        await sink.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_events_for_retry(self):
+        """При ошибке записи события остаются в очереди."""
+        sessionmaker = _FakeSessionmaker()
+        sink = AuditSink(
+            sessionmaker,  # type: ignore[arg-type]
+            async_actions=["TURN_EXECUTED"],
+            flush_interval_ms=60_000,
+        )
+        db = AsyncSession()
+        sink.record(db, _event())
+        await db.commit()
+        sessionmaker.fail = True
+
+        with pytest.raises(RuntimeError):
+            await sink.flush()
+        assert sink.pending == 1
+
+        sessionmaker.fail = False
+        await sink.aclose()
+        assert sink.pending == 0
+        assert len(sessionmaker.statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_bad_event_is_dropped_after_max_attempts(self):
+        """Пачка с плохим событием не блокирует очередь дольше max_attempts."""
+        sessionmaker = _FakeSessionmaker()
+        sink = AuditSink(
+            sessionmaker,  # type: ignore[arg-type]
+            async_actions=["TURN_EXECUTED"],
+            flush_interval_ms=60_000,
+            flush_max_events=2,
+            flush_max_attempts=3,
+        )
+        db = AsyncSession()
+        events = [_event() for _ in range(4)]
+        for event in events:
+            sink.record(db, event)
+        await db.commit()
+        sessionmaker.bad.add(events[0].id)
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await sink.flush()
+        assert sink.pending == 4
+
+        # Третья попытка: первая пачка пишется по одному, плохое событие
+        # отбрасывается, следующая пачка пишется как обычно.
+        assert await sink.flush() == 3
+        assert sink.pending == 0
+        assert sink.failed == 1
+        assert len(sessionmaker.statements) == 2
+        await sink.aclose()
+
+    @pytest.mark.asyncio
+    async def test_overflow_policies(self):
+        """Переполнение: transactional пишет в сессию, drop отбрасывает.
+
+        Место в очереди занимают и события ещё не закоммиченных транзакций."""
+        db = AsyncSession()
+        sink = AuditSink(
+            _FakeSessionmaker(),  # type: ignore[arg-type]
+            async_actions=["TURN_EXECUTED"],
+            flush_interval_ms=60_000,
+            max_queue_size=1,
+        )
+        sink.record(db, _event())
+        sink.record(db, _event())
+        assert len(db.new) == 1
+
+        dropping = AuditSink(
+            _FakeSessionmaker(),  # type: ignore[arg-type]
+            async_actions=["TURN_EXECUTED"],
+            flush_interval_ms=60_000,
+            max_queue_size=1,
+            overflow_policy="drop",
+        )
+        other = AsyncSession()
+        dropping.record(other, _event())
+        dropping.record(other, _event())
+        assert dropping.dropped == 1
+        assert not other.new
+
+        await sink.aclose()
+        await dropping.aclose()
+
+    @pytest.mark.asyncio
+    async def test_async_action_is_discarded_on_rollback(self):
+        """Откат или закрытие сессии без commit — событие не пишется."""
+        sink = AuditSink(
+            _FakeSessionmaker(),  # type: ignore[arg-type]
+            async_actions=["TURN_EXECUTED"],
+            flush_interval_ms=60_000,
+            max_queue_size=1,
+        )
+        db = AsyncSession()
+
+        sink.record(db, _event())
+        await db.rollback()
+        sink.record(db, _event())
+        await db.close()
+        assert sink.pending == 0
+
+        # Резерв места в очереди освобождён: следующее событие не переполняет её.
+        sink.record(db, _event())
+        await db.commit()
+        assert sink.pending == 1
+        assert not db.new
+        await sink.aclose()
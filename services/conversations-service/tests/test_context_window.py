@@ -0,0 +1,154 @@
+"""Контекстное окно: keyset-чтение до бюджета, token_count, кэш."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from conversations_src.adapters.tokenizers import ApproxTokenizer, create_tokenizer
+from conversations_src.use_cases.context_window import ContextAssembler
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def first(self) -> Any:
+        return self._rows[0] if self._rows else None
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+
+class _Session:
+    """Тред из `count` сообщений по `tokens` токенов; страницы — по LIMIT."""
+
+    def __init__(self, count: int, tokens: int | None = 10) -> None:
+        self.message_count = count
+        # От новых к старым — в порядке keyset-выборки.
+        self.messages = [
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                role="user",
+                content="x" * 40,
+                created_at=NOW + timedelta(seconds=i),
+                token_count=tokens,
+            )
+            for i in reversed(range(count))
+        ]
+        self.summary: dict[str, Any] = {}
+        self.pages = 0
+        self._offset = 0
+
+    def head(self) -> Any:
+        summary = self.summary or dict.fromkeys(
+            [
+                "summary",
+                "token_count",
+                "covered_messages",
+                "covered_until_created_at",
+                "covered_until_id",
+            ]
+        )
+        return SimpleNamespace(
+            created_at=NOW, message_count=self.message_count, **summary
+        )
+
+    async def execute(self, stmt: Any) -> _Result:
+        if "conversation_threads" in str(stmt):
+            self._offset = 0
+            return _Result([self.head()])
+        limit = stmt._limit_clause.value
+        self.pages += 1
+        self._offset += limit
+        return _Result(self.messages[self._offset - limit : self._offset])
+
+
+def _assembler(**kwargs: Any) -> ContextAssembler:
+    return ContextAssembler(ApproxTokenizer(), page_size=4, **kwargs)
+
+
+async def _assemble(assembler: ContextAssembler, session: _Session, budget: int) -> Any:
+    return await assembler.assemble(
+        session,  # type: ignore[arg-type]
+        workspace_id=uuid.uuid4(),
+        thread_id=uuid.UUID(int=1),
+        budget=budget,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stops_reading_once_budget_is_met() -> None:
+    session = _Session(count=100)
+
+    window = await _assemble(_assembler(), session, budget=55)
+
+    assert (len(window.messages), window.tokens, window.complete) == (5, 50, False)
+    # 5 сообщений по 10 токенов + 6-е не влезло: две страницы по 4, не 25.
+    assert session.pages == 2
+    # Окно — последние сообщения треда, от старых к новым.
+    assert [m.id for m in window.messages] == [m.id for m in session.messages[4::-1]]
+
+
+@pytest.mark.asyncio
+async def test_whole_short_thread_is_complete() -> None:
+    window = await _assemble(_assembler(), _Session(count=3), budget=1_000)
+
+    assert (len(window.messages), window.complete) == (3, True)
+
+
+@pytest.mark.asyncio
+async def test_missing_token_count_is_computed_by_tokenizer() -> None:
+    window = await _assemble(_assembler(), _Session(count=2, tokens=None), budget=100)
+
+    # 40 символов / 4 символа на токен.
+    assert [m.token_count for m in window.messages] == [10, 10]
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_until_message_count_changes_or_invalidated() -> None:
+    assembler = _assembler(cache_size=8)
+    session = _Session(count=3)
+
+    first = await _assemble(assembler, session, budget=100)
+    pages = session.pages
+    assert await _assemble(assembler, session, budget=100) is first
+    assert session.pages == pages
+
+    session.message_count += 1  # новое сообщение (в т.ч. из другого процесса)
+    assert await _assemble(assembler, session, budget=100) is not first
+
+    cached = await _assemble(assembler, session, budget=100)
+    assembler.invalidate(uuid.UUID(int=1))
+    assert await _assemble(assembler, session, budget=100) is not cached
+
+
+@pytest.mark.asyncio
+async def test_summary_is_prepended_and_counted_in_budget() -> None:
+    session = _Session(count=100)
+    session.summary = {
+        "summary": "свёртка",
+        "token_count": 20,
+        "covered_messages": 90,
+        "covered_until_created_at": NOW,
+        "covered_until_id": uuid.uuid4(),
+    }
+
+    window = await _assemble(_assembler(), session, budget=55)
+    assert (window.summary, len(window.messages), window.tokens) == ("свёртка", 3, 50)
+
+    # Свёртка больше бюджета — окно без неё, как у несвёрнутого треда.
+    window = await _assemble(_assembler(), session, budget=15)
+    assert (window.summary, len(window.messages)) == (None, 1)
+
+
+def test_create_tokenizer() -> None:
+    assert create_tokenizer("approx").count("абвгд") == 2
+    with pytest.raises(ValueError):
+        create_tokenizer("nope")
@@ -0,0 +1,170 @@
+"""Быстрый путь list-эндпоинтов: те же байты, что и через response_model."""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from conversations_src.adapters.db.session import get_db_session
+from conversations_src.config.settings import Settings
+from conversations_src.entrypoints.http.routes_conversations import (
+    MessageFieldsListResponse,
+    MessageResponse,
+    MessagesListResponse,
+    ThreadResponse,
+    ThreadsListResponse,
+)
+from conversations_src.main import create_app
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def __iter__(self) -> Any:
+        return iter(self._rows)
+
+    def first(self) -> Any:
+        return self._rows[0] if self._rows else None
+
+
+class _Session:
+    """Отдаёт заранее заданные результаты по порядку вызовов execute()."""
+
+    def __init__(self, *results: _Result) -> None:
+        self._results = list(results)
+        self.statements: list[Any] = []
+
+    async def execute(self, stmt: object) -> _Result:
+        self.statements.append(stmt)
+        return self._results.pop(0)
+
+
+def _client(session: _Session) -> TestClient:
+    app = create_app(Settings())
+
+    async def _db() -> AsyncIterator[_Session]:
+        yield session
+
+    app.dependency_overrides[get_db_session] = _db
+    return TestClient(app)
+
+
+def _messages(thread_id: uuid.UUID, count: int) -> list[MessageResponse]:
+    now = datetime.now(timezone.utc)
+    return [
+        MessageResponse(
+            id=uuid.uuid4(),
+            thread_id=thread_id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"сообщение {i}",
+            created_at=now + timedelta(milliseconds=i),
+            operation_id=uuid.uuid4() if i % 3 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _thread(thread_id: uuid.UUID) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=thread_id, bot_id=None, created_at=datetime.now(timezone.utc)
+    )
+
+
+def test_list_messages_matches_response_model() -> None:
+    workspace_id = uuid.uuid4()
+    thread_id = uuid.uuid4()
+    messages = _messages(thread_id, 5)
+    rows = [tuple(m.model_dump().values()) for m in messages]
+    client = _client(_Session(_Result([_thread(thread_id)]), _Result(rows)))
+
+    r = client.get(
+        f"/v1/conversations/threads/{thread_id}/messages",
+        headers={"X-Workspace-Id": str(workspace_id)},
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.content == MessagesListResponse(items=messages).model_dump_json().encode()
+
+
+def test_list_threads_matches_response_model() -> None:
+    workspace_id = uuid.uuid4()
+    threads = [
+        ThreadResponse(
+            id=uuid.uuid4(),
+            workspace_id=workspace_id,
+            bot_id=uuid.uuid4() if i % 2 else None,
+            status="active",
+            created_at=datetime.now(timezone.utc),
+        )
+        for i in range(3)
+    ]
+    rows = [tuple(t.model_dump().values()) for t in threads]
+    client = _client(_Session(_Result(rows)))
+
+    r = client.get(
+        "/v1/conversations/threads", headers={"X-Workspace-Id": str(workspace_id)}
+    )
+
+    assert r.status_code == 200
+    assert r.content == ThreadsListResponse(items=threads).model_dump_json().encode()
+
+
+def test_list_messages_fields_omits_content() -> None:
+    thread_id = uuid.uuid4()
+    messages = _messages(thread_id, 3)
+    rows = [(m.id, m.role, m.created_at) for m in messages]
+    session = _Session(_Result([_thread(thread_id)]), _Result(rows))
+    client = _client(session)
+
+    r = client.get(
+        f"/v1/conversations/threads/{thread_id}/messages",
+        params={"fields": "role,created_at"},
+        headers={"X-Workspace-Id": str(uuid.uuid4())},
+    )
+
+    assert r.status_code == 200
+    assert [set(item) for item in r.json()["items"]] == [
+        {"id", "role", "created_at"}
+    ] * 3
+    # Ответ соответствует опубликованной sparse-схеме (обязателен только id).
+    MessageFieldsListResponse.model_validate_json(r.content)
+    schemas = client.app.openapi()["components"]["schemas"]  # type: ignore[attr-defined]
+    assert schemas["MessageFieldsResponse"]["required"] == ["id"]
+    selected = [c.key for c in session.statements[1].selected_columns]
+    assert selected == ["id", "role", "created_at"]
+
+
+def test_list_messages_rejects_unknown_fields() -> None:
+    client = _client(_Session())
+
+    r = client.get(
+        f"/v1/conversations/threads/{uuid.uuid4()}/messages",
+        params={"fields": "id,secret"},
+        headers={"X-Workspace-Id": str(uuid.uuid4())},
+    )
+
+    assert r.status_code == 400
+    assert r.json()["code"] == "INVALID_FIELDS"
+
+
+def test_list_threads_sort_by_last_message_at() -> None:
+    session = _Session(_Result([]))
+    client = _client(session)
+
+    r = client.get(
+        "/v1/conversations/threads",
+        params={"sort": "last_message_at"},
+        headers={"X-Workspace-Id": str(uuid.uuid4())},
+    )
+
+    assert r.status_code == 200
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ORDER BY conversation_threads.last_message_at DESC NULLS LAST" in sql
@@ -0,0 +1,43 @@
+"""Тесты для помесячного секционирования (без БД)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from conversations_src.adapters.db.partitions import (
+    RetentionPolicy,
+    add_months,
+    partition_name,
+)
+
+
+class TestPartitionHelpers:
+    """Тесты для вспомогательных функций секций."""
+
+    def test_add_months_crosses_year(self):
+        """Переход через границу года."""
+        assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        """Имя секции совпадает с именами из миграции."""
+        assert (
+            partition_name("conversation_messages", date(2026, 3, 1))
+            == "conversation_messages_p2026_03"
+        )
+
+
+class TestRetentionPolicy:
+    """Тесты для RetentionPolicy."""
+
+    def test_no_default_keeps_partitions(self):
+        """Без срока по умолчанию секции не удаляются."""
+        policy = RetentionPolicy(overrides={uuid.uuid4(): 30})
+        assert policy.partition_cutoff(datetime.now(timezone.utc)) is None
+
+    def test_cutoff_uses_longest_retention(self):
+        """Секции удаляются только по самому длинному сроку."""
+        now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+        policy = RetentionPolicy(default_days=90, overrides={uuid.uuid4(): 365})
+        assert policy.partition_cutoff(now) == now - timedelta(days=365)
@@ -0,0 +1,220 @@
+"""Свёртка тредов: порог, хвост, куски для LLM, условная запись, job_queue."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from conversations_src.adapters.llm import FakeSummarizer
+from conversations_src.adapters.tokenizers import ApproxTokenizer
+from conversations_src.config.settings import Settings
+from conversations_src.use_cases.job_queue import JobQueueService
+from conversations_src.use_cases.summarization import (
+    JOB_TYPE,
+    ThreadSummarizer,
+    summary_due,
+    summary_job,
+)
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+class _Session:
+    """Тред из `count` сообщений по 10 токенов, без свёртки."""
+
+    def __init__(self, count: int, *, upsert_rowcount: int = 1) -> None:
+        self.messages = [
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"сообщение {i}",
+                created_at=NOW + timedelta(seconds=i),
+                token_count=10,
+            )
+            for i in range(count)
+        ]
+        self.upsert_rowcount = upsert_rowcount
+        self.upserts: list[dict[str, Any]] = []
+        self.commits = 0
+
+    async def execute(self, stmt: Any) -> Any:
+        sql = str(stmt)
+        if sql.startswith("INSERT INTO conversation_thread_summaries"):
+            self.upserts.append(stmt.compile().params)
+            return SimpleNamespace(rowcount=self.upsert_rowcount)
+        if "FROM conversation_threads" in sql:
+            head = SimpleNamespace(
+                created_at=NOW,
+                summary=None,
+                covered_messages=None,
+                covered_until_created_at=None,
+                covered_until_id=None,
+            )
+            return SimpleNamespace(first=lambda: head)
+        return iter(self.messages)
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+def _summarizer(backend: FakeSummarizer) -> ThreadSummarizer:
+    return ThreadSummarizer(
+        backend,
+        ApproxTokenizer(),
+        trigger_tokens=100,
+        tail_tokens=30,
+        chunk_tokens=40,
+    )
+
+
+async def _run(session: _Session, backend: FakeSummarizer) -> int:
+    return await _summarizer(backend).summarize(
+        session,  # type: ignore[arg-type]
+        workspace_id=uuid.uuid4(),
+        thread_id=uuid.uuid4(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_below_threshold_does_nothing() -> None:
+    backend = FakeSummarizer()
+
+    assert await _run(_Session(count=10), backend) == 0
+    assert backend.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_folds_all_but_tail_in_chunks() -> None:
+    session = _Session(count=20)
+    backend = FakeSummarizer()
+
+    # 200 токенов > 100: хвост — 3 сообщения (30), свёртка — 17 кусками по 4.
+    assert await _run(session, backend) == 17
+    assert backend.calls == 5
+    assert [u["covered_messages"] for u in session.upserts] == [4, 8, 12, 16, 17]
+    assert session.upserts[-1]["covered_until_id"] == session.messages[16].id
+    # Свёртка накапливается: в последней — и первое сообщение.
+    assert "сообщение 0" in session.upserts[-1]["summary"]
+
+
+@pytest.mark.asyncio
+async def test_stops_when_concurrent_job_advanced_summary() -> None:
+    session = _Session(count=20, upsert_rowcount=0)
+    backend = FakeSummarizer()
+
+    assert await _run(session, backend) == 0
+    assert backend.calls == 1
+
+
+def test_summary_due_on_crossing_every_n_messages() -> None:
+    assert [n for n in range(2, 42, 2) if summary_due(n, 2, 10)] == [10, 20, 30, 40]
+    assert not summary_due(10, 2, 0)
+
+
+def test_summarization_is_off_by_default_and_needs_real_backend() -> None:
+    assert Settings().summary_check_every == 0
+    Settings(SUMMARY_CHECK_EVERY=10)  # local: fake допустим
+    Settings(
+        APP_ENV="prod",
+        SUMMARY_CHECK_EVERY=10,
+        SUMMARIZER_BACKEND="http",
+        SUMMARIZER_URL="http://llm/summarize",
+    )
+    with pytest.raises(ValidationError):
+        Settings(APP_ENV="prod", SUMMARY_CHECK_EVERY=10)
+
+
+class _JobSession:
+    """Пишет в общий журнал SQL, commit/rollback и close."""
+
+    def __init__(self, name: str, log: list[tuple[str, str]], jobs: Any = ()) -> None:
+        self.name = name
+        self.log = log
+        self.jobs = list(jobs)
+
+    async def execute(self, stmt: Any) -> Any:
+        self.log.append((self.name, str(stmt.compile(dialect=postgresql.dialect()))))
+        jobs = self.jobs
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: jobs))
+
+    async def commit(self) -> None:
+        self.log.append((self.name, "commit"))
+
+    async def rollback(self) -> None:
+        self.log.append((self.name, "rollback"))
+
+    async def close(self) -> None:
+        self.log.append((self.name, "close"))
+
+
+@pytest.mark.asyncio
+async def test_job_queue_dispatches_registered_handler() -> None:
+    seen: list[Any] = []
+
+    async def _handler(db: Any, job: Any) -> None:
+        seen.append((db, job.payload["thread_id"]))
+
+    log: list[tuple[str, str]] = []
+    handler_db = _JobSession("handler", log)
+    thread_id = uuid.uuid4()
+    job = summary_job(uuid.uuid4(), thread_id)
+    service = JobQueueService(
+        None,  # type: ignore[arg-type]
+        Settings(),
+        None,  # type: ignore[arg-type]
+        handlers={JOB_TYPE: _handler},
+        sessionmaker=lambda: handler_db,  # type: ignore[arg-type, return-value]
+    )
+
+    await service._process_job(job)
+
+    assert seen == [(handler_db, str(thread_id))]
+    assert log == [("handler", "close")]
+
+
+@pytest.mark.asyncio
+async def test_job_queue_claims_atomically_and_isolates_handler_session() -> None:
+    """Захват — один UPDATE ... SKIP LOCKED, закоммиченный до обработки;
+    commit/rollback обработчика не трогают сессию воркера."""
+
+    async def _handler(db: Any, job: Any) -> None:
+        await db.commit()
+        await db.rollback()
+        raise RuntimeError("llm down")
+
+    log: list[tuple[str, str]] = []
+    job = summary_job(uuid.uuid4(), uuid.uuid4())
+    job.created_at = NOW
+    service = JobQueueService(
+        _JobSession("worker", log, [job]),  # type: ignore[arg-type]
+        Settings(),
+        None,  # type: ignore[arg-type]
+        handlers={JOB_TYPE: _handler},
+        sessionmaker=lambda: _JobSession("handler", log),  # type: ignore[arg-type, return-value]
+    )
+
+    assert await service.process_pending_jobs(limit=5) == 0
+
+    claim = log[0][1]
+    assert claim.startswith("UPDATE job_queue SET status=")
+    assert "FOR UPDATE SKIP LOCKED" in claim
+    assert "RETURNING job_queue.id" in claim
+    assert log[1:5] == [
+        ("worker", "commit"),  # захват зафиксирован до обработки
+        ("handler", "commit"),
+        ("handler", "rollback"),
+        ("handler", "close"),
+    ]
+    # Ошибка помечена в сессии воркера, не сломанной обработчиком.
+    assert log[5][0] == "worker" and "failed_at" in log[5][1]
+    assert log[6:] == [("worker", "commit")]
+    assert job.attempts == 1
@@ -0,0 +1,185 @@
+"""Экспорт воркспейса: NDJSON-поток, checkpoint-курсоры, gzip."""
+
+from __future__ import annotations
+
+import gzip
+import uuid
+from collections import namedtuple
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from conversations_src.adapters.db.queries import MESSAGE_ROW, THREAD_ROW
+from conversations_src.adapters.db.session import get_db_session
+from conversations_src.config.settings import Settings
+from conversations_src.main import create_app
+from conversations_src.use_cases.thread_export import (
+    ExportCursor,
+    messages_statement,
+)
+from conversations_src.use_cases.thread_import import _RECORD
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+WORKSPACE_ID = uuid.uuid4()
+
+
+class _Stream:
+    def __init__(self, rows: list[Any], batch_size: int) -> None:
+        self._rows = rows
+        self._batch_size = batch_size
+
+    async def partitions(self) -> AsyncIterator[list[Any]]:
+        for i in range(0, len(self._rows), self._batch_size):
+            yield self._rows[i : i + self._batch_size]
+
+
+class _Session:
+    """Отдаёт результаты stream() («server-side курсоры») по порядку вызовов."""
+
+    def __init__(self, *results: list[Any]) -> None:
+        self._results = list(results)
+        self.statements: list[Any] = []
+        self.rolled_back = False
+
+    async def connection(self, **kwargs: Any) -> None:
+        return None
+
+    async def stream(self, stmt: Any) -> _Stream:
+        self.statements.append(stmt)
+        rows = self._results.pop(0)
+        return _Stream(rows, stmt.get_execution_options()["yield_per"])
+
+    async def rollback(self) -> None:
+        self.rolled_back = True
+
+
+_ThreadRow = namedtuple("_ThreadRow", THREAD_ROW.fields)  # type: ignore[misc]
+_MessageRow = namedtuple("_MessageRow", MESSAGE_ROW.fields)  # type: ignore[misc]
+
+
+def _data(threads: int = 3, per_thread: int = 2) -> tuple[list[Any], list[Any]]:
+    thread_rows, message_rows = [], []
+    for t in range(threads):
+        thread_id = uuid.uuid4()
+        thread_rows.append(
+            _ThreadRow(
+                id=thread_id,
+                workspace_id=WORKSPACE_ID,
+                bot_id=None,
+                status="active",
+                created_at=NOW,
+                message_count=per_thread,
+                last_message_at=NOW,
+            )
+        )
+        for i in range(per_thread):
+            message_rows.append(
+                _MessageRow(
+                    id=uuid.uuid4(),
+                    thread_id=thread_id,
+                    role="user",
+                    content=f"t{t} m{i}",
+                    created_at=NOW + timedelta(seconds=i),
+                    operation_id=None,
+                )
+            )
+    return thread_rows, message_rows
+
+
+def _client(session: _Session, batch_size: int = 2) -> TestClient:
+    app = create_app(Settings(export_batch_size=batch_size))
+
+    async def _db() -> AsyncIterator[_Session]:
+        yield session
+
+    app.dependency_overrides[get_db_session] = _db
+    return TestClient(app)
+
+
+def _export(client: TestClient, **kwargs: Any) -> Any:
+    return client.get(
+        "/v1/conversations/export",
+        headers={"X-Workspace-Id": str(WORKSPACE_ID), "Accept-Encoding": "identity"},
+        **kwargs,
+    )
+
+
+def test_export_streams_threads_then_messages_with_checkpoints() -> None:
+    threads, messages = _data()
+    session = _Session(threads, messages)
+
+    r = _export(_client(session))
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    records = [orjson.loads(line) for line in r.content.splitlines()]
+    types = [rec["type"] for rec in records]
+    assert types == (
+        ["thread", "thread", "checkpoint", "thread", "checkpoint"]
+        + ["message", "message", "checkpoint"] * 3
+        + ["end"]
+    )
+    assert records[-1] == {"type": "end", "threads": 3, "messages": 6}
+    # Каждая строка годится для POST /threads:import.
+    for line in r.content.splitlines():
+        _RECORD.validate_json(line)
+    assert session.rolled_back
+
+
+def test_export_resumes_from_message_checkpoint() -> None:
+    threads, messages = _data()
+    session = _Session(messages[4:])
+    after = messages[3]
+    cursor = ExportCursor(
+        phase="messages",
+        id=after.id,
+        thread_id=after.thread_id,
+        created_at=after.created_at,
+    )
+
+    r = _export(_client(session), params={"cursor": cursor.encode()})
+
+    records = [orjson.loads(line) for line in r.content.splitlines()]
+    assert [rec["type"] for rec in records] == [
+        "message",
+        "message",
+        "checkpoint",
+        "end",
+    ]
+    # Фаза тредов пропущена, сообщения — строго после курсора.
+    assert len(session.statements) == 1
+    sql = str(messages_statement(WORKSPACE_ID, cursor))
+    assert "conversation_messages.created_at, conversation_messages.id) >" in sql
+
+
+def test_export_gzip_when_accepted() -> None:
+    threads, messages = _data(threads=1, per_thread=1)
+
+    with _client(_Session(threads, messages)).stream(
+        "GET",
+        "/v1/conversations/export",
+        headers={"X-Workspace-Id": str(WORKSPACE_ID), "Accept-Encoding": "gzip"},
+    ) as r:
+        raw = b"".join(r.iter_raw())
+
+    assert r.headers["content-encoding"] == "gzip"
+    lines = gzip.decompress(raw).splitlines()
+    assert [orjson.loads(line)["type"] for line in lines] == [
+        "thread",
+        "checkpoint",
+        "message",
+        "checkpoint",
+        "end",
+    ]
+
+
+@pytest.mark.parametrize("token", ["%%%", "WyJ4Il0"])
+def test_export_rejects_bad_cursor(token: str) -> None:
+    r = _export(_client(_Session()), params={"cursor": token})
+
+    assert r.status_code == 400
+    assert r.json()["code"] == "INVALID_CURSOR"
@@ -0,0 +1,195 @@
+"""Импорт тредов из NDJSON: разбор потока, батчи, возобновление, ошибки."""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from conversations_src.adapters.db.session import get_db_session
+from conversations_src.config.settings import Settings
+from conversations_src.main import create_app
+from conversations_src.use_cases.thread_import import (
+    ImportRecordError,
+    ThreadImporter,
+    iter_lines,
+)
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+class _Session:
+    """Сессия без БД: тредов в воркспейсе нет, execute ничего не находит."""
+
+    def __init__(self) -> None:
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, stmt: object, *args: Any) -> Any:
+        return SimpleNamespace(scalar_one_or_none=lambda: None)
+
+    def add(self, row: object) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+class _Importer(ThreadImporter):
+    """Вместо БД: заданная точка возобновления, батчи копятся в списке."""
+
+    def __init__(self, *args: Any, resumed_from: int = 0, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.resumed_from = resumed_from
+        self.written: list[Any] = []
+
+    async def _resume_point(self) -> tuple[int, int]:
+        return self.resumed_from, 0
+
+    async def _resolve_threads(self, batch: Any) -> None:
+        for t in batch.threads:
+            self._threads[t.id] = (t.bot_id, t.created_at)
+        for line_no, m in batch.messages:
+            if m.thread_id not in self._threads:
+                raise ImportRecordError(line_no, "THREAD_NOT_FOUND", "нет треда")
+
+    async def _write(self, batch: Any) -> None:
+        self.written.append(batch)
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def _chunks_lines(
+    lines: list[tuple[int, bytes]],
+) -> AsyncIterator[tuple[int, bytes]]:
+    for item in lines:
+        yield item
+
+
+def _stream(records: list[dict[str, Any]]) -> bytes:
+    return b"\n".join(orjson.dumps(r) for r in records) + b"\n"
+
+
+def _records(threads: int, per_thread: int) -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    for _ in range(threads):
+        thread_id = str(uuid.uuid4())
+        records.append(
+            {"type": "thread", "id": thread_id, "created_at": NOW.isoformat()}
+        )
+        records.extend(
+            {
+                "type": "message",
+                "thread_id": thread_id,
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"m{i}",
+                "created_at": (NOW + timedelta(minutes=i)).isoformat(),
+            }
+            for i in range(per_thread)
+        )
+    return records
+
+
+async def _lines(data: bytes, chunk: int = 7) -> list[tuple[int, bytes]]:
+    parts = [data[i : i + chunk] for i in range(0, len(data), chunk)]
+    return [item async for item in iter_lines(_chunks(*parts), max_line_bytes=1024)]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_splits_across_chunks_and_skips_blank() -> None:
+    lines = await _lines(b'{"a":1}\n\n{"b":2}\r\n{"c":3}')
+
+    assert lines == [(1, b'{"a":1}'), (3, b'{"b":2}'), (4, b'{"c":3}')]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_rejects_oversized_line() -> None:
+    with pytest.raises(ImportRecordError) as exc:
+        [_ async for _ in iter_lines(_chunks(b"x" * 100), max_line_bytes=10)]
+
+    assert exc.value.code == "LINE_TOO_LONG"
+
+
+@pytest.mark.asyncio
+async def test_importer_writes_batches_and_counts() -> None:
+    data = _stream(_records(threads=3, per_thread=4))
+    importer = _Importer(
+        _Session(), workspace_id=uuid.uuid4(), operation_id=uuid.uuid4(), batch_size=4
+    )
+
+    report = await importer.run(_chunks_lines(await _lines(data)))
+
+    assert (report.threads, report.messages, report.batches) == (3, 12, 4)
+    assert [b.first_record for b in importer.written] == [0, 4, 8, 12]
+
+
+@pytest.mark.asyncio
+async def test_importer_resumes_after_committed_records() -> None:
+    data = _stream(_records(threads=2, per_thread=4))
+    importer = _Importer(
+        _Session(),
+        workspace_id=uuid.uuid4(),
+        operation_id=uuid.uuid4(),
+        batch_size=100,
+        resumed_from=5,
+    )
+
+    # Первый тред целиком записан прошлым запросом: его сообщения уже в БД,
+    # поэтому второй тред и его сообщения проходят без обращения к первому.
+    report = await importer.run(_chunks_lines(await _lines(data)))
+
+    assert (report.resumed_from, report.threads, report.messages) == (5, 1, 4)
+    assert importer.written[0].first_record == 5
+
+
+@pytest.mark.asyncio
+async def test_importer_rejects_foreign_workspace() -> None:
+    record = _records(threads=1, per_thread=0)[0] | {"workspace_id": str(uuid.uuid4())}
+    importer = _Importer(
+        _Session(), workspace_id=uuid.uuid4(), operation_id=uuid.uuid4(), batch_size=10
+    )
+
+    with pytest.raises(ImportRecordError) as exc:
+        await importer.run(_chunks_lines(await _lines(_stream([record]))))
+
+    assert (exc.value.code, exc.value.line) == ("WORKSPACE_MISMATCH", 1)
+
+
+def test_import_route_reports_invalid_line(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        "conversations_src.entrypoints.http.routes_conversations.ThreadImporter",
+        _Importer,
+    )
+    app = create_app(Settings())
+
+    async def _db() -> AsyncIterator[_Session]:
+        yield _Session()
+
+    app.dependency_overrides[get_db_session] = _db
+    records = _records(threads=1, per_thread=1)
+    body = _stream(records) + b'{"type": "message", "role": "user"}\n'
+
+    r = TestClient(app).post(
+        "/v1/conversations/threads:import",
+        content=body,
+        headers={
+            "X-Workspace-Id": str(uuid.uuid4()),
+            "Content-Type": "application/x-ndjson",
+        },
+    )
+
+    assert r.status_code == 422
+    assert r.json()["code"] == "INVALID_RECORD"
+    assert r.json()["details"]["line"] == 3
@@ -0,0 +1,140 @@
+"""turn в две DB-фазы: чтение треда/дедуп и запись результата."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from conversations_src.adapters.db.unit_of_work import UnitOfWork, get_unit_of_work
+from conversations_src.config.settings import Settings
+from conversations_src.main import create_app
+
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+WORKSPACE = uuid.uuid4()
+THREAD = uuid.uuid4()
+
+
+class _Result:
+    def __init__(self, value: Any) -> None:
+        self._value = value
+
+    def first(self) -> Any:
+        return self._value
+
+    def scalar_one_or_none(self) -> Any:
+        return self._value
+
+    def scalars(self) -> Any:
+        return iter(self._value)
+
+
+class _Db:
+    """Отдаёт результаты (или бросает исключения) из общего сценария по порядку.
+
+    `sync_session` — настоящая `Session` без bind: на её commit/rollback
+    срабатывают события, по которым AuditSink ставит async-события в очередь.
+    """
+
+    def __init__(self, script: list[Any], calls: list[str]) -> None:
+        self.script = script
+        self.calls = calls
+        self.sync_session = Session()
+
+    async def execute(self, stmt: Any) -> _Result:
+        self.calls.append("execute")
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _Result(outcome)
+
+    def add(self, obj: Any) -> None:
+        self.calls.append("add")
+
+    async def commit(self) -> None:
+        self.calls.append("commit")
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.calls.append("rollback")
+        self.sync_session.rollback()
+
+    async def close(self) -> None:
+        self.calls.append("close")
+        self.sync_session.close()
+
+
+def _app(script: list[Any], calls: list[str]) -> FastAPI:
+    app = create_app(Settings(ADMISSION_BACKEND="off"))
+    uow = UnitOfWork(lambda: _Db(script, calls))  # type: ignore[arg-type, return-value]
+    app.dependency_overrides[get_unit_of_work] = lambda: uow
+    return app
+
+
+def _turn(app: FastAPI, **headers: str) -> Any:
+    return TestClient(app).post(
+        f"/v1/conversations/threads/{THREAD}/turn",
+        json={"content": "привет"},
+        headers={"X-Workspace-Id": str(WORKSPACE), **headers},
+    )
+
+
+def _head() -> SimpleNamespace:
+    return SimpleNamespace(id=THREAD, bot_id=None, created_at=NOW)
+
+
+def test_turn_returns_404_when_thread_deleted_between_phases() -> None:
+    calls: list[str] = []
+    # Фаза 1: тред есть. Фаза 2: UPDATE счётчиков не нашёл строку.
+    app = _app([_head(), None], calls)
+
+    r = _turn(app)
+
+    assert r.status_code == 404
+    assert r.json()["code"] == "THREAD_NOT_FOUND"
+    assert calls == ["execute", "close", "add", "add", "execute", "rollback", "close"]
+    # TURN_EXECUTED откатанного turn'а не попадает в очередь аудита.
+    assert app.state.audit_sink.pending == 0
+
+
+def test_turn_replays_saved_result_on_integrity_error_in_write_phase() -> None:
+    calls: list[str] = []
+    operation_id = uuid.uuid4()
+    saved = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            thread_id=THREAD,
+            role=role,
+            content=role,
+            created_at=NOW,
+            operation_id=operation_id,
+        )
+        for role in ("user", "assistant")
+    ]
+    duplicate = IntegrityError("INSERT", {}, Exception("duplicate key"))
+    script = [
+        _head(),
+        None,  # фаза 1: операции ещё нет
+        duplicate,  # фаза 2: параллельный запрос успел сохранить turn
+        SimpleNamespace(created_at=NOW),  # дочитываем его
+        saved,
+    ]
+    app = _app(script, calls)
+
+    r = _turn(app, **{"X-Operation-Id": str(operation_id)})
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["user_message"]["id"] == str(saved[0].id)
+    assert body["assistant_message"]["id"] == str(saved[1].id)
+    assert calls == [
+        *["execute", "execute", "close"],
+        *["add", "add", "add", "execute", "rollback", "execute", "execute", "close"],
+    ]
+    assert app.state.audit_sink.pending == 0